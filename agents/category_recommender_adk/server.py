@@ -1,9 +1,9 @@
 """HTTP server for Category Recommender Agent compliant with Google ADK card definition."""
-import sys, pathlib
+import os, sys, pathlib
 # Ensure project root path available for imports
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
 
-from typing import List
+from typing import List, Optional
 
 import uvicorn
 from fastapi import FastAPI, HTTPException
@@ -17,6 +17,8 @@ app = FastAPI(title="Category Recommender Agent", version="0.1.0")
 
 class ComposeCourseRequest(BaseModel):
     user_query: str
+    query_info: Optional[dict] = None
+    seed: Optional[int] = None
 
 class ComposeCourseResponse(BaseModel):
     sequence: List[str]
@@ -28,12 +30,16 @@ from contextlib import asynccontextmanager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global recommender
-    recommender = CategoryCourseRecommender(api_type="deepseek")
+    recommender = CategoryCourseRecommender(api_type=os.getenv("LLM_API", "deepseek"))
+    try:
+        await recommender.pose_graph.get()
+    except Exception as exc:
+        print(f"Pose graph snapshot not loaded at startup (will retry on first request): {exc}")
     try:
         yield
     finally:
         if recommender:
-            recommender.close()
+            await recommender.close()
 
 # Recreate FastAPI app with lifespan handler
 app = FastAPI(title="Category Recommender Agent", version="0.1.0", lifespan=lifespan)
@@ -43,10 +49,17 @@ async def compose_course(req: ComposeCourseRequest):
     if not recommender:
         raise HTTPException(status_code=503, detail="Recommender not initialised")
     try:
-        seq = recommender.recommend_course(req.user_query)
+        seq = await recommender.recommend_course(req.user_query, req.query_info, req.seed)
         return ComposeCourseResponse(sequence=seq)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
+@app.get("/stats")
+async def stats_endpoint() -> dict:
+    """Query-extraction cache hit rate and LLM call metrics."""
+    if not recommender:
+        raise HTTPException(status_code=503, detail="Recommender not initialised")
+    return recommender.stats()
+
 if __name__ == "__main__":
     uvicorn.run("agents.category_recommender_adk.server:app", host="0.0.0.0", port=8002)
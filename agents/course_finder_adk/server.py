@@ -1,9 +1,9 @@
 """HTTP server for Course Finder Agent compliant with Google ADK card definition."""
-import sys, pathlib
+import os, sys, pathlib
 # Ensure project root is in PYTHONPATH for module imports
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
 
-from typing import List
+from typing import List, Optional
 
 import uvicorn
 from fastapi import FastAPI, HTTPException
@@ -17,6 +17,8 @@ app = FastAPI(title="Course Finder Agent", version="0.1.0")
 
 class FindCoursesRequest(BaseModel):
     user_query: str
+    query_info: Optional[dict] = None
+    max_results: Optional[int] = None
 
 class FindCoursesResponse(BaseModel):
     courses: List[str]
@@ -30,12 +32,12 @@ from contextlib import asynccontextmanager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global finder
-    finder = CourseFinder(api_type="deepseek")
+    finder = CourseFinder(api_type=os.getenv("LLM_API", "deepseek"))
     try:
         yield
     finally:
         if finder:
-            finder.close()
+            await finder.close()
 
 # Recreate the FastAPI app with lifespan handler
 app = FastAPI(title="Course Finder Agent", version="0.1.0", lifespan=lifespan)
@@ -45,10 +47,17 @@ async def find_courses(req: FindCoursesRequest):
     if not finder:
         raise HTTPException(status_code=503, detail="Finder not initialised")
     try:
-        course_names = finder.find_candidates(req.user_query)
+        course_names = await finder.find_candidates(req.user_query, req.query_info, req.max_results)
         return FindCoursesResponse(courses=course_names)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
+@app.get("/stats")
+async def stats_endpoint() -> dict:
+    """Query-extraction cache hit rate and LLM call metrics."""
+    if not finder:
+        raise HTTPException(status_code=503, detail="Finder not initialised")
+    return finder.stats()
+
 if __name__ == "__main__":
     uvicorn.run("agents.course_finder_adk.server:app", host="0.0.0.0", port=8001)
@@ -0,0 +1,122 @@
+"""Recall@k and latency of each Qdrant collection profile.
+
+For every profile in ``services.vector_store.COLLECTION_PROFILES`` a scratch
+collection is created with that profile, filled with the same vectors, and
+queried with the profile's search parameters.  Results are compared with an
+exact NumPy brute-force search to get recall@k; single-query latencies give
+p50 / p99.
+
+By default the vectors are the real catalog documents (poses, courses,
+categories) replicated with small Gaussian jitter up to ``--size`` points, so
+the distribution resembles a grown pose catalog; ``--synthetic`` uses random
+unit vectors instead.
+
+    python benchmarks/bench_collection_profiles.py --size 50000 --queries 300 --k 5
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+from qdrant_client import models
+
+from services.vector_store import (
+    COLLECTION_PROFILES, search_params, embed, get_client, recreate_collection, shutdown_server,
+)
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+COLLECTION = "bench_profiles"
+UPSERT_BATCH = 5_000
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _catalog_vectors(size: int, rng: np.random.Generator) -> np.ndarray:
+    poses = json.loads((DATA_DIR / "array_pose.json").read_text())["pose"]
+    courses = json.loads((DATA_DIR / "array_course.json").read_text())["course"]
+    categories = json.loads((DATA_DIR / "array_category.json").read_text())["category"]
+    texts = [p.get("introduction", "") + " " + p.get("effects", "") for p in poses]
+    texts += [c["description"] for c in courses]
+    texts += [c.get("introduction", "") for c in categories]
+    base = np.asarray(embed(texts), dtype=np.float32)
+    reps = base[rng.integers(0, len(base), size)]
+    return _normalise(reps + rng.normal(0, 0.05, reps.shape).astype(np.float32))
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench_profile(client, name: str, vectors: np.ndarray, queries: np.ndarray, exact: np.ndarray, k: int) -> dict:
+    profile = COLLECTION_PROFILES[name]
+    start = time.perf_counter()
+    recreate_collection(client, COLLECTION, dim=vectors.shape[1], profile=name)
+    for i in range(0, len(vectors), UPSERT_BATCH):
+        chunk = vectors[i:i + UPSERT_BATCH]
+        client.upsert(
+            collection_name=COLLECTION,
+            wait=True,
+            points=models.Batch(ids=list(range(i, i + len(chunk))), vectors=chunk.tolist()),
+        )
+    # Wait for the optimizer to finish building the HNSW graph.
+    while client.get_collection(COLLECTION).status != models.CollectionStatus.GREEN:
+        time.sleep(0.2)
+    build_s = time.perf_counter() - start
+
+    params = search_params(profile)
+    latencies, recalls = [], []
+    for q, truth in zip(queries, exact):
+        start = time.perf_counter()
+        resp = client.query_points(COLLECTION, query=q.tolist(), limit=k, search_params=params)
+        latencies.append(time.perf_counter() - start)
+        recalls.append(len({p.id for p in resp.points} & set(truth.tolist())) / k)
+    return {
+        "profile": name,
+        "build_s": build_s,
+        "recall": statistics.mean(recalls),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--profiles", nargs="+", default=sorted(COLLECTION_PROFILES))
+    parser.add_argument("--synthetic", action="store_true", help="Use random unit vectors (384-d).")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.synthetic:
+        vectors = _normalise(rng.standard_normal((args.size, 384)).astype(np.float32))
+    else:
+        vectors = _catalog_vectors(args.size, rng)
+    queries = _normalise(vectors[rng.integers(0, len(vectors), args.queries)]
+                         + rng.normal(0, 0.05, (args.queries, vectors.shape[1])).astype(np.float32))
+    exact = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+
+    client = get_client()
+    try:
+        print(f"{args.size} vectors, {args.queries} queries, k={args.k}\n")
+        print(f"{'profile':<13}{'build s':>9}{'recall@k':>10}{'p50 ms':>9}{'p99 ms':>9}")
+        for name in args.profiles:
+            r = bench_profile(client, name, vectors, queries, exact, args.k)
+            print(f"{r['profile']:<13}{r['build_s']:>9.1f}{r['recall']:>10.3f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}")
+    finally:
+        client.delete_collection(COLLECTION)
+        client.close()
+        shutdown_server()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Latency of composing a course's mini-sequences: per-category queries vs one query vs the snapshot.
+
+For ``--repeats`` random picks of ``--categories`` categories from the
+catalog in ``NEO4J_URI`` (read-only), times the three ways the category
+recommender has picked each category's pose, preceding and succeeding pose:
+
+• per-category – the former loop: three queries per category (a random pose
+  with ``ORDER BY rand()``, its BUILD_UP target, a random BALANCE_OUT/UNWIND
+  target), i.e. 3 × categories round trips;
+• single query – ``COMPOSE_QUERY``: one ``UNWIND $draws`` round trip;
+• snapshot     – ``_compose_from_snapshot`` on the in-memory pose graph.
+
+It then checks that the single query and the snapshot return the same
+mini-sequences for the same seeded draws, and exits with status 1 if not.
+
+    python benchmarks/bench_compose_course.py --categories 4 --repeats 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import recommend_course_from_category as rc
+from services.graph_db import get_async_graph
+from services.pose_graph import PoseGraphCache
+
+PER_CATEGORY_QUERIES = (
+    "MATCH (c:Category {id: $category})<-[:IN_CATEGORY]-(p:Pose) RETURN p.id AS pose ORDER BY rand() LIMIT 1",
+    "MATCH (preceding:Pose)<-[:BUILD_UP]-(current:Pose {id: $pose}) RETURN preceding.id AS pose LIMIT 1",
+    "MATCH (current:Pose {id: $pose})-[:BALANCE_OUT|UNWIND]->(succeeding:Pose) "
+    "RETURN succeeding.id AS pose ORDER BY rand() LIMIT 1",
+)
+
+
+async def _single(tx, query: str, **params):
+    result = await tx.run(query, **params)
+    record = await result.single()
+    return record["pose"] if record else None
+
+
+async def _all(tx, query: str, **params) -> list[dict]:
+    result = await tx.run(query, **params)
+    return await result.data()
+
+
+async def _per_category(session, draws: list[dict]) -> dict:
+    sequences = {}
+    for draw in draws:
+        current = await session.execute_read(_single, PER_CATEGORY_QUERIES[0], category=draw["category"])
+        if not current:
+            continue
+        preceding = await session.execute_read(_single, PER_CATEGORY_QUERIES[1], pose=current)
+        succeeding = await session.execute_read(_single, PER_CATEGORY_QUERIES[2], pose=current)
+        sequences[draw["category"]] = [p for p in (preceding, current, succeeding) if p]
+    return sequences
+
+
+async def _single_query(session, draws: list[dict]) -> dict:
+    records = await session.execute_read(_all, rc.COMPOSE_QUERY, draws=draws)
+    return {
+        r["category"]: [p for p in (r["preceding"], r["current"], r["succeeding"]) if p]
+        for r in records
+    }
+
+
+def _draws(seed: int, categories: list[str], count: int) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {"category": c, "pose": rng.random(), "succeeding": rng.random()}
+        for c in sorted(rng.sample(categories, min(count, len(categories))))
+    ]
+
+
+def _summary(samples: list[float]) -> tuple[float, float]:
+    samples = sorted(samples)
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--categories", type=int, default=4, help="Categories per composed course.")
+    parser.add_argument("--repeats", type=int, default=200, help="Timed runs per implementation.")
+    args = parser.parse_args()
+
+    driver = get_async_graph()
+    try:
+        graph = await PoseGraphCache(driver).get()
+        categories = sorted(graph.categories)
+        print(f"{len(graph)} poses, {len(categories)} categories with poses, {args.categories} per course\n")
+
+        async with driver.session() as session:
+            implementations = {
+                "per-category": lambda draws: _per_category(session, draws),
+                "single query": lambda draws: _single_query(session, draws),
+            }
+            results = {}
+            for name, compose in implementations.items():
+                await compose(_draws(-1, categories, args.categories))  # warm-up / plan cache
+                samples = []
+                for seed in range(args.repeats):
+                    draws = _draws(seed, categories, args.categories)
+                    start = time.perf_counter()
+                    await compose(draws)
+                    samples.append((time.perf_counter() - start) * 1000)
+                results[name] = _summary(samples)
+
+            samples = []
+            for seed in range(args.repeats):
+                draws = _draws(seed, categories, args.categories)
+                start = time.perf_counter()
+                rc.CategoryCourseRecommender._compose_from_snapshot(graph, draws)
+                samples.append((time.perf_counter() - start) * 1000)
+            results["snapshot"] = _summary(samples)
+
+            print(f"{'':<16}{'p50 ms':>10}{'p95 ms':>10}")
+            for name, (p50, p95) in results.items():
+                print(f"{name:<16}{p50:>10.3f}{p95:>10.3f}")
+            print()
+
+            pool = driver.stats()
+            print(f"neo4j: {pool['queries']} queries, peak pool utilization {pool['peak_pool_utilization']:.0%}\n")
+
+            mismatches = 0
+            for seed in range(args.repeats):
+                draws = _draws(seed, categories, args.categories)
+                if await _single_query(session, draws) != rc.CategoryCourseRecommender._compose_from_snapshot(graph, draws):
+                    mismatches += 1
+    finally:
+        await driver.close()
+
+    if mismatches:
+        print(f"❌ single query and snapshot differ for {mismatches}/{args.repeats} seeds")
+        sys.exit(1)
+    print(f"✅ single query and snapshot agree for all {args.repeats} seeds")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
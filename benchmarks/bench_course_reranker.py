@@ -0,0 +1,147 @@
+"""Latency and agreement of the local course rerankers against the LLM filter.
+
+Scores every (query, course description) pair of a fixed query set with:
+
+• llm      – the yes/no/n/a prompt ``CourseFinder`` sends per course
+  (``--api``); answers are saved to ``--labels`` and reused on later runs
+  unless ``--refresh-labels`` is given, so rerankers can be compared offline.
+• each reranker in ``--rerankers`` (``cross-encoder``, ``bi-encoder``), one
+  batched forward pass per query.
+
+For each reranker it reports per-query latency, how many pairs its default
+thresholds decide without the LLM (coverage), and how often those decisions
+agree with the LLM ("yes" vs anything else).  A threshold sweep then suggests
+the ``COURSE_RERANK_ACCEPT`` / ``COURSE_RERANK_REJECT`` pair with the highest
+coverage whose agreement is at least ``--target-agreement``.
+
+    python benchmarks/bench_course_reranker.py --api deepseek --rerankers cross-encoder bi-encoder
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from get_course_candidates_for_query import course_match_prompt
+from services.reranker import Reranker
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+DEFAULT_LABELS = Path(__file__).resolve().parent / "course_llm_labels.json"
+QUERIES = [
+    "I need a 30-minute session for strength, but I have a weak neck and can't do headstands.",
+    "Please suggest a 30-min yoga sequence avoiding pressuring the wrist",
+    "A gentle evening routine to relax before sleep",
+    "Quick morning flow to wake up and boost energy",
+    "Improve hip flexibility for a runner",
+    "Core strength and balance for intermediate practitioners",
+    "Something easy for a complete beginner with stiff hamstrings",
+    "Back pain relief, nothing too intense",
+    "Open my shoulders and chest after a day at the desk",
+    "A challenging 60-minute practice with arm balances",
+    "Calm a scattered mind with slow breathing and stretches",
+    "Short warm-up before a workout",
+]
+
+
+def _courses() -> dict[str, str]:
+    return {c["name"]: c["description"] for c in json.loads((DATA_DIR / "array_course.json").read_text())["course"]}
+
+
+async def _llm_labels(api_type: str, courses: dict[str, str]) -> dict:
+    from services.llm_gateway import get_gateway
+
+    llm = get_gateway(api_type)
+    labels = {}
+    try:
+        for query in QUERIES:
+            answers, start = {}, time.perf_counter()
+            for name, description in courses.items():
+                response = await llm.complete(
+                    messages=[{"role": "user", "content": course_match_prompt(description, query)}],
+                    temperature=0.3,
+                    max_tokens=5,
+                )
+                answers[name] = response.choices[0].message.content.strip().lower()
+            labels[query] = {"answers": answers, "seconds": time.perf_counter() - start}
+    finally:
+        await llm.aclose()
+    return labels
+
+
+def _agreement(pairs: list[tuple[float, bool]], accept: float, reject: float) -> tuple[float, float]:
+    """(coverage, agreement) of thresholds over (score, llm_yes) pairs."""
+    decided = [(score >= accept, llm_yes) for score, llm_yes in pairs if score >= accept or score <= reject]
+    coverage = len(decided) / len(pairs)
+    agreement = sum(pred == truth for pred, truth in decided) / len(decided) if decided else 1.0
+    return coverage, agreement
+
+
+def _suggest(pairs: list[tuple[float, bool]], target: float) -> tuple[float, float, float, float] | None:
+    grid = [i / 100 for i in range(0, 101, 2)]
+    best = None
+    for accept in grid:
+        for reject in (r for r in grid if r < accept):
+            coverage, agreement = _agreement(pairs, accept, reject)
+            if agreement >= target and (best is None or coverage > best[2]):
+                best = (accept, reject, coverage, agreement)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api", choices=["openai", "deepseek", "local"], default="deepseek")
+    parser.add_argument("--labels", type=Path, default=DEFAULT_LABELS)
+    parser.add_argument("--refresh-labels", action="store_true")
+    parser.add_argument("--rerankers", nargs="+", default=["cross-encoder", "bi-encoder"])
+    parser.add_argument("--target-agreement", type=float, default=0.95)
+    args = parser.parse_args()
+
+    courses = _courses()
+    if args.labels.exists() and not args.refresh_labels:
+        labels = json.loads(args.labels.read_text())
+    else:
+        labels = asyncio.run(_llm_labels(args.api, courses))
+        args.labels.write_text(json.dumps(labels, indent=1))
+    llm_seconds = [labels[q]["seconds"] for q in QUERIES]
+
+    print(f"{len(QUERIES)} queries x {len(courses)} courses\n")
+    print(f"{'filter':<15}{'load s':>8}{'p50 ms/q':>10}{'max ms/q':>10}{'coverage':>10}{'agree':>8}")
+    print(f"{'llm (serial)':<15}{'-':>8}{statistics.median(llm_seconds) * 1000:>10.0f}"
+          f"{max(llm_seconds) * 1000:>10.0f}{'100%':>10}{'100%':>8}")
+
+    suggestions = []
+    for kind in args.rerankers:
+        reranker = Reranker(kind)
+        start = time.perf_counter()
+        reranker.score("warm-up", ["warm-up"])
+        load_s = time.perf_counter() - start
+
+        pairs, seconds = [], []
+        for query in QUERIES:
+            start = time.perf_counter()
+            scores = reranker.score(query, list(courses.values()))
+            seconds.append(time.perf_counter() - start)
+            answers = labels[query]["answers"]
+            pairs += [(score, answers[name] == "yes") for name, score in zip(courses, scores)]
+
+        coverage, agreement = _agreement(pairs, reranker.accept, reranker.reject)
+        print(f"{kind:<15}{load_s:>8.2f}{statistics.median(seconds) * 1000:>10.1f}{max(seconds) * 1000:>10.1f}"
+              f"{coverage:>10.0%}{agreement:>8.0%}")
+        suggestions.append((kind, _suggest(pairs, args.target_agreement)))
+
+    print(f"\nSuggested thresholds (highest coverage at >= {args.target_agreement:.0%} agreement):")
+    for kind, best in suggestions:
+        if best is None:
+            print(f"  {kind}: none reaches the target; keep the LLM filter")
+        else:
+            accept, reject, coverage, agreement = best
+            print(f"  COURSE_RERANKER={kind} COURSE_RERANK_ACCEPT={accept:.2f} COURSE_RERANK_REJECT={reject:.2f}"
+                  f"  (coverage {coverage:.0%}, agreement {agreement:.0%})")
+
+
+if __name__ == "__main__":
+    main()
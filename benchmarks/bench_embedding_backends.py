@@ -0,0 +1,128 @@
+"""Parity check and CPU throughput benchmark for the embedding backends.
+
+Encodes the catalog documents (poses, courses, categories) plus a set of short
+query keywords with every requested backend and compares them against the
+PyTorch fp32 reference used to build the Qdrant collections:
+
+• parity   – cosine similarity between each backend vector and the torch
+  vector of the same text (min / mean), and top-1 agreement of keyword
+  queries against the catalog documents.
+• speed    – texts/second for batched document encoding and for single
+  keyword encodes (the query path), plus process RSS after loading.
+
+Exits with status 1 if any backend's minimum cosine falls below
+``--min-cosine`` so it can be used as a gate before switching
+``EMBEDDING_BACKEND`` in production.
+
+    python benchmarks/bench_embedding_backends.py --backends torch onnx onnx-int8 torch-int8
+"""
+import argparse
+import json
+import resource
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from services.vector_store import load_embedding_model
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+KEYWORDS = [
+    "balance", "core strength", "hamstrings", "calm a scattered mind",
+    "back pain", "hip flexibility", "shoulder mobility", "relaxation before sleep",
+    "energy boost", "wrist pressure", "neck tension", "breathing",
+]
+
+
+def _catalog_texts() -> list[str]:
+    poses = json.loads((DATA_DIR / "array_pose.json").read_text())["pose"]
+    courses = json.loads((DATA_DIR / "array_course.json").read_text())["course"]
+    categories = json.loads((DATA_DIR / "array_category.json").read_text())["category"]
+    texts = [
+        "\n".join([
+            "Introduction: " + p.get("introduction", ""),
+            "Steps: " + " ".join(p.get("steps", [])),
+            "Effects: " + p.get("effects", ""),
+        ])
+        for p in poses
+    ]
+    texts += [f"Course: {c['name']}\nDescription: {c['description']}\n" for c in courses]
+    texts += [f"Category: {c['name']}\nIntroduction: {c.get('introduction', '')}\n" for c in categories]
+    return texts
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_backend(backend: str, docs: list[str], repeats: int) -> dict:
+    start = time.perf_counter()
+    model = load_embedding_model(backend)
+    load_s = time.perf_counter() - start
+
+    model.encode(KEYWORDS)  # warm-up
+
+    start = time.perf_counter()
+    doc_vecs = model.encode(docs, batch_size=32)
+    doc_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for kw in KEYWORDS:
+            model.encode([kw])
+    query_s = time.perf_counter() - start
+
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "docs_per_s": len(docs) / doc_s,
+        "queries_per_s": repeats * len(KEYWORDS) / query_s,
+        "rss_mb": _rss_mb(),
+        "doc_vecs": _normalize(np.asarray(doc_vecs, dtype=np.float32)),
+        "kw_vecs": _normalize(np.asarray(model.encode(KEYWORDS), dtype=np.float32)),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8", "torch-int8"])
+    parser.add_argument("--repeats", type=int, default=5, help="Passes over the keyword list for query timing.")
+    parser.add_argument("--min-cosine", type=float, default=0.98, help="Parity threshold against torch fp32.")
+    args = parser.parse_args()
+
+    docs = _catalog_texts()
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    results = [bench_backend(b, docs, args.repeats) for b in backends]
+    ref = results[0]
+    ref_top1 = (ref["kw_vecs"] @ ref["doc_vecs"].T).argmax(axis=1)
+
+    failed = False
+    print(f"{len(docs)} documents, {len(KEYWORDS)} keywords\n")
+    print(f"{'backend':<12}{'load s':>8}{'docs/s':>10}{'query/s':>10}{'RSS MB':>9}"
+          f"{'cos min':>9}{'cos mean':>10}{'top1 agree':>12}")
+    for res in results:
+        all_ref = np.vstack([ref["doc_vecs"], ref["kw_vecs"]])
+        all_vec = np.vstack([res["doc_vecs"], res["kw_vecs"]])
+        cosines = (all_ref * all_vec).sum(axis=1)
+        top1 = (res["kw_vecs"] @ res["doc_vecs"].T).argmax(axis=1)
+        agree = float((top1 == ref_top1).mean())
+        ok = cosines.min() >= args.min_cosine
+        failed |= not ok
+        print(f"{res['backend']:<12}{res['load_s']:>8.2f}{res['docs_per_s']:>10.1f}{res['queries_per_s']:>10.1f}"
+              f"{res['rss_mb']:>9.0f}{cosines.min():>9.4f}{cosines.mean():>10.4f}{agree:>12.0%}"
+              f"{'' if ok else '  FAIL'}")
+    print("\nRSS is the process high-water mark, so it is cumulative across backends; "
+          "run one backend per process for absolute numbers.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
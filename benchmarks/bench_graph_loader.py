@@ -0,0 +1,151 @@
+"""Per-row vs UNWIND-batched loading of pose edges and course steps.
+
+Loads the inter-pose relationships and the courses twice into an empty
+Neo4j database: once with the per-row functions (``create_pose_relationships``
+per pose, ``create_course_nodes``), once with the bulk loaders
+(``bulk_load_pose_relationships``, ``bulk_load_courses``).  Both runs start
+from the same reference and pose nodes.  It reports wall time and rows/s for
+each, then compares a canonical dump of the two graphs (every node and
+relationship with its properties, duplicates included).
+
+``--scale N`` replicates the catalog N times with renamed poses and courses
+to approximate a larger catalog (``--scale 300`` is about 50k poses).
+
+Exits with status 1 if the graphs differ.  The database is wiped before each
+run, so point ``NEO4J_URI`` at a scratch instance and pass ``--wipe``.
+
+    python benchmarks/bench_graph_loader.py --wipe --scale 20 --chunk-size 5000
+"""
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import build_graphrag as bg
+from neo4j import GraphDatabase
+
+
+def scaled_catalog(poses: list[dict], courses: list[dict], scale: int) -> tuple[list[dict], list[dict]]:
+    """Replicate poses and courses *scale* times; copy k > 0 suffixes every name (and edge target) with " #k"."""
+    if scale <= 1:
+        return poses, courses
+
+    def rename(name: str, k: int) -> str:
+        return name if k == 0 else f"{name} #{k}"
+
+    scaled_poses, scaled_courses = [], []
+    for k in range(scale):
+        for pose in poses:
+            copy = dict(pose, name=rename(pose["name"], k))
+            for field in bg.POSE_RELATIONSHIP_FIELDS.values():
+                copy[field] = [rename(t, k) for t in pose.get(field, [])]
+            scaled_poses.append(copy)
+        for course in courses:
+            scaled_courses.append(dict(
+                course,
+                name=rename(course["name"], k),
+                sequence=[dict(step, pose=rename(step["pose"], k)) for step in course["sequence"]],
+            ))
+    return scaled_poses, scaled_courses
+
+
+def _prepare(driver, poses: list[dict]) -> None:
+    """Empty the database and create the reference and pose nodes both loaders start from."""
+    bg.delete_neo4j_database(driver)
+    with driver.session() as session:
+        session.execute_write(bg.create_neo4j_nodes, "Attribute", bg.capitalize_attribute_names(bg.load_json_data(bg.ATTRIBUTE_JSON)["attribute"]), "name")
+        session.execute_write(bg.create_neo4j_nodes, "Category", bg.load_json_data(bg.CATEGORY_JSON)["category"], "name")
+        session.execute_write(bg.create_neo4j_nodes, "Challenge", bg.load_json_data(bg.CHALLENGE_JSON)["challenge"], "level")
+        for offset in range(0, len(poses), bg.BULK_CHUNK_SIZE):
+            session.execute_write(bg.create_neo4j_nodes, "Pose", poses[offset:offset + bg.BULK_CHUNK_SIZE], "name")
+
+
+def _load_per_row(driver, poses: list[dict], courses: list[dict]) -> None:
+    with driver.session() as session:
+        for pose in poses:
+            session.execute_write(bg.create_pose_relationships, pose)
+        session.execute_write(bg.create_course_nodes, courses)
+
+
+def _load_bulk(driver, poses: list[dict], courses: list[dict], chunk_size: int) -> None:
+    with driver.session() as session:
+        bg.bulk_load_pose_relationships(session, poses, chunk_size)
+        bg.bulk_load_courses(session, courses, chunk_size)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _dump(driver) -> tuple[Counter, Counter]:
+    """Multisets of (labels, properties) nodes and (start, type, properties, end) relationships."""
+    with driver.session() as session:
+        nodes = Counter(
+            (tuple(sorted(r["labels"])), _freeze(r["props"]))
+            for r in session.run("MATCH (n) RETURN labels(n) AS labels, properties(n) AS props")
+        )
+        rels = Counter(
+            (tuple(sorted(r["a_labels"])), r["a_id"], r["type"], _freeze(r["props"]), tuple(sorted(r["b_labels"])), r["b_id"])
+            for r in session.run(
+                "MATCH (a)-[r]->(b) RETURN labels(a) AS a_labels, a.id AS a_id, type(r) AS type, "
+                "properties(r) AS props, labels(b) AS b_labels, b.id AS b_id"
+            )
+        )
+    return nodes, rels
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=1, help="Replicate the catalog this many times.")
+    parser.add_argument("--chunk-size", type=int, default=bg.BULK_CHUNK_SIZE, help="Rows per UNWIND transaction.")
+    parser.add_argument("--skip-per-row", action="store_true", help="Only time the bulk loader (no comparison).")
+    parser.add_argument("--wipe", action="store_true", help="Confirm that the target database may be wiped.")
+    args = parser.parse_args()
+    if not args.wipe:
+        parser.error("this benchmark deletes every node in NEO4J_URI; pass --wipe to confirm")
+
+    poses, courses = scaled_catalog(
+        bg.load_json_data(bg.POSE_JSON)["pose"], bg.load_json_data(bg.COURSE_JSON)["course"], args.scale
+    )
+    edges = sum(len(rows) for rows in bg.pose_relationship_rows(poses).values())
+    steps = len(bg.course_step_rows(courses))
+    rows = edges + steps + 2 * len(courses)
+    print(f"{len(poses)} poses, {edges} pose edges, {len(courses)} courses, {steps} course steps\n")
+
+    driver = GraphDatabase.driver(bg.NEO4J_URI, auth=(bg.NEO4J_USER, bg.NEO4J_PASSWORD))
+    try:
+        results = {}
+        loaders = [("bulk", lambda: _load_bulk(driver, poses, courses, args.chunk_size))]
+        if not args.skip_per_row:
+            loaders.insert(0, ("per-row", lambda: _load_per_row(driver, poses, courses)))
+        for name, load in loaders:
+            _prepare(driver, poses)
+            start = time.perf_counter()
+            load()
+            elapsed = time.perf_counter() - start
+            results[name] = (elapsed, _dump(driver))
+            print(f"{name:<8} {elapsed:8.2f}s  {rows / elapsed:>10,.0f} rows/s\n")
+    finally:
+        driver.close()
+
+    if "per-row" in results:
+        per_row_s, per_row_graph = results["per-row"]
+        bulk_s, bulk_graph = results["bulk"]
+        print(f"speed-up: {per_row_s / bulk_s:.1f}x")
+        if per_row_graph != bulk_graph:
+            for kind, a, b in zip(("nodes", "relationships"), per_row_graph, bulk_graph):
+                print(f"{kind}: {sum((a - b).values())} only per-row, {sum((b - a).values())} only bulk")
+            print("❌ graphs differ")
+            sys.exit(1)
+        print("✅ graphs are identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Graph build time and lookup latency without and with the Neo4j schema.
+
+Builds a (optionally enlarged, ``--scale``) catalog twice into an empty
+database: first with every constraint and index from
+``build_graphrag.ensure_schema`` dropped, then with them created before
+loading.  For each run it reports the build time (reference and pose nodes,
+pose links, pose edges, courses) and the median / p95 latency of the lookups
+the agents and the pose checker issue, over ``--repeats`` random ids.  It ends
+with the ``--verify-schema`` plan check.
+
+The schema is left in place afterwards.  The database is wiped, so point
+``NEO4J_URI`` at a scratch instance and pass ``--wipe``.
+
+    python benchmarks/bench_graph_schema.py --wipe --scale 50 --repeats 200
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import build_graphrag as bg
+from neo4j import GraphDatabase
+
+from bench_graph_loader import scaled_catalog
+
+# name -> (query, parameter builder taking (rng, pose names, course names, category names))
+LOOKUPS = {
+    "pose by id": (
+        bg.SCHEMA_CHECK_QUERIES["pose by id"],
+        lambda rng, poses, courses, categories: {"id": rng.choice(poses)},
+    ),
+    "poses by id list": (
+        bg.SCHEMA_CHECK_QUERIES["poses by id list"],
+        lambda rng, poses, courses, categories: {"ids": rng.sample(poses, 10)},
+    ),
+    "course sequence": (
+        bg.SCHEMA_CHECK_QUERIES["course by id"],
+        lambda rng, poses, courses, categories: {"id": rng.choice(courses)},
+    ),
+    "category poses": (
+        bg.SCHEMA_CHECK_QUERIES["category poses"],
+        lambda rng, poses, courses, categories: {"id": rng.choice(categories)},
+    ),
+    "replacement candidates": (
+        "MATCH (original:Pose {id: $id})-[:IN_CATEGORY]->(cat:Category)<-[:IN_CATEGORY]-(replacement:Pose) "
+        "WHERE original <> replacement RETURN replacement.id LIMIT 20",
+        lambda rng, poses, courses, categories: {"id": rng.choice(poses)},
+    ),
+}
+
+
+def _build(driver, poses: list[dict], courses: list[dict]) -> None:
+    """The graph part of build_knowledge_graph that the schema affects, for a given catalog."""
+    with driver.session() as session:
+        session.execute_write(bg.create_neo4j_nodes, "Attribute", bg.capitalize_attribute_names(bg.load_json_data(bg.ATTRIBUTE_JSON)["attribute"]), "name")
+        session.execute_write(bg.create_neo4j_nodes, "Category", bg.load_json_data(bg.CATEGORY_JSON)["category"], "name")
+        session.execute_write(bg.create_neo4j_nodes, "Challenge", bg.load_json_data(bg.CHALLENGE_JSON)["challenge"], "level")
+        for offset in range(0, len(poses), bg.BULK_CHUNK_SIZE):
+            session.execute_write(bg.create_neo4j_nodes, "Pose", poses[offset:offset + bg.BULK_CHUNK_SIZE], "name")
+        session.execute_write(lambda tx: tx.run("MATCH (p:Pose) SET p.challenge = toInteger(p.challenge)"))
+        session.execute_write(bg.link_pose_to_references)
+        bg.bulk_load_pose_relationships(session, poses)
+        bg.bulk_load_courses(session, courses)
+
+
+def _latencies(driver, repeats: int, poses: list[str], courses: list[str], categories: list[str]) -> dict:
+    results = {}
+    with driver.session() as session:
+        for name, (query, params) in LOOKUPS.items():
+            rng = random.Random(0)  # same ids in both runs
+            session.run(query, **params(rng, poses, courses, categories)).consume()  # warm-up / plan cache
+            samples = []
+            for _ in range(repeats):
+                kwargs = params(rng, poses, courses, categories)
+                start = time.perf_counter()
+                session.run(query, **kwargs).consume()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            results[name] = (statistics.median(samples), samples[int(len(samples) * 0.95) - 1])
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=20, help="Replicate the catalog this many times.")
+    parser.add_argument("--repeats", type=int, default=200, help="Timed runs per lookup.")
+    parser.add_argument("--wipe", action="store_true", help="Confirm that the target database may be wiped.")
+    args = parser.parse_args()
+    if not args.wipe:
+        parser.error("this benchmark deletes every node in NEO4J_URI; pass --wipe to confirm")
+
+    poses, courses = scaled_catalog(
+        bg.load_json_data(bg.POSE_JSON)["pose"], bg.load_json_data(bg.COURSE_JSON)["course"], args.scale
+    )
+    pose_names = [p["name"] for p in poses]
+    course_names = [c["name"] for c in courses]
+    categories = [c["name"] for c in bg.load_json_data(bg.CATEGORY_JSON)["category"]]
+    print(f"{len(poses)} poses, {len(courses)} courses\n")
+
+    driver = GraphDatabase.driver(bg.NEO4J_URI, auth=(bg.NEO4J_USER, bg.NEO4J_PASSWORD))
+    runs = {}
+    try:
+        for label, with_schema in (("no schema", False), ("schema", True)):
+            bg.drop_schema(driver)
+            bg.delete_neo4j_database(driver)
+            start = time.perf_counter()
+            if with_schema:
+                bg.ensure_schema(driver)
+            _build(driver, poses, courses)
+            build_s = time.perf_counter() - start
+            runs[label] = (build_s, _latencies(driver, args.repeats, pose_names, course_names, categories))
+            print(f"{label}: built in {build_s:.2f}s\n")
+
+        print(f"{'':<24}{'no schema':>22}{'schema':>22}")
+        print(f"{'build (s)':<24}{runs['no schema'][0]:>22.2f}{runs['schema'][0]:>22.2f}")
+        for name in LOOKUPS:
+            cells = [f"{runs[label][1][name][0]:.2f} / {runs[label][1][name][1]:.2f}" for label in ("no schema", "schema")]
+            print(f"{name + ' (p50/p95 ms)':<24}{cells[0]:>22}{cells[1]:>22}")
+        print()
+        ok = bg.verify_schema(driver)
+    finally:
+        driver.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
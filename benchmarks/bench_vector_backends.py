@@ -0,0 +1,154 @@
+"""Benchmark the embedded NumPy index against the Qdrant server path.
+
+Loads synthetic, L2-normalised 384-d vectors (the MiniLM dimension) into a
+scratch collection of each backend and measures:
+
+• open   – time until the first query can be answered (for NumPy this is
+  mapping the files; for Qdrant it includes locating/spawning the server)
+• build  – time to write all vectors
+• query  – p50 / p99 latency of single ``query_points`` calls and of
+  5-keyword ``query_batch_points`` calls (the shape the agents issue)
+• recall – top-k overlap of Qdrant (HNSW, approximate) with the exact
+  NumPy result
+
+    python benchmarks/bench_vector_backends.py --sizes 1000 100000 1000000
+
+The 1M case needs ~1.5 GB for the matrix; pass ``--skip-qdrant`` to time the
+NumPy path alone.
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from services.numpy_index import NumpyVectorStore, QueryRequest
+
+DIM = 384
+COLLECTION = "bench_vectors"
+UPSERT_BATCH = 10_000
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _synthetic(n: int, rng: np.random.Generator) -> np.ndarray:
+    vectors = rng.standard_normal((n, DIM), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _time_queries(query_one, query_batch, queries: np.ndarray) -> dict:
+    single, batched = [], []
+    for q in queries:
+        start = time.perf_counter()
+        query_one(q)
+        single.append(time.perf_counter() - start)
+    for i in range(0, len(queries) - 4, 5):
+        start = time.perf_counter()
+        query_batch(queries[i:i + 5])
+        batched.append(time.perf_counter() - start)
+    return {
+        "p50_ms": statistics.median(single) * 1000,
+        "p99_ms": _percentile(single, 99) * 1000,
+        "batch5_p50_ms": statistics.median(batched) * 1000,
+        "batch5_p99_ms": _percentile(batched, 99) * 1000,
+    }
+
+
+def bench_numpy(vectors: np.ndarray, queries: np.ndarray, k: int) -> tuple[dict, list[list[str]]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = NumpyVectorStore(tmp)
+        start = time.perf_counter()
+        store.create_collection(COLLECTION, DIM)
+        store.upsert(COLLECTION, SimpleNamespace(
+            ids=[str(i) for i in range(len(vectors))], vectors=vectors, payloads=[{} for _ in range(len(vectors))],
+        ))
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reader = NumpyVectorStore(tmp)  # fresh process-like open
+        reader.query_points(COLLECTION, queries[0], limit=k)
+        open_s = time.perf_counter() - start
+
+        stats = _time_queries(
+            lambda q: reader.query_points(COLLECTION, q, limit=k),
+            lambda qs: reader.query_batch_points(COLLECTION, [QueryRequest(query=q, limit=k) for q in qs]),
+            queries,
+        )
+        exact = [[p.id for p in reader.query_points(COLLECTION, q, limit=k).points] for q in queries]
+    return {"backend": "numpy", "open_s": open_s, "build_s": build_s, **stats}, exact
+
+
+def bench_qdrant(vectors: np.ndarray, queries: np.ndarray, k: int, exact: list[list[str]]) -> dict:
+    from qdrant_client import models
+    from services.vector_store import get_client
+
+    start = time.perf_counter()
+    client = get_client()
+    client.get_collections()
+    open_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    client.recreate_collection(
+        collection_name=COLLECTION,
+        vectors_config=models.VectorParams(size=DIM, distance=models.Distance.COSINE),
+    )
+    for i in range(0, len(vectors), UPSERT_BATCH):
+        chunk = vectors[i:i + UPSERT_BATCH]
+        client.upsert(
+            collection_name=COLLECTION,
+            wait=True,
+            points=models.Batch(ids=list(range(i, i + len(chunk))), vectors=chunk.tolist()),
+        )
+    build_s = time.perf_counter() - start
+
+    try:
+        stats = _time_queries(
+            lambda q: client.query_points(COLLECTION, query=q.tolist(), limit=k),
+            lambda qs: client.query_batch_points(
+                COLLECTION, requests=[models.QueryRequest(query=q.tolist(), limit=k) for q in qs]
+            ),
+            queries,
+        )
+        hits = [[str(p.id) for p in client.query_points(COLLECTION, query=q.tolist(), limit=k).points] for q in queries]
+        recall = statistics.mean(len(set(h) & set(e)) / k for h, e in zip(hits, exact))
+    finally:
+        client.delete_collection(COLLECTION)
+    return {"backend": "qdrant", "open_s": open_s, "build_s": build_s, **stats, "recall": recall}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--skip-qdrant", action="store_true")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = _synthetic(args.queries, rng)
+    print(f"{'n':>9} {'backend':<8}{'open s':>9}{'build s':>9}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'b5 p50':>9}{'b5 p99':>9}{'recall':>8}")
+    for n in args.sizes:
+        vectors = _synthetic(n, rng)
+        rows = []
+        res, exact = bench_numpy(vectors, queries, args.k)
+        rows.append(res)
+        if not args.skip_qdrant:
+            rows.append(bench_qdrant(vectors, queries, args.k, exact))
+        for r in rows:
+            recall = f"{r['recall']:.3f}" if "recall" in r else "exact"
+            print(f"{n:>9} {r['backend']:<8}{r['open_s']:>9.3f}{r['build_s']:>9.2f}{r['p50_ms']:>9.2f}"
+                  f"{r['p99_ms']:>9.2f}{r['batch5_p50_ms']:>9.2f}{r['batch5_p99_ms']:>9.2f}{recall:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Import-time budget check for the entry points that must start fast.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter for
+the runner, the agent servers and the pose checker, and compares the
+cumulative import time of the top-level module against a budget.  The runner
+and ``services.vector_store`` must also not pull in the heavy libraries that
+``vector_store`` now loads on first use.
+
+Exits with status 1 if any module is over budget (after taking the best of
+``--repeats`` runs, to ride out a cold page cache) or imports a forbidden
+module, so it can gate changes that add top-level imports.
+
+    python benchmarks/check_import_time.py --repeats 3
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# module -> budget in milliseconds (cumulative import time)
+BUDGETS_MS = {
+    "services.vector_store": 300,
+    "yoga_application_runner": 800,
+    "services.pose_checker.server": 2500,
+    "agents.course_finder_adk.server": 2500,
+    "agents.category_recommender_adk.server": 2500,
+}
+HEAVY_MODULES = ("torch", "sentence_transformers", "qdrant_client", "numpy")
+MUST_STAY_LIGHT = ("services.vector_store", "yoga_application_runner")
+
+
+def _import_profile(module: str) -> tuple[dict[str, int], str]:
+    """Return ({imported module: cumulative µs}, stderr) for one fresh import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env={**os.environ, "PYTHONPATH": str(REPO_ROOT)},
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times, proc.stderr
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--modules", nargs="+", default=list(BUDGETS_MS))
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<42}{'best ms':>9}{'budget':>9}  status")
+    for module in args.modules:
+        try:
+            runs = [_import_profile(module)[0] for _ in range(args.repeats)]
+        except RuntimeError as exc:
+            print(f"{module:<42}{'-':>9}{BUDGETS_MS.get(module, 0):>9}  ERROR {exc}")
+            failed = True
+            continue
+        best_ms = min(r[module] for r in runs) / 1000
+        budget = BUDGETS_MS.get(module)
+        problems = []
+        if budget is not None and best_ms > budget:
+            problems.append("over budget")
+        if module in MUST_STAY_LIGHT:
+            heavy = sorted(m for m in HEAVY_MODULES if m in runs[0])
+            if heavy:
+                problems.append("imports " + ", ".join(heavy))
+        failed |= bool(problems)
+        print(f"{module:<42}{best_ms:>9.1f}{budget or 0:>9}  {'; '.join(problems) or 'ok'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
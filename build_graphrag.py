@@ -1,8 +1,16 @@
 import os, json
+import re
+import argparse
+import asyncio
+import hashlib
+import time
 from pathlib import Path
 import logging
 from neo4j import GraphDatabase
-from services.vector_store import get_client, embed, recreate_collection, str2uuid, shutdown_server
+from services.vector_store import (
+    COLLECTION_PROFILES, get_client, get_profile, embed, embedding_model_id, match_profile, record_embedding_backend,
+    recreate_collection, str2uuid, shutdown_server,
+)
 import shutil
 from qdrant_client import models
 
@@ -18,9 +26,27 @@ ATTRIBUTE_JSON = f"{INPUT_DATA_DIR}/array_attribute.json"
 CATEGORY_JSON = f"{INPUT_DATA_DIR}/array_category.json"
 CHALLENGE_JSON = f"{INPUT_DATA_DIR}/array_challenge.json"
 COURSE_JSON = f"{INPUT_DATA_DIR}/array_course.json"
+HEALTH_ISSUE_JSON = f"{INPUT_DATA_DIR}/array_health_issue.json"
+ANATOMY_JSON = f"{INPUT_DATA_DIR}/array_anatomical.json"
 QDRANT_COLLECTION_POSE = "yoga_pose"
 QDRANT_COLLECTION_COURSE = "yoga_course"
 QDRANT_COLLECTION_CATEGORY = "yoga_category"
+QDRANT_COLLECTION_HEALTH_ISSUE = "yoga_health_issue"
+QDRANT_COLLECTION_ANATOMY = "yoga_anatomy"
+# Pose x health-issue suitability verdicts survive rebuilds here (keyed by a
+# hash of the pose and issue text), so only new or edited records cost LLM calls.
+HEALTH_MATRIX_CACHE = Path(__file__).resolve().parent / ".health_issue_matrix.json"
+HEALTH_MATRIX_CHUNK = 40  # poses judged per LLM call
+HEALTH_MATRIX_CONCURRENCY = 8
+# Rows written per UNWIND transaction by the bulk graph loaders.
+BULK_CHUNK_SIZE = int(os.getenv("GRAPH_BULK_CHUNK_SIZE", "5000"))
+# Pose relationship type -> pose JSON field listing the target poses
+POSE_RELATIONSHIP_FIELDS = {
+    "BUILD_UP": "build_up",
+    "MOVE_FORWARD": "move_forward",
+    "BALANCE_OUT": "balance_out",
+    "UNWIND": "unwind",
+}
 
 def delete_chroma_collection(chroma_client, collection_name: str):
     existing = [col.name for col in chroma_client.list_collections()]
@@ -30,6 +56,76 @@ def delete_chroma_collection(chroma_client, collection_name: str):
     else:
         print(f"⚠️ Collection not found: {collection_name} - skipping deletion")
 
+# ---------------------------------------------------------------------------
+# Schema: every lookup in the repo matches a label by its id, so each label
+# gets a uniqueness constraint (backed by an index).
+# ---------------------------------------------------------------------------
+
+# label -> key property with a uniqueness constraint
+UNIQUE_KEYS = {
+    "Pose": "id",
+    "Course": "id",
+    "Category": "id",
+    "Attribute": "id",
+    "Challenge": "id",
+    "HealthIssue": "id",
+    "Anatomy": "id",
+    "Catalog": "id",
+}
+# Representative lookups of the agents, the pose checker and the build; --verify-schema
+# checks that each plan starts from an index seek.
+SCHEMA_CHECK_QUERIES = {
+    "pose by id": "MATCH (p:Pose {id: $id}) RETURN p.caution",
+    "poses by id list": "MATCH (p:Pose) WHERE p.id IN $ids RETURN p.id",
+    "course by id": "MATCH (c:Course {id: $id})-[:INCLUDES_POSE]->(p:Pose) RETURN p.id",
+    "category poses": "MATCH (c:Category {id: $id})<-[:IN_CATEGORY]-(p:Pose) RETURN p.id",
+    "challenge by id": "MATCH (ch:Challenge {id: $id}) RETURN ch.id",
+    "health issue by id": "MATCH (h:HealthIssue {id: $id}) RETURN h.id",
+    "anatomy by id": "MATCH (a:Anatomy {id: $id}) RETURN a.id",
+    "catalog stamp": "MATCH (c:Catalog {id: $id}) RETURN c.version",
+    "merge pose (build)": "MERGE (p:Pose {id: $id})",
+    "merge course (build)": "MERGE (c:Course {id: $id})",
+}
+
+def _constraint_names() -> list[str]:
+    return [f"{label.lower()}_{prop}_unique" for label, prop in UNIQUE_KEYS.items()]
+
+def ensure_schema(driver):
+    """Create the uniqueness constraints (idempotent) and wait until their indexes are online."""
+    constraints = _constraint_names()
+    with driver.session() as session:
+        for name, (label, prop) in zip(constraints, UNIQUE_KEYS.items()):
+            session.run(f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE").consume()
+        session.run("CALL db.awaitIndexes(300)").consume()
+    print(f"Schema ready: {len(constraints)} uniqueness constraints")
+
+def drop_schema(driver):
+    """Drop what ensure_schema creates (used by benchmarks to measure the unindexed baseline)."""
+    with driver.session() as session:
+        for name in _constraint_names():
+            session.run(f"DROP CONSTRAINT {name} IF EXISTS").consume()
+
+def _plan_operators(plan: dict) -> list[str]:
+    operators = [plan["operatorType"]]
+    for child in plan.get("children", []):
+        operators += _plan_operators(child)
+    return operators
+
+def verify_schema(driver) -> bool:
+    """EXPLAIN every SCHEMA_CHECK_QUERIES entry and report whether its plan uses an index seek."""
+    ok = True
+    with driver.session() as session:
+        for name, query in SCHEMA_CHECK_QUERIES.items():
+            plan = session.run("EXPLAIN " + query, id="", ids=[]).consume().plan
+            operators = [op.split("@")[0] for op in _plan_operators(plan)]
+            seeks = [op for op in operators if "IndexSeek" in op]
+            scans = [op for op in operators if op in ("NodeByLabelScan", "AllNodesScan")]
+            passed = bool(seeks) and not scans
+            ok &= passed
+            detail = ", ".join(seeks or scans or operators[-1:])
+            print(f"{'✅' if passed else '❌'} {name}: {detail}")
+    return ok
+
 def delete_neo4j_database(driver):
     """Clear existing data in Neo4j and ChromaDB"""
     with driver.session() as session:
@@ -40,6 +136,14 @@ def load_json_data(file_path):
     with open(file_path) as f:
         return json.load(f)
 
+def capitalize_attribute_names(attributes):
+    """Attribute names with the first letter upper-cased, as Pose.attribute spells them.
+
+    Done before the MERGE so names differing only in that letter become one node
+    instead of violating the Attribute id constraint.
+    """
+    return [dict(a, name=a["name"][:1].upper() + a["name"][1:]) for a in attributes]
+
 def create_neo4j_nodes(tx, node_type, items, id_field):
     """Create nodes in Neo4j"""
     query = f"""
@@ -136,13 +240,270 @@ def create_course_nodes(tx, courses):
         # Link course to challenge
         tx.run("""
         MATCH (c:Course {id: $name})
-        MATCH (ch:Challenge {level: $challenge})
+        MATCH (ch:Challenge {id: toInteger($challenge)})
         MERGE (c)-[:HAS_CHALLENGE]->(ch)
         """,
         name=course["name"],
         challenge=course["challenge"])
 
-def build_knowledge_graph(driver):
+# ---------------------------------------------------------------------------
+# Bulk loaders: the per-row functions above flattened into parameter lists and
+# written with UNWIND, BULK_CHUNK_SIZE rows per transaction.  They build the
+# same graph (see benchmarks/bench_graph_loader.py).
+# ---------------------------------------------------------------------------
+
+def pose_relationship_rows(poses: list[dict]) -> dict[str, list[dict]]:
+    """Return {relationship type: [{source, target}, ...]} for all inter-pose edges."""
+    rows = {rel_type: [] for rel_type in POSE_RELATIONSHIP_FIELDS}
+    for pose in poses:
+        for rel_type, field in POSE_RELATIONSHIP_FIELDS.items():
+            rows[rel_type].extend({"source": pose["name"], "target": target} for target in pose.get(field, []))
+    return rows
+
+def course_step_rows(courses: list[dict]) -> list[dict]:
+    """Return one row per course sequence step, with the same id/order as create_course_nodes."""
+    return [
+        {
+            "course_name": course["name"],
+            "pose_name": step["pose"],
+            "rel_id": f"{course['name']}_{step['pose']}_{i}",
+            "order": i + 1,
+            "duration_seconds": step["duration_seconds"],
+            "repeat_times": step["repeat_times"],
+            "transition_notes": step["transition_notes"],
+            "action_note": step["action_note"],
+        }
+        for course in courses
+        for i, step in enumerate(course["sequence"])
+    ]
+
+def _write_rows(tx, query: str, rows: list[dict]):
+    tx.run(query, rows=rows).consume()
+
+def write_in_chunks(session, query: str, rows: list[dict], label: str, chunk_size: int = BULK_CHUNK_SIZE) -> float:
+    """Run *query* (which UNWINDs $rows) over *rows* in chunk_size transactions; returns seconds taken."""
+    start = time.perf_counter()
+    for offset in range(0, len(rows), chunk_size):
+        session.execute_write(_write_rows, query, rows[offset:offset + chunk_size])
+    elapsed = time.perf_counter() - start
+    rate = len(rows) / elapsed if elapsed > 0 else float("inf")
+    print(f"Loaded {len(rows)} {label} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+    return elapsed
+
+def bulk_load_pose_relationships(session, poses: list[dict], chunk_size: int = BULK_CHUNK_SIZE):
+    """UNWIND version of create_pose_relationships for every pose (one query per relationship type)."""
+    for rel_type, rows in pose_relationship_rows(poses).items():
+        write_in_chunks(session, """
+            UNWIND $rows AS row
+            MATCH (source:Pose {id: row.source})
+            MATCH (target:Pose {id: row.target})
+            MERGE (source)-[:%s]->(target)
+            """ % rel_type, rows, rel_type, chunk_size)
+
+def bulk_load_courses(session, courses: list[dict], chunk_size: int = BULK_CHUNK_SIZE):
+    """UNWIND version of create_course_nodes: course nodes, sequence steps, challenge links."""
+    course_rows = [
+        {
+            "name": course["name"],
+            "challenge": course["challenge"],
+            "description": course["description"],
+            "total_duration": course["total_duration"],
+        }
+        for course in courses
+    ]
+    write_in_chunks(session, """
+        UNWIND $rows AS row
+        MERGE (c:Course {id: row.name})
+        SET c += {
+            challenge: row.challenge,
+            description: row.description,
+            total_duration: row.total_duration
+        }
+        """, course_rows, "course", chunk_size)
+    write_in_chunks(session, """
+        UNWIND $rows AS row
+        MATCH (c:Course {id: row.course_name})
+        MATCH (p:Pose {id: row.pose_name})
+        MERGE (c)-[rel:INCLUDES_POSE {
+            id: row.rel_id,
+            order: row.order
+        }]->(p)
+        SET rel += {
+            duration_seconds: row.duration_seconds,
+            repeat_times: row.repeat_times,
+            transition_note: row.transition_notes,
+            action_note: row.action_note
+        }
+        """, course_step_rows(courses), "course step", chunk_size)
+    write_in_chunks(session, """
+        UNWIND $rows AS row
+        MATCH (c:Course {id: row.name})
+        MATCH (ch:Challenge {id: toInteger(row.challenge)})
+        MERGE (c)-[:HAS_CHALLENGE]->(ch)
+        """, course_rows, "course challenge", chunk_size)
+
+# ---------------------------------------------------------------------------
+# Pose x health-issue suitability matrix
+# ---------------------------------------------------------------------------
+
+def _matrix_key(pose: dict, issue: dict) -> str:
+    """Cache key of one (pose, issue) verdict; changes whenever either record's text does."""
+    material = [pose["name"], pose.get("caution", ""), issue["name"], issue.get("description", ""), issue.get("caution", [])]
+    return hashlib.sha256(json.dumps(material).encode("utf-8")).hexdigest()
+
+
+async def _judge_issue_chunk(llm, semaphore: asyncio.Semaphore, issue: dict, poses: list[dict]) -> dict:
+    """Return {pose name: contraindicated?} for *poses* under one health issue (one LLM call)."""
+    pose_lines = "\n".join(f"- {p['name']}: {p.get('caution') or 'no caution'}" for p in poses)
+    prompt = (
+        f"Health issue: {issue['name']} ({issue.get('condition', '')}). {issue.get('description', '')}\n"
+        f"Practices to be careful with: {', '.join(issue.get('caution', []))}.\n"
+        "For each yoga pose below (name: practice caution), decide whether a person with this health issue "
+        "should avoid it.\n"
+        'Answer only with JSON of the form {"unsuitable": {"<pose name>": true or false, ...}} covering every pose.\n'
+        f"Poses:\n{pose_lines}"
+    )
+    async with semaphore:
+        response = await llm.complete(
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.0,
+            response_format={"type": "json_object"}
+        )
+    verdicts = json.loads(response.choices[0].message.content).get("unsuitable", {})
+    return {p["name"]: verdicts.get(p["name"]) for p in poses}
+
+
+async def _judge_health_matrix(api_type: str, chunks: list[tuple[dict, list[dict]]]) -> list:
+    """Judge every (issue, poses) chunk concurrently; failed chunks come back as exceptions."""
+    from services.llm_gateway import get_gateway
+
+    llm = get_gateway(api_type)
+    semaphore = asyncio.Semaphore(HEALTH_MATRIX_CONCURRENCY)
+    try:
+        results = await asyncio.gather(
+            *(_judge_issue_chunk(llm, semaphore, issue, poses) for issue, poses in chunks),
+            return_exceptions=True,
+        )
+        print(f"Health-issue matrix LLM usage: {llm.stats()}")
+        return results
+    finally:
+        await llm.aclose()
+
+
+def build_health_issue_matrix(poses: list[dict], issues: list[dict], api_type: str) -> tuple[dict[str, list[str]], list[str]]:
+    """Precompute which poses are contraindicated for each health issue.
+
+    Every (pose, issue) pair is judged once with batched LLM calls (one call per
+    issue per ``HEALTH_MATRIX_CHUNK`` poses) and cached in
+    ``HEALTH_MATRIX_CACHE``.  Pairs the model leaves unanswered (e.g. a failed
+    call) are left out of the matrix and not cached, so the next build asks
+    again; their issue is reported as incomplete, and the pose checker keeps
+    asking the LLM about it.
+
+    Returns:
+        tuple: (health issue name -> names of the poses to avoid with it,
+        names of the issues with unanswered pairs)
+    """
+    cache = json.loads(HEALTH_MATRIX_CACHE.read_text()) if HEALTH_MATRIX_CACHE.exists() else {}
+    chunks = []
+    for issue in issues:
+        missing = [p for p in poses if _matrix_key(p, issue) not in cache]
+        chunks += [(issue, missing[i:i + HEALTH_MATRIX_CHUNK]) for i in range(0, len(missing), HEALTH_MATRIX_CHUNK)]
+    pending = sum(len(chunk) for _, chunk in chunks)
+    print(f"Health-issue matrix: {len(poses) * len(issues) - pending} cached verdicts, {pending} to judge")
+
+    unanswered = set()
+    if chunks:
+        pose_by_name = {p["name"]: p for p in poses}
+        results = asyncio.run(_judge_health_matrix(api_type, chunks))
+        if all(isinstance(r, Exception) for r in results):
+            raise RuntimeError(f"every health-issue matrix call failed: {results[0]}")
+        for (issue, chunk), verdicts in zip(chunks, results):
+            if isinstance(verdicts, Exception):
+                logging.warning("Health-issue matrix call for '%s' failed: %s", issue["name"], verdicts)
+                verdicts = {p["name"]: None for p in chunk}
+            for pose_name, verdict in verdicts.items():
+                if isinstance(verdict, bool):
+                    cache[_matrix_key(pose_by_name[pose_name], issue)] = verdict
+                else:
+                    unanswered.add((pose_name, issue["name"]))
+        HEALTH_MATRIX_CACHE.write_text(json.dumps(cache))
+    incomplete = sorted({issue_name for _, issue_name in unanswered})
+    if unanswered:
+        print(f"⚠️ {len(unanswered)} pose/health-issue pairs unanswered; {len(incomplete)} issues left to the LLM")
+
+    matrix = {}
+    for issue in issues:
+        matrix[issue["name"]] = [p["name"] for p in poses if cache.get(_matrix_key(p, issue))]
+    return matrix, incomplete
+
+
+def link_health_issues(tx, matrix: dict[str, list[str]]):
+    """Create Pose-[:CONTRAINDICATED_FOR]->HealthIssue relationships from the matrix"""
+    rows = [{"pose": pose, "issue": issue} for issue, poses in matrix.items() for pose in poses]
+    tx.run("""
+    UNWIND $rows AS row
+    MATCH (p:Pose {id: row.pose})
+    MATCH (h:HealthIssue {id: row.issue})
+    MERGE (p)-[:CONTRAINDICATED_FOR]->(h)
+    """, rows=rows)
+
+
+# ---------------------------------------------------------------------------
+# Anatomy
+# ---------------------------------------------------------------------------
+
+def load_anatomy() -> dict[str, list[str]]:
+    """Return {body part: subparts} for every part, including subparts without their own entry."""
+    anatomy: dict[str, list[str]] = {}
+    for part in load_json_data(ANATOMY_JSON)["anatomical"]:
+        anatomy.setdefault(part["name"], [])
+        for sub in part.get("subparts", []):
+            if sub not in anatomy[part["name"]]:
+                anatomy[part["name"]].append(sub)
+            anatomy.setdefault(sub, [])
+    return anatomy
+
+
+def caution_body_parts(poses: list[dict], part_names) -> list[dict]:
+    """Rows {pose, part} for every body part named (singular or plural) in a pose's caution text."""
+    patterns = {name: re.compile(r"\b" + re.escape(name.lower()) + r"s?\b") for name in part_names}
+    rows = []
+    for pose in poses:
+        caution = (pose.get("caution") or "").lower()
+        rows += [{"pose": pose["name"], "part": name} for name, pat in patterns.items() if pat.search(caution)]
+    return rows
+
+
+def create_anatomy_graph(tx, anatomy: dict[str, list[str]], caution_rows: list[dict]):
+    """Create Anatomy nodes, (sub)-[:SUBPART_OF]->(part) and (Pose)-[:CAUTION_FOR]->(Anatomy) relationships"""
+    tx.run("UNWIND $names AS name MERGE (:Anatomy {id: name})", names=list(anatomy))
+    tx.run("""
+    UNWIND $rows AS row
+    MATCH (sub:Anatomy {id: row.sub})
+    MATCH (part:Anatomy {id: row.part})
+    MERGE (sub)-[:SUBPART_OF]->(part)
+    """, rows=[{"sub": sub, "part": part} for part, subs in anatomy.items() for sub in subs])
+    tx.run("""
+    UNWIND $rows AS row
+    MATCH (p:Pose {id: row.pose})
+    MATCH (a:Anatomy {id: row.part})
+    MERGE (p)-[:CAUTION_FOR]->(a)
+    """, rows=caution_rows)
+
+
+def catalog_version(health_matrix: dict[str, list[str]] | None = None, incomplete_issues=()) -> str:
+    """Content hash of the catalog data (and health matrix) the graph is built from."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(INPUT_DATA_DIR).glob("array_*.json")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    digest.update(json.dumps(health_matrix, sort_keys=True).encode("utf-8"))
+    digest.update(json.dumps(sorted(incomplete_issues)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def build_knowledge_graph(driver, health_matrix: dict[str, list[str]] | None = None, incomplete_issues=()):
     """Main function to build the knowledge graph"""   
     # Load data
     pose_data = load_json_data(POSE_JSON)["pose"]
@@ -150,10 +511,13 @@ def build_knowledge_graph(driver):
     categories = load_json_data(CATEGORY_JSON)["category"]
     challenges = load_json_data(CHALLENGE_JSON)["challenge"]
     courses = load_json_data(COURSE_JSON)["course"]
-    
+
+    # Constraints and indexes first, so every MERGE/MATCH below is an index seek
+    ensure_schema(driver)
+
     with driver.session() as session:
         # Create reference nodes
-        session.execute_write(create_neo4j_nodes, "Attribute", attributes, "name")
+        session.execute_write(create_neo4j_nodes, "Attribute", capitalize_attribute_names(attributes), "name")
         session.execute_write(create_neo4j_nodes, "Category", categories, "name")
         session.execute_write(create_neo4j_nodes, "Challenge", challenges, "level")
         
@@ -167,22 +531,40 @@ def build_knowledge_graph(driver):
                 SET p.challenge = toInteger(p.challenge)
                 """))
         
-        # update Attribute id to capital letter to match Pose.attribute
-        session.execute_write(
-            lambda tx: tx.run("""
-                MATCH (a:Attribute)
-                SET a.id = apoc.text.capitalize(a.id)
-            """))
-        
         # Link poses to references
         session.execute_write(link_pose_to_references)
         
-        # Create inter-pose relationships
-        for pose in pose_data:
-            session.execute_write(create_pose_relationships, pose)
+        # Create inter-pose relationships and courses
+        bulk_load_pose_relationships(session, pose_data)
+        bulk_load_courses(session, courses)
 
-        # create courses
-        session.execute_write(create_course_nodes, courses)
+        # Body parts and the poses whose caution mentions them
+        anatomy = load_anatomy()
+        caution_rows = caution_body_parts(pose_data, anatomy)
+        session.execute_write(create_anatomy_graph, anatomy, caution_rows)
+        print(f"Created {len(anatomy)} anatomy nodes, {len(caution_rows)} pose caution links")
+
+        # Health issues are only created together with their matrix: the pose
+        # checker answers a HealthIssue with complete = true by lookup, and asks
+        # the LLM about incomplete ones (some pairs unanswered at build time).
+        if health_matrix is not None:
+            health_issues = load_json_data(HEALTH_ISSUE_JSON)["health_issue"]
+            session.execute_write(create_neo4j_nodes, "HealthIssue", health_issues, "name")
+            session.execute_write(
+                lambda tx: tx.run(
+                    "MATCH (h:HealthIssue) SET h.complete = NOT h.id IN $incomplete",
+                    incomplete=list(incomplete_issues),
+                )
+            )
+            session.execute_write(link_health_issues, health_matrix)
+            print(f"Linked {sum(len(p) for p in health_matrix.values())} pose/health-issue contraindications")
+
+        # Version stamp: cached pose decisions made against another catalog are discarded.
+        version = catalog_version(health_matrix, incomplete_issues)
+        session.execute_write(
+            lambda tx: tx.run("MERGE (c:Catalog {id: 'catalog'}) SET c.version = $version", version=version)
+        )
+        print(f"Catalog version: {version}")
 
     driver.close()
     print("Knowledge graph built successfully!")
@@ -206,35 +588,159 @@ def check_neo4j_dbms_connection(driver):
 # Qdrant helpers
 # ---------------------------------------------------------------------------
 
-def add_documents_to_qdrant(client, collection_name: str, ids: list[str], texts: list[str], payloads: list[dict]):
-    """Utility to recreate collection and upsert documents with embeddings.
+def _text_hash(text: str) -> str:
+    """Hash of the embedded text plus the embedding model that encodes it."""
+    return hashlib.sha256(f"{embedding_model_id()}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _existing_text_hashes(client, collection_name: str) -> dict:
+    """Return {point_id: text_hash} for every point currently in *collection_name*."""
+    hashes = {}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name,
+            limit=256,
+            offset=offset,
+            with_payload=["text_hash"],
+            with_vectors=False,
+        )
+        for p in points:
+            hashes[str(p.id)] = (p.payload or {}).get("text_hash")
+        if offset is None:
+            return hashes
+
+
+def add_documents_to_qdrant(client, collection_name: str, ids: list[str], texts: list[str], payloads: list[dict],
+                            incremental: bool = True, profile: str | None = None):
+    """Utility to upsert documents with embeddings.
     Converts human-readable ids to deterministic UUID strings required by Qdrant.
+
+    Each payload stores a ``text_hash`` of the embedded text.  In incremental
+    mode only new or changed documents are embedded and upserted, and points
+    whose source records vanished are deleted, so an unchanged catalog costs
+    no model work.  With ``incremental=False`` the collection is dropped and
+    rebuilt from scratch.
+
+    The collection is created with the *profile* performance settings (see
+    ``services.vector_store.COLLECTION_PROFILES``) and a keyword index on every
+    payload field; an existing collection built with another profile is
+    rebuilt.
     """
-    recreate_collection(client, collection_name, dim=len(embed(["test"])[0]))
-    vectors = embed(texts)
+    assert ids and texts, "Empty lists!"
     uuid_ids = [str2uuid(i) for i in ids]
-    client.upsert(
-        collection_name=collection_name,
-        wait=True,  # ensure data is flushed before closing client
-        points=models.Batch(ids=uuid_ids, vectors=vectors, payloads=payloads),
+    hashes = [_text_hash(t) for t in texts]
+    payloads = [{**payload, "text_hash": h} for payload, h in zip(payloads, hashes)]
+
+    existing = {}
+    if incremental and client.collection_exists(collection_name):
+        current = match_profile(client.get_collection(collection_name))
+        if current not in (None, get_profile(profile).name):
+            print(f"⚠️ {collection_name} uses profile '{current}'; rebuilding with '{get_profile(profile).name}'")
+            incremental = False
+        else:
+            existing = _existing_text_hashes(client, collection_name)
+    else:
+        incremental = False
+
+    changed = [i for i, (uid, h) in enumerate(zip(uuid_ids, hashes)) if existing.get(uid) != h]
+    vanished = sorted(set(existing) - set(uuid_ids))
+
+    vectors = embed([texts[i] for i in changed]) if changed else []
+    if not incremental:
+        recreate_collection(
+            client, collection_name, dim=len(vectors[0]), profile=profile,
+            payload_indexes=[field for field in payloads[0] if field != "text_hash"],
+        )
+    elif vectors:
+        dim = client.get_collection(collection_name).config.params.vectors.size
+        if dim != len(vectors[0]):
+            print(f"⚠️ Vector size changed ({dim} → {len(vectors[0])}); rebuilding {collection_name}")
+            return add_documents_to_qdrant(client, collection_name, ids, texts, payloads, incremental=False,
+                                           profile=profile)
+
+    if changed:
+        client.upsert(
+            collection_name=collection_name,
+            wait=True,  # ensure data is flushed before closing client
+            points=models.Batch(
+                ids=[uuid_ids[i] for i in changed],
+                vectors=vectors,
+                payloads=[payloads[i] for i in changed],
+            ),
+        )
+    if vanished:
+        client.delete(
+            collection_name=collection_name,
+            points_selector=models.PointIdsList(points=vanished),
+            wait=True,
+        )
+    # Text hashes include the model id, so every point left in the collection
+    # was embedded by the active backend.
+    record_embedding_backend(collection_name)
+    print(
+        f"✅ {collection_name}: {len(changed)} upserted, {len(vanished)} deleted, "
+        f"{len(uuid_ids) - len(changed)} unchanged"
     )
-    assert uuid_ids and vectors, "Empty lists!"
-    print("✅ Inserted", len(uuid_ids), "documents into", collection_name)
-    
-    info = qclient.get_collection(collection_name)
-    print("points:", info.points_count)
 
-    pts, _ = qclient.scroll(collection_name, limit=3, with_payload=True, with_vectors=False)
-    print("example points:", pts)
+    info = client.get_collection(collection_name)
+    print("points:", info.points_count)
 
     # Force persistence to disk so subsequent processes can see the data
-    if hasattr(client._client, "flush"):
+    if hasattr(getattr(client, "_client", None), "flush"):
         try:
             client._client.flush()
         except Exception as e:
             logging.warning("Qdrant flush failed: %s", e)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the Neo4j knowledge graph and Qdrant collections.")
+    parser.add_argument(
+        "--full-rebuild",
+        action="store_true",
+        help="Drop and re-embed every Qdrant collection instead of updating only changed documents.",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=sorted(COLLECTION_PROFILES),
+        default=None,
+        help="Collection performance profile (default: QDRANT_PROFILE env var or 'default').",
+    )
+    parser.add_argument(
+        "--api",
+        type=str,
+        choices=["openai", "deepseek", "local"],
+        default="deepseek",
+        help="Model API used to precompute the pose x health-issue matrix.",
+    )
+    parser.add_argument(
+        "--skip-health-matrix",
+        action="store_true",
+        help="Do not build the pose x health-issue matrix (the pose checker then asks the LLM at query time).",
+    )
+    parser.add_argument(
+        "--schema-only",
+        action="store_true",
+        help="Only create the Neo4j constraints and indexes, then exit.",
+    )
+    parser.add_argument(
+        "--verify-schema",
+        action="store_true",
+        help="EXPLAIN the repo's lookup queries and exit non-zero unless all use index seeks.",
+    )
+    args = parser.parse_args()
+    incremental = not args.full_rebuild
+
+    if args.schema_only or args.verify_schema:
+        driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        try:
+            if args.schema_only:
+                ensure_schema(driver)
+            ok = verify_schema(driver) if args.verify_schema else True
+        finally:
+            driver.close()
+        raise SystemExit(0 if ok else 1)
+
     # Build/refresh vector collections in embedded Qdrant
     qclient = get_client()
 
@@ -252,7 +758,7 @@ if __name__ == "__main__":
         pose_texts.append(doc)
         pose_payloads.append({"pose": pose["name"]})
 
-    add_documents_to_qdrant(qclient, QDRANT_COLLECTION_POSE, pose_ids, pose_texts, pose_payloads)
+    add_documents_to_qdrant(qclient, QDRANT_COLLECTION_POSE, pose_ids, pose_texts, pose_payloads, incremental, args.profile)
     
     # ---- Build course collection ----
     course_data = load_json_data(COURSE_JSON)["course"]
@@ -268,7 +774,7 @@ if __name__ == "__main__":
         course_texts.append(doc)
         course_payloads.append({"course": course["name"]})
 
-    add_documents_to_qdrant(qclient, QDRANT_COLLECTION_COURSE, course_ids, course_texts, course_payloads)
+    add_documents_to_qdrant(qclient, QDRANT_COLLECTION_COURSE, course_ids, course_texts, course_payloads, incremental, args.profile)
 
     # ---- Build category collection ----
     category_data = load_json_data(CATEGORY_JSON)["category"]
@@ -283,7 +789,25 @@ if __name__ == "__main__":
         cat_texts.append(doc)
         cat_payloads.append({"category": cat["name"]})    
 
-    add_documents_to_qdrant(qclient, QDRANT_COLLECTION_CATEGORY, cat_ids, cat_texts, cat_payloads)
+    add_documents_to_qdrant(qclient, QDRANT_COLLECTION_CATEGORY, cat_ids, cat_texts, cat_payloads, incremental, args.profile)
+
+    # ---- Build health-issue and anatomy collections (contraindication matching) ----
+    health_issues = load_json_data(HEALTH_ISSUE_JSON)["health_issue"]
+    add_documents_to_qdrant(
+        qclient, QDRANT_COLLECTION_HEALTH_ISSUE,
+        [h["name"] for h in health_issues],
+        [f"Health issue: {h['name']}\nDescription: {h.get('description', '')}\n" for h in health_issues],
+        [{"health_issue": h["name"]} for h in health_issues],
+        incremental, args.profile,
+    )
+    anatomy = load_anatomy()
+    add_documents_to_qdrant(
+        qclient, QDRANT_COLLECTION_ANATOMY,
+        list(anatomy),
+        [f"Body part: {name}\n" + (f"Includes: {', '.join(subs)}\n" if subs else "") for name, subs in anatomy.items()],
+        [{"anatomy": name} for name in anatomy],
+        incremental, args.profile,
+    )
 
     print("✅ Qdrant collections built/updated.")
 
@@ -291,8 +815,16 @@ if __name__ == "__main__":
     qclient.close()
     shutdown_server()
 
+    # ---- Precompute pose x health-issue suitability ----
+    health_matrix, incomplete_issues = None, []
+    if not args.skip_health_matrix:
+        try:
+            health_matrix, incomplete_issues = build_health_issue_matrix(pose_data, health_issues, args.api)
+        except Exception as e:
+            print(f"⚠️ Skipping the health-issue matrix: {e}")
+
     # ---- Build Knowledge Graph ----
     driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
     check_neo4j_dbms_connection(driver)
     delete_neo4j_database(driver)
-    build_knowledge_graph(driver)
+    build_knowledge_graph(driver, health_matrix, incomplete_issues)
@@ -1,21 +1,43 @@
 
 import os
 import json
+import asyncio
 import argparse
-from openai import OpenAI
-from neo4j import GraphDatabase
-from pathlib import Path
+import logging
+from query_extraction import QueryInfoExtractor
+from services.llm_gateway import get_gateway
+from services.graph_db import get_async_graph
+from services.decision_cache import DecisionCache, decision_key
+from services.pose_graph import PoseGraphCache
+from services.vector_store import aembed, asearch_keywords, cosine, get_async_client, str2uuid
 
 # Configuration - Load from environment variables
-NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
-NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
-NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "12345678")
-PROMPT_FILE_PATH = Path(__file__).resolve().parent / "get_user_query_key_info.prompt"
+# Sequence checks judge many poses per LLM call; prompts longer than this are split.
+JUDGE_PROMPT_MAX_CHARS = int(os.getenv("POSE_JUDGE_MAX_CHARS", "6000"))
+# Replacement candidates considered per unsuitable pose in a sequence check.
+MAX_REPLACEMENT_CANDIDATES = int(os.getenv("POSE_MAX_REPLACEMENT_CANDIDATES", "10"))
+# Best-ranked candidates checked concurrently when replacing a single pose.
+REPLACEMENT_PARALLEL_CHECKS = int(os.getenv("POSE_REPLACEMENT_PARALLEL_CHECKS", "4"))
+# Rounds of REPLACEMENT_PARALLEL_CHECKS candidates tried before giving up on a single pose.
+REPLACEMENT_MAX_ROUNDS = int(os.getenv("POSE_REPLACEMENT_MAX_ROUNDS", "3"))
+# Candidates whose caution is at least this similar to a contraindication are pruned unchecked.
+CAUTION_PRUNE_SCORE = float(os.getenv("POSE_CAUTION_PRUNE_SCORE", "0.55"))
+# Minimum cosine similarity for a contraindication to count as a known health issue / body part.
+CONTRAINDICATION_MATCH_SCORE = float(os.getenv("CONTRAINDICATION_MATCH_SCORE", "0.6"))
+# Pose decision cache: optional SQLite file, entry TTL (seconds), in-memory LRU size.
+DECISION_CACHE_PATH = os.getenv("POSE_DECISION_CACHE_PATH") or None
+DECISION_CACHE_TTL = float(os.getenv("POSE_DECISION_CACHE_TTL", str(24 * 3600)))
+DECISION_CACHE_ITEMS = int(os.getenv("POSE_DECISION_CACHE_ITEMS", "10000"))
+# How often (seconds) the catalog version stamp is re-read from Neo4j (a new stamp reloads the pose graph snapshot).
+CATALOG_VERSION_REFRESH = float(os.getenv("CATALOG_VERSION_REFRESH", "30"))
+
 
 class YogaPoseChecker:
     """
     A class to check if a yoga pose is suitable based on user-defined contraindications
     and find a replacement from the knowledge graph if it's not.
+
+    All I/O goes through asyncio clients so the pose checker server can serve requests concurrently.
     """
 
     def __init__(self, api_type: str):
@@ -25,59 +47,164 @@ class YogaPoseChecker:
         Args:
             api_type (str): The model API to use ('openai' or 'deepseek').
         """
-        self.api_client = None
-        self.api_model = ""
-        self._init_api_client(api_type)
-        self.neo4j_driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-
-    def _init_api_client(self, api_type: str):
-        """Initializes the LLM API client."""
-        if api_type == 'deepseek':
-            api_key = os.getenv('DEEPSEEK_API_KEY')
-            if not api_key:
-                raise RuntimeError("Missing DEEPSEEK_API_KEY")
-            self.api_client = OpenAI(api_key=api_key, base_url="https://api.deepseek.com/v1")
-            self.api_model = "deepseek-chat"
-        elif api_type == 'openai':
-            api_key = os.getenv('OPENAI_API_KEY')
-            if not api_key:
-                raise RuntimeError("Missing OPENAI_API_KEY")
-            self.api_client = OpenAI(api_key=api_key)
-            self.api_model = "gpt-3.5-turbo"
-        else:
-            raise ValueError("Unsupported API type")
+        # Shared per-process LLM gateway (pooling, rate limits, retries, metrics)
+        self.llm = get_gateway(api_type)
+        self.query_extractor = QueryInfoExtractor(self.llm)
+        # Shared per-process Neo4j driver (tuned pool, query metrics)
+        self.neo4j_driver = get_async_graph()
+        # Lower-cased name -> HealthIssue id, loaded on first use (see build_graphrag.build_health_issue_matrix).
+        self._known_conditions: dict[str, str] | None = None
+        # Health-issue and anatomy collections, for resolving free-text contraindications
+        self.qclient = get_async_client()
+        self.decision_cache = DecisionCache(DECISION_CACHE_PATH, DECISION_CACHE_TTL, DECISION_CACHE_ITEMS)
+        # Part of every decision key: verdicts of one provider/model are not reused for another.
+        self._decision_model = f"{self.llm.api_type}/{self.llm.model}"
+        # In-memory pose graph (cautions, same-category candidates), reloaded when the catalog version changes
+        self.pose_graph = PoseGraphCache(self.neo4j_driver, CATALOG_VERSION_REFRESH)
+        self._catalog_version_value: str | None = None
+
+    async def _extract_query_info(self, user_query: str, query_info: dict | None = None) -> dict:
+        """Returns *query_info* if the caller already extracted it, else the (cached) LLM extraction."""
+        if query_info is not None:
+            return query_info
+        return await self.query_extractor.extract(user_query)
+
+    async def _get_known_conditions(self) -> dict[str, str]:
+        """Returns the health issues with a complete precomputed suitability matrix in Neo4j."""
+        if self._known_conditions is None:
+            async with self.neo4j_driver.session() as session:
+                # Incomplete issues (pairs unanswered at build time) stay with the LLM.
+                records = await session.execute_read(
+                    lambda tx: self._read_all(
+                        tx, "MATCH (h:HealthIssue) WHERE coalesce(h.complete, true) RETURN h.id AS name"
+                    )
+                )
+            self._known_conditions = {r["name"].strip().lower(): r["name"] for r in records}
+        return self._known_conditions
 
-    def _extract_query_info(self, user_query: str) -> dict:
-        """Extracts structured info from user query using the LLM."""
+    @staticmethod
+    async def _read_all(tx, query: str, **params) -> list[dict]:
+        result = await tx.run(query, **params)
+        return await result.data()
+
+    async def _match_catalog(self, collection: str, field: str, texts: list) -> dict[str, str]:
+        """Maps each text to its nearest catalog entry in *collection* if the match is close enough."""
         try:
-            with open(PROMPT_FILE_PATH, 'r') as f:
-                prompt_template = f.read().format(query=user_query)
-        except FileNotFoundError:
-            raise RuntimeError(f"Prompt file not found at {PROMPT_FILE_PATH}")
-
-        response = self.api_client.chat.completions.create(
-            model=self.api_model,
-            messages=[{"role": "user", "content": prompt_template}],
-            temperature=0.0,
-            response_format={"type": "json_object"}
-        )
-        return json.loads(response.choices[0].message.content)
+            hits = await asearch_keywords(self.qclient, collection, texts, k=1)
+        except Exception as exc:
+            logging.warning(f"Contraindication matching against '{collection}' unavailable: {exc}")
+            return {}
+        return {
+            text: points[0].payload[field]
+            for text, points in hits.items()
+            if points and points[0].score >= CONTRAINDICATION_MATCH_SCORE
+        }
+
+    async def _resolve_contraindications(self, contraindications: list) -> tuple[list[str], list[str], list]:
+        """
+        Resolves free-text contraindications to catalog entries that can be answered by graph lookup.
+
+        Exact health-issue names are matched directly; the rest go through one
+        batched vector query each against the health-issue and anatomy
+        collections. Only health issues are fully answered by the graph (the
+        matrix was judged per pose by the LLM at build time). A body part match
+        can flag a pose early through its CAUTION_FOR edges, but those edges
+        only exist when the caution text names the part, so body-part
+        contraindications are still left for the LLM.
+
+        Returns:
+            tuple: (known health issues, body parts, contraindications left for the LLM)
+        """
+        if not contraindications:
+            return [], [], []
+        known_conditions = await self._get_known_conditions()
+        conditions, body_parts, unresolved = [], [], []
+        for item in contraindications:
+            condition = known_conditions.get(str(item).strip().lower())
+            if condition:
+                conditions.append(condition)
+            else:
+                unresolved.append(str(item))
+        if unresolved:
+            # Health issues only count if the matrix was built for them.
+            matched_issues = {
+                text: issue for text, issue in
+                (await self._match_catalog("yoga_health_issue", "health_issue", unresolved)).items()
+                if issue.strip().lower() in known_conditions
+            } if known_conditions else {}
+            rest = [text for text in unresolved if text not in matched_issues]
+            matched_parts = await self._match_catalog("yoga_anatomy", "anatomy", rest) if rest else {}
+            conditions += matched_issues.values()
+            body_parts += matched_parts.values()
+            unresolved = rest
+            if matched_issues or matched_parts:
+                logging.info(f"Resolved contraindications: {matched_issues | matched_parts}")
+        return list(dict.fromkeys(conditions)), list(dict.fromkeys(body_parts)), unresolved
+
+    async def _get_contraindicated_poses(self, pose_names: list[str], conditions: list[str], body_parts: list[str]) -> set[str]:
+        """
+        Returns the subset of *pose_names* that the precomputed matrix marks as
+        unsuitable for any of *conditions*, or whose caution concerns one of
+        *body_parts* (or a subpart of it).
+        """
+        async with self.neo4j_driver.session() as session:
+            records = await session.execute_read(
+                lambda tx: self._read_all(
+                    tx,
+                    """
+                    MATCH (p:Pose) WHERE p.id IN $pose_names
+                      AND (EXISTS { MATCH (p)-[:CONTRAINDICATED_FOR]->(h:HealthIssue) WHERE h.id IN $conditions }
+                        OR EXISTS { MATCH (p)-[:CAUTION_FOR]->(:Anatomy)-[:SUBPART_OF*0..]->(a:Anatomy)
+                                    WHERE a.id IN $body_parts })
+                    RETURN p.id AS name
+                    """,
+                    pose_names=pose_names,
+                    conditions=conditions,
+                    body_parts=body_parts,
+                )
+            )
+        return {r["name"] for r in records}
 
-    def _get_pose_caution(self, tx, pose_name: str) -> str:
-        """Retrieves the caution string for a given pose from Neo4j."""
-        result = tx.run("MATCH (p:Pose {id: $pose_name}) RETURN p.caution AS caution", pose_name=pose_name)
-        record = result.single()
-        return record["caution"] if record and record["caution"] else ""
+    async def _catalog_version(self) -> str:
+        """Returns the catalog version stamped by build_graphrag.py (re-read every CATALOG_VERSION_REFRESH s)."""
+        version = (await self.pose_graph.get()).version
+        if self._catalog_version_value is not None and version != self._catalog_version_value:
+            logging.info(f"Catalog rebuilt ({self._catalog_version_value} -> {version}); cached decisions are stale.")
+            self._known_conditions = None
+        self._catalog_version_value = version
+        return version
 
-    def _is_pose_unsuitable(self, pose_name: str, caution: str, poses_to_avoid: list, contraindications: list) -> bool:
+    async def _is_pose_unsuitable(self, pose_name: str, caution: str, poses_to_avoid: list, contraindications: list, resolved: tuple) -> bool:
         """
-        Checks with the LLM if a pose is unsuitable.
+        Checks if a pose is unsuitable, answering from the decision cache when the
+        same pose was already judged against the same restrictions and catalog.
+        *resolved* is the request's _resolve_contraindications result.
 
         Returns:
             bool: True if the pose is unsuitable, False otherwise.
         """
         if not poses_to_avoid and not contraindications:
             return False
+        key = decision_key(pose_name, poses_to_avoid, contraindications, self._decision_model)
+        version = await self._catalog_version()
+        cached = self.decision_cache.get_many([key], version)
+        if key in cached:
+            return cached[key]
+        unsuitable = await self._decide_pose(pose_name, caution, poses_to_avoid, resolved)
+        self.decision_cache.put_many({key: unsuitable}, version)
+        return unsuitable
+
+    async def _decide_pose(self, pose_name: str, caution: str, poses_to_avoid: list, resolved: tuple) -> bool:
+        """
+        Decides one pose: the graph flags it if the health-issue matrix or a
+        matched body part says so; otherwise the restrictions not covered by the
+        matrix are checked with the LLM.
+        """
+        conditions, body_parts, contraindications = resolved
+        if (conditions or body_parts) and await self._get_contraindicated_poses([pose_name], conditions, body_parts):
+            return True
+        if not poses_to_avoid and not contraindications:
+            return False
 
         prompt = (
             f"Here is a yoga pose '{pose_name}' and its practice caution: '{caution}'.\n"
@@ -86,8 +213,7 @@ class YogaPoseChecker:
             f"Please answer only 'true' if it is unsuitable or 'false' if it is suitable, nothing else."
         )
 
-        response = self.api_client.chat.completions.create(
-            model=self.api_model,
+        response = await self.llm.complete(
             messages=[{"role": "user", "content": prompt}],
             temperature=0.0,
             max_tokens=5
@@ -95,38 +221,233 @@ class YogaPoseChecker:
         answer = response.choices[0].message.content.strip().lower()
         return answer == 'true'
 
-    def _find_replacement_pose(self, tx, original_pose_name: str, poses_to_avoid: list, contraindications: list) -> str | None:
-        """
-        Finds a suitable replacement pose from the same category in Neo4j.
-        """
-        # Find other poses in the same category, excluding the original pose
-        query = """
-        MATCH (original:Pose {id: $original_pose_name})-[:IN_CATEGORY]->(cat:Category)<-[:IN_CATEGORY]-(replacement:Pose)
-        WHERE original <> replacement
-        RETURN replacement.id AS name, replacement.caution AS caution
-        ORDER BY rand()
-        """
-        results = tx.run(query, original_pose_name=original_pose_name)
-        
-        for record in results:
-            replacement_name = record["name"]
-            replacement_caution = record["caution"] if record["caution"] else ""
-            
-            # Check if the replacement is suitable
-            if not self._is_pose_unsuitable(replacement_name, replacement_caution, poses_to_avoid, contraindications):
-                print(f"Found suitable replacement: {replacement_name}")
-                return replacement_name
-        
+    async def _pose_vectors(self, pose_names: list[str]) -> dict[str, list[float]]:
+        """Fetches the stored document vectors of *pose_names* from the yoga_pose collection."""
+        try:
+            records = await self.qclient.retrieve(
+                "yoga_pose", ids=[str2uuid(n) for n in pose_names], with_payload=["pose"], with_vectors=True
+            )
+        except Exception as exc:
+            logging.warning(f"yoga_pose collection unavailable for replacement ranking: {exc}")
+            return {}
+        return {r.payload["pose"]: r.vector for r in records if r.payload and r.vector}
+
+    async def _rank_replacement_candidates(self, candidates_by_original: dict[str, list[dict]], contraindications: list) -> dict[str, list[dict]]:
+        """
+        Orders each original pose's candidates by vector similarity to it and
+        drops candidates whose caution is close to one of the contraindications.
+
+        All pose vectors come from one retrieve call and all cautions and
+        contraindications are embedded in one batch. Without the yoga_pose
+        collection the candidates keep their graph order.
+        """
+        names = list(dict.fromkeys(
+            [*candidates_by_original] + [c["name"] for cands in candidates_by_original.values() for c in cands]
+        ))
+        vectors = await self._pose_vectors(names)
+
+        cautions = list(dict.fromkeys(
+            c["caution"] for cands in candidates_by_original.values() for c in cands if c["caution"]
+        ))
+        contraindications = [str(c) for c in contraindications]
+        caution_risk: dict[str, float] = {}
+        if cautions and contraindications:
+            embedded = await aembed(cautions + contraindications)
+            caution_vecs, contra_vecs = embedded[:len(cautions)], embedded[len(cautions):]
+            caution_risk = {
+                caution: max(cosine(vec, cv) for cv in contra_vecs) for caution, vec in zip(cautions, caution_vecs)
+            }
+
+        ranked = {}
+        for original, cands in candidates_by_original.items():
+            kept = [c for c in cands if caution_risk.get(c["caution"], 0.0) < CAUTION_PRUNE_SCORE]
+            if len(kept) < len(cands):
+                logging.info(f"Pruned {len(cands) - len(kept)} replacement candidates for {original} by caution")
+            origin = vectors.get(original)
+            if origin is not None:
+                kept.sort(key=lambda c: -cosine(origin, vectors[c["name"]]) if c["name"] in vectors else 2.0)
+            ranked[original] = kept
+        return ranked
+
+    async def _find_replacement_pose(self, original_pose_name: str, poses_to_avoid: list, contraindications: list, resolved: tuple) -> str | None:
+        """
+        Finds a suitable replacement pose from the same category (pose graph snapshot).
+
+        Candidates are ranked by similarity to the original and pruned by
+        caution (see _rank_replacement_candidates), then checked in ranked order
+        REPLACEMENT_PARALLEL_CHECKS at a time (concurrently within a round), for
+        at most REPLACEMENT_MAX_ROUNDS rounds. The first suitable one wins.
+        """
+        candidates = (await self.pose_graph.get()).same_category(original_pose_name)
+        ranked = (await self._rank_replacement_candidates({original_pose_name: candidates}, contraindications))[original_pose_name]
+        ranked = ranked[:REPLACEMENT_PARALLEL_CHECKS * REPLACEMENT_MAX_ROUNDS]
+
+        for start in range(0, len(ranked), REPLACEMENT_PARALLEL_CHECKS):
+            batch = ranked[start:start + REPLACEMENT_PARALLEL_CHECKS]
+            verdicts = await asyncio.gather(*(
+                self._is_pose_unsuitable(c["name"], c["caution"] or "", poses_to_avoid, contraindications, resolved)
+                for c in batch
+            ))
+            for candidate, unsuitable in zip(batch, verdicts):
+                if not unsuitable:
+                    print(f"Found suitable replacement: {candidate['name']}")
+                    return candidate["name"]
+
         print(f"Could not find a suitable replacement for {original_pose_name}")
         return None
 
-    def check_and_replace_pose(self, pose_name: str, user_query: str) -> str | None:
+    def _judge_chunks(self, cautions: dict[str, str], header: str) -> list[dict[str, str]]:
+        """Splits *cautions* so that each judgment prompt stays under JUDGE_PROMPT_MAX_CHARS."""
+        chunks, current, size = [], {}, len(header)
+        for name, caution in cautions.items():
+            line_len = len(name) + len(caution) + 8
+            if current and size + line_len > JUDGE_PROMPT_MAX_CHARS:
+                chunks.append(current)
+                current, size = {}, len(header)
+            current[name] = caution
+            size += line_len
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _judge_chunk(self, cautions: dict[str, str], header: str, poses_to_avoid: list, contraindications: list, resolved: tuple) -> dict[str, bool]:
+        pose_lines = "\n".join(f"- {name}: {caution or 'no caution'}" for name, caution in cautions.items())
+        response = await self.llm.complete(
+            messages=[{"role": "user", "content": f"{header}\n{pose_lines}"}],
+            temperature=0.0,
+            response_format={"type": "json_object"}
+        )
+        try:
+            payload = json.loads(response.choices[0].message.content or "")
+        except (json.JSONDecodeError, TypeError):
+            payload = {}
+        verdicts = payload.get("unsuitable") if isinstance(payload, dict) else None
+        if not isinstance(verdicts, dict):
+            verdicts = {}
+        judged = {name: verdicts[name] for name in cautions if isinstance(verdicts.get(name), bool)}
+        # Anything the model skipped or answered malformed gets the single-pose check.
+        missing = [name for name in cautions if name not in judged]
+        answers = await asyncio.gather(
+            *(self._is_pose_unsuitable(name, cautions[name], poses_to_avoid, contraindications, resolved) for name in missing)
+        )
+        judged.update(zip(missing, answers))
+        return judged
+
+    async def _judge_poses(self, cautions: dict[str, str], poses_to_avoid: list, contraindications: list, resolved: tuple) -> dict[str, bool]:
+        """
+        Judges every pose in *cautions*; poses already decided for the same
+        restrictions and catalog come from the decision cache.
+
+        Returns:
+            dict: pose name -> True if the pose is unsuitable.
+        """
+        if not cautions:
+            return {}
+        if not poses_to_avoid and not contraindications:
+            return {name: False for name in cautions}
+        keys = {name: decision_key(name, poses_to_avoid, contraindications, self._decision_model) for name in cautions}
+        version = await self._catalog_version()
+        cached = self.decision_cache.get_many(list(keys.values()), version)
+        verdicts = {name: cached[key] for name, key in keys.items() if key in cached}
+        misses = {name: caution for name, caution in cautions.items() if name not in verdicts}
+        if misses:
+            decided = await self._decide_poses(misses, poses_to_avoid, contraindications, resolved)
+            self.decision_cache.put_many({keys[name]: unsuitable for name, unsuitable in decided.items()}, version)
+            verdicts.update(decided)
+        return verdicts
+
+    async def _decide_poses(self, cautions: dict[str, str], poses_to_avoid: list, contraindications: list, resolved: tuple) -> dict[str, bool]:
+        """
+        Decides several poses: poses the graph flags (health-issue matrix or
+        matched body part) are unsuitable; the others are checked against the
+        restrictions not covered by the matrix, one structured-JSON LLM call per chunk.
+        """
+        conditions, body_parts, llm_contraindications = resolved
+        flagged = (
+            await self._get_contraindicated_poses(list(cautions), conditions, body_parts)
+            if conditions or body_parts else set()
+        )
+        if not poses_to_avoid and not llm_contraindications:
+            return {name: name in flagged for name in cautions}
+        cautions = {name: caution for name, caution in cautions.items() if name not in flagged}
+        if not cautions:
+            return {name: True for name in flagged}
+        header = (
+            f"Poses to avoid: {poses_to_avoid}.\n"
+            f"Contraindications: {llm_contraindications}.\n"
+            "For each yoga pose below (name: practice caution), decide whether it is unsuitable, i.e. it is similar "
+            "to a pose to avoid or practicing it has one of the contraindications.\n"
+            'Answer only with JSON of the form {"unsuitable": {"<pose name>": true or false, ...}} covering every pose.\n'
+            "Poses:"
+        )
+        chunks = self._judge_chunks(cautions, header)
+        results = await asyncio.gather(
+            *(self._judge_chunk(chunk, header, poses_to_avoid, contraindications, resolved) for chunk in chunks)
+        )
+        verdicts = {name: unsuitable for judged in results for name, unsuitable in judged.items()}
+        return {**verdicts, **{name: True for name in flagged}}
+
+    async def check_sequence(self, pose_names: list[str], user_query: str, query_info: dict | None = None) -> list[dict]:
+        """
+        Checks a whole pose sequence with O(1) LLM calls instead of one per pose.
+
+        Cautions and replacement candidates come from the in-memory pose graph;
+        the distinct poses, then the distinct replacement candidates, are each
+        judged in one batched prompt (split into chunks if too long).
+
+        Returns:
+            list: one dict per input pose with 'pose_name', 'final_pose_name'
+            (None if unsuitable and no replacement was found) and 'was_replaced'.
+        """
+        query_info = await self._extract_query_info(user_query, query_info)
+        poses_to_avoid = query_info.get("poses to avoid", [])
+        contraindications = query_info.get("contraindications", [])
+
+        if not poses_to_avoid and not contraindications:
+            return [{"pose_name": p, "final_pose_name": p, "was_replaced": False} for p in pose_names]
+
+        # Resolved once per request; every cache miss below reuses it.
+        resolved = await self._resolve_contraindications(contraindications)
+        distinct = list(dict.fromkeys(pose_names))
+        graph = await self.pose_graph.get()
+        verdicts = await self._judge_poses(
+            {p: graph.caution(p) for p in distinct}, poses_to_avoid, contraindications, resolved
+        )
+        unsuitable = [p for p in distinct if verdicts[p]]
+        replacements: dict[str, str | None] = {}
+        if unsuitable:
+            print(f"Unsuitable poses: {unsuitable}. Finding replacements...")
+            candidates = {pose: graph.same_category(pose) for pose in unsuitable}
+            candidates = {
+                pose: cands[:MAX_REPLACEMENT_CANDIDATES]
+                for pose, cands in (await self._rank_replacement_candidates(candidates, contraindications)).items()
+            }
+            candidate_cautions = {
+                c["name"]: c["caution"] or ""
+                for cands in candidates.values() for c in cands
+                if c["name"] not in verdicts
+            }
+            verdicts.update(await self._judge_poses(candidate_cautions, poses_to_avoid, contraindications, resolved))
+            for pose in unsuitable:
+                replacements[pose] = next(
+                    (c["name"] for c in candidates.get(pose, []) if not verdicts[c["name"]]), None
+                )
+                print(f"Replacement for {pose}: {replacements[pose]}")
+
+        results = []
+        for pose in pose_names:
+            final = replacements[pose] if verdicts[pose] else pose
+            results.append({"pose_name": pose, "final_pose_name": final, "was_replaced": final not in (pose, None)})
+        return results
+
+    async def check_and_replace_pose(self, pose_name: str, user_query: str, query_info: dict | None = None) -> str | None:
         """
         Checks if a pose is suitable based on the user query. If not, finds and returns a replacement.
         If the pose is suitable, it returns the original pose name.
         If unsuitable and no replacement is found, returns None.
+        *query_info* is the pre-extracted structured query; it is extracted here if omitted.
         """
-        query_info = self._extract_query_info(user_query)
+        query_info = await self._extract_query_info(user_query, query_info)
         poses_to_avoid = query_info.get("poses to avoid", [])
         contraindications = query_info.get("contraindications", [])
 
@@ -134,23 +455,37 @@ class YogaPoseChecker:
         if not poses_to_avoid and not contraindications:
             return pose_name
 
-        with self.neo4j_driver.session() as session:
-            caution = session.execute_read(self._get_pose_caution, pose_name)
-            
-            is_unsuitable = self._is_pose_unsuitable(pose_name, caution, poses_to_avoid, contraindications)
+        caution = (await self.pose_graph.get()).caution(pose_name)
+        # Resolved once per request; the replacement candidates reuse it.
+        resolved = await self._resolve_contraindications(contraindications)
 
-            if is_unsuitable:
-                print(f"Pose '{pose_name}' is unsuitable. Finding a replacement...")
-                replacement = session.execute_read(self._find_replacement_pose, pose_name, poses_to_avoid, contraindications)
-                return replacement
-            else:
-                print(f"Pose '{pose_name}' is suitable.")
-                return pose_name
+        is_unsuitable = await self._is_pose_unsuitable(pose_name, caution, poses_to_avoid, contraindications, resolved)
 
-    def close(self):
-        """Closes the Neo4j driver connection."""
+        if is_unsuitable:
+            print(f"Pose '{pose_name}' is unsuitable. Finding a replacement...")
+            replacement = await self._find_replacement_pose(pose_name, poses_to_avoid, contraindications, resolved)
+            return replacement
+        else:
+            print(f"Pose '{pose_name}' is suitable.")
+            return pose_name
+
+    def stats(self) -> dict:
+        """Hit-rate metrics of the decision and query-extraction caches, pose graph snapshot, LLM gateway and Neo4j pool metrics."""
+        return {
+            "decision_cache": self.decision_cache.stats(),
+            "query_info_cache": self.query_extractor.stats(),
+            "llm": self.llm.stats(),
+            "pose_graph": self.pose_graph.stats(),
+            "neo4j": self.neo4j_driver.stats(),
+            "catalog_version": self._catalog_version_value,
+        }
+
+    async def close(self):
+        """Closes the Neo4j driver and LLM client connections."""
+        self.decision_cache.close()
         if self.neo4j_driver:
-            self.neo4j_driver.close()
+            await self.neo4j_driver.close()
+        await self.llm.aclose()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -171,22 +506,25 @@ if __name__ == "__main__":
     parser.add_argument(
         "--api",
         type=str,
-        choices=["openai", "deepseek"],
+        choices=["openai", "deepseek", "local"],
         default="deepseek",
-        help="Specify which model API to use (openai or deepseek).",
+        help="Specify which model API to use (openai, deepseek, or local for the offline stand-in).",
     )
     args = parser.parse_args()
 
-    checker = None
-    try:
-        checker = YogaPoseChecker(api_type=args.api)
-        final_pose = checker.check_and_replace_pose(pose_name=args.pose, user_query=args.query)
-        print(f"\n--- Pose Check Result ---")
-        print(f"Original Pose: {args.pose}")
-        print(f"User Query: '{args.query}'")
-        print(f"Final Recommended Pose: {final_pose}")
-    except Exception as e:
-        print(f"An error occurred: {e}")
-    finally:
-        if checker:
-            checker.close()
+    async def _main():
+        checker = None
+        try:
+            checker = YogaPoseChecker(api_type=args.api)
+            final_pose = await checker.check_and_replace_pose(pose_name=args.pose, user_query=args.query)
+            print(f"\n--- Pose Check Result ---")
+            print(f"Original Pose: {args.pose}")
+            print(f"User Query: '{args.query}'")
+            print(f"Final Recommended Pose: {final_pose}")
+        except Exception as e:
+            print(f"An error occurred: {e}")
+        finally:
+            if checker:
+                await checker.close()
+
+    asyncio.run(_main())
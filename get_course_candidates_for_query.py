@@ -1,24 +1,37 @@
 import os
-import json
+import asyncio
 import argparse
 import logging
-from openai import OpenAI
-from neo4j import GraphDatabase
-from services.vector_store import get_client, embed
-from pathlib import Path
+from services.vector_store import get_async_client, asearch_keywords
+from query_extraction import QueryInfoExtractor
+from services.llm_gateway import get_gateway
+from services.graph_db import get_async_graph
+from services.reranker import reranker_from_env
 
 # Configuration - Load from environment variables
-NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
-NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
-NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "12345678")
 # Qdrant persistence handled by services.vector_store
-PROMPT_FILE_PATH = Path(__file__).resolve().parent / "get_user_query_key_info.prompt"
+# LLM course verification: max concurrent calls and per-call timeout (seconds).
+VERIFY_CONCURRENCY = int(os.getenv("COURSE_VERIFY_CONCURRENCY", "4"))
+VERIFY_TIMEOUT = float(os.getenv("COURSE_VERIFY_TIMEOUT", "20"))
+
+
+def course_match_prompt(description: str, user_query: str) -> str:
+    """Prompt asking the LLM whether a course matches the query (answer: yes, no or n/a)."""
+    return (
+        f"Please answer if the Yoga course matches the user's query for a training. "
+        f"Course description: {description}\n"
+        f"User query: {user_query}\n\n"
+        "Answer only one of the three words: yes, no, or n/a"
+    )
 
 
 class CourseFinder:
     """
     A class to find yoga course candidates based on a user query using a RAG system.
     It combines semantic search on ChromaDB with graph lookups in Neo4j and LLM-based filtering.
+
+    All I/O goes through asyncio clients (AsyncOpenAI, the async Neo4j driver and
+    AsyncQdrantClient) so that concurrent requests in the agent server overlap.
     """
 
     def __init__(self, api_type: str):
@@ -28,151 +41,176 @@ class CourseFinder:
         Args:
             api_type (str): The model API to use ('openai' or 'deepseek').
         """
-        self.api_client = None
-        self.api_model = ""
-        self._init_api_client(api_type)
-
-        self.neo4j_driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-
-        # Embedded Qdrant client
-        self.qclient = get_client()
-
-    def _init_api_client(self, api_type: str):
-        """Initializes the LLM API client."""
-        if api_type == 'deepseek':
-            api_key = os.getenv('DEEPSEEK_API_KEY')
-            if not api_key:
-                raise RuntimeError("Missing DEEPSEEK_API_KEY")
-            self.api_client = OpenAI(
-                api_key=api_key,
-                base_url="https://api.deepseek.com/v1"
-            )
-            self.api_model = "deepseek-chat"
-        elif api_type == 'openai':
-            api_key = os.getenv('OPENAI_API_KEY')
-            if not api_key:
-                raise RuntimeError("Missing OPENAI_API_KEY")
-            self.api_client = OpenAI(api_key=api_key)
-            self.api_model = "gpt-3.5-turbo"
-        else:
-            raise ValueError("Unsupported API type")
-
-    def _extract_query_info(self, user_query: str) -> dict:
-        """Extracts structured info from user query using the LLM."""
-        with open(PROMPT_FILE_PATH, 'r') as f:
-            prompt_template = f.read().format(query=user_query)
-
-        response = self.api_client.chat.completions.create(
-            model=self.api_model,
-            messages=[{"role": "user", "content": prompt_template}],
-            temperature=0.0,
-            response_format={"type": "json_object"}
-        )
-        return json.loads(response.choices[0].message.content)
-
-    def _search_courses_by_keywords(self, keywords: list, k: int = 5) -> list:
+        # Shared per-process LLM gateway (pooling, rate limits, retries, metrics)
+        self.llm = get_gateway(api_type)
+        self.query_extractor = QueryInfoExtractor(self.llm)
+        self.verify_concurrency = VERIFY_CONCURRENCY
+        self.verify_timeout = VERIFY_TIMEOUT
+        # Optional local reranker in front of the LLM check (COURSE_RERANKER)
+        self.reranker = reranker_from_env()
+
+        # Shared per-process Neo4j driver (tuned pool, query metrics)
+        self.neo4j_driver = get_async_graph()
+
+        # Async client for the shared local Qdrant server
+        self.qclient = get_async_client()
+
+    async def _extract_query_info(self, user_query: str, query_info: dict | None = None) -> dict:
+        """Returns *query_info* if the caller already extracted it, else the (cached) LLM extraction."""
+        if query_info is not None:
+            return query_info
+        return await self.query_extractor.extract(user_query)
+
+    async def _search_courses_by_keywords(self, keywords: list, k: int = 5) -> list:
         """Semantic search in Qdrant for courses matching *keywords*."""
+        hits = await asearch_keywords(self.qclient, "yoga_course", keywords, k=k)
         course_names: set[str] = set()
-        for kw in keywords:
-            vector = embed([kw])[0]
-            resp = self.qclient.query_points(
-                collection_name="yoga_course",
-                query=vector,
-                limit=k,  # ask for more to improve recall
-                with_payload=True,
-            )
-            course_names.update(p.payload["course"] for p in resp.points)
+        for points in hits.values():
+            course_names.update(p.payload["course"] for p in points)
         return list(course_names)
 
-    def _get_course_descriptions(self, course_names: list) -> dict:
+    async def _get_course_descriptions(self, course_names: list) -> dict:
         """Retrieves course descriptions from Neo4j."""
-        with self.neo4j_driver.session() as session:
-            result = session.run(
+        async with self.neo4j_driver.session() as session:
+            result = await session.run(
                 "UNWIND $course_names AS name "
                 "MATCH (c:Course {id: name}) "
                 "RETURN c.id AS name, c.description AS description",
                 course_names=course_names
             )
-            return {record["name"]: record["description"] for record in result}
-
-    def _filter_courses_by_llm(self, course_descriptions: dict, user_query: str) -> list:
-        """Filters courses using LLM verification."""
-        yes_courses = []
-        na_courses = []
-
-        for name, description in course_descriptions.items():
-            prompt = (
-                f"Please answer if the Yoga course matches the user's query for a training. "
-                f"Course description: {description}\n"
-                f"User query: {user_query}\n\n"
-                "Answer only one of the three words: yes, no, or n/a"
-            )
-
-            response = self.api_client.chat.completions.create(
-                model=self.api_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=5
-            )
+            return {record["name"]: record["description"] async for record in result}
+
+    async def _verify_course(self, semaphore: asyncio.Semaphore, name: str, description: str, user_query: str) -> str:
+        """Asks the LLM whether one course matches; returns 'yes', 'no', 'n/a', or 'error' on timeout/failure."""
+        prompt = course_match_prompt(description, user_query)
+        async with semaphore:
+            try:
+                response = await asyncio.wait_for(
+                    self.llm.complete(
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=0.3,
+                        max_tokens=5
+                    ),
+                    timeout=self.verify_timeout,
+                )
+            except asyncio.TimeoutError:
+                logging.warning(f"Verification of course '{name}' timed out after {self.verify_timeout}s; skipping it.")
+                return "error"
+            except Exception as exc:
+                logging.warning(f"Verification of course '{name}' failed: {exc}; skipping it.")
+                return "error"
+        return response.choices[0].message.content.strip().lower()
+
+    async def _filter_courses_by_llm(self, course_descriptions: dict, user_query: str, max_results: int | None = None) -> list:
+        """
+        Filters courses using concurrent LLM verification.
 
-            answer = response.choices[0].message.content.strip().lower()
-            if answer == "yes":
-                yes_courses.append(name)
-            elif answer == "n/a":
-                na_courses.append(name)
+        At most ``verify_concurrency`` calls are in flight, each bounded by
+        ``verify_timeout``. Courses are considered in name order and results keep
+        that order, so the outcome does not depend on which call finishes first.
+        With *max_results*, verification stops as soon as the first *max_results*
+        "yes" courses in that order are known; the remaining calls are cancelled.
 
-        return yes_courses if yes_courses else na_courses
+        If a local reranker is configured (``COURSE_RERANKER``), all courses are
+        first scored in one batched forward pass; confident scores are answered
+        directly and only borderline courses are sent to the LLM.
+        """
+        names = sorted(course_descriptions)
+        answers: dict[str, str] = {}
+        if self.reranker is not None:
+            scores = await self.reranker.ascore(user_query, [course_descriptions[n] or "" for n in names])
+            for name, score in zip(names, scores):
+                label = self.reranker.classify(score)
+                if label is not None:
+                    answers[name] = label
+            logging.info(
+                f"Reranker decided {len(answers)}/{len(names)} courses; "
+                f"{len(names) - len(answers)} borderline go to the LLM"
+            )
 
-    def find_candidates(self, user_query: str) -> list:
+        semaphore = asyncio.Semaphore(self.verify_concurrency)
+        tasks = {
+            asyncio.create_task(self._verify_course(semaphore, name, course_descriptions[name], user_query)): name
+            for name in names if name not in answers
+        }
+        try:
+            pending = set(tasks)
+            if max_results and self._resolved_yes_prefix(names, answers) >= max_results:
+                pending = set()
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    answers[tasks[task]] = task.result()
+                if max_results and self._resolved_yes_prefix(names, answers) >= max_results:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        yes_courses = [n for n in names if answers.get(n) == "yes"]
+        if max_results and len(yes_courses) >= max_results:
+            return yes_courses[:max_results]
+        if yes_courses:
+            return yes_courses
+        na_courses = [n for n in names if answers.get(n) == "n/a"]
+        return na_courses[:max_results] if max_results else na_courses
+
+    @staticmethod
+    def _resolved_yes_prefix(names: list, answers: dict) -> int:
+        """Number of "yes" answers in the longest prefix of *names* that is fully answered."""
+        count = 0
+        for name in names:
+            if name not in answers:
+                break
+            count += answers[name] == "yes"
+        return count
+
+    async def find_candidates(self, user_query: str, query_info: dict | None = None, max_results: int | None = None) -> list:
         """
         Main pipeline to get filtered course candidates.
 
         Args:
             user_query (str): The user's natural language query.
+            query_info (dict | None): Structured query info already extracted by the caller;
+                extracted (and cached) here if omitted.
+            max_results (int | None): Stop verifying once this many matching courses are found.
 
         Returns:
             list: A list of recommended course names.
         """
         # Step 1: Extract structured info from query
-        query_info = self._extract_query_info(user_query)
+        query_info = await self._extract_query_info(user_query, query_info)
         print(f"User's query info: {query_info}")
 
-        # Step 2: Semantic search for candidates
-        candidate_courses = set()
-
-        # Search by objectives
-        if query_info.get("objective"):
-            candidate_courses.update(
-                self._search_courses_by_keywords(
-                    query_info["objective"],
-                    k=3
-                )
-            )
-
-        logging.info(f"Candidate courses by objectives: {candidate_courses}")
+        # Step 2: Semantic search for candidates (objectives and body parts
+        # share one batched embedding + Qdrant query)
+        keywords = list(query_info.get("objective") or []) + list(
+            query_info.get("physical body parts to train") or []
+        )
+        candidate_courses = set(await self._search_courses_by_keywords(keywords, k=3)) if keywords else set()
 
-        # Search by body parts
-        if query_info.get("physical body parts to train"):
-            candidate_courses.update(
-                self._search_courses_by_keywords(
-                    query_info["physical body parts to train"],
-                    k=3
-                )
-            )
+        logging.info(f"Candidate courses by objectives and body parts: {candidate_courses}")
 
-        logging.info(f"Candidate courses by body parts: {candidate_courses}")
-        
         if not candidate_courses:
             return []
 
         # Step 3: Filter courses using LLM verification
-        course_descriptions = self._get_course_descriptions(list(candidate_courses))
-        return self._filter_courses_by_llm(course_descriptions, user_query)
-
-    def close(self):
-        """Closes the Neo4j driver connection."""
+        course_descriptions = await self._get_course_descriptions(list(candidate_courses))
+        return await self._filter_courses_by_llm(course_descriptions, user_query, max_results)
+
+    def stats(self) -> dict:
+        """Query-extraction cache hit rate, LLM gateway and Neo4j pool metrics."""
+        return {
+            "query_info_cache": self.query_extractor.stats(),
+            "llm": self.llm.stats(),
+            "neo4j": self.neo4j_driver.stats(),
+        }
+
+    async def close(self):
+        """Closes the Neo4j driver and LLM client connections."""
         if self.neo4j_driver:
-            self.neo4j_driver.close()
+            await self.neo4j_driver.close()
+        await self.llm.aclose()
 
 
 # Example usage
@@ -189,20 +227,23 @@ if __name__ == "__main__":
     parser.add_argument(
         "--api",
         type=str,
-        choices=["openai", "deepseek"],
+        choices=["openai", "deepseek", "local"],
         default="deepseek",
-        help="Specify which model API to use (openai or deepseek).",
+        help="Specify which model API to use (openai, deepseek, or local for the offline stand-in).",
     )
     args = parser.parse_args()
 
-    finder = None
-    try:
-        finder = CourseFinder(api_type=args.api)
-        candidates = finder.find_candidates(user_query=args.query)
-        print(f"Finding course candidates for query: '{args.query}' using API: {args.api}")
-        print(f"Candidate courses: {candidates}")
-    except Exception as e:
-        print(f"An error occurred: {e}")
-    finally:
-        if finder:
-            finder.close()
+    async def _main():
+        finder = None
+        try:
+            finder = CourseFinder(api_type=args.api)
+            candidates = await finder.find_candidates(user_query=args.query)
+            print(f"Finding course candidates for query: '{args.query}' using API: {args.api}")
+            print(f"Candidate courses: {candidates}")
+        except Exception as e:
+            print(f"An error occurred: {e}")
+        finally:
+            if finder:
+                await finder.close()
+
+    asyncio.run(_main())
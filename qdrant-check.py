@@ -1,14 +1,17 @@
 # sanity_check_qdrant.py
 """
 Checks that the embedded Qdrant database contains non-empty
-`yoga_pose`, `yoga_course`, and `yoga_category` collections and that
-vectors can be queried and retrieved with payloads.
+`yoga_pose`, `yoga_course`, `yoga_category`, `yoga_health_issue` and
+`yoga_anatomy` collections and that
+vectors can be queried and retrieved with payloads.  Also reports each
+collection's performance profile (HNSW, quantization, storage, payload
+indexes).
 """
 
-from services.vector_store import get_client, embed, shutdown_server
+from services.vector_store import get_client, embed, match_profile, shutdown_server
 import pathlib, os
 
-COLLECTIONS = ["yoga_course", "yoga_category", "yoga_pose"]
+COLLECTIONS = ["yoga_course", "yoga_category", "yoga_pose", "yoga_health_issue", "yoga_anatomy"]
 
 def main() -> None:
     qc = get_client()
@@ -16,6 +19,15 @@ def main() -> None:
         info = qc.get_collection(col)
         print(f"\n=== {col} ===")
         print("status:", info.status, "| points:", info.points_count)
+        hnsw = getattr(info.config, "hnsw_config", None)
+        if hnsw is not None:
+            vectors = info.config.params.vectors
+            quant = info.config.quantization_config
+            print("profile:", match_profile(info),
+                  "| hnsw m/ef_construct:", f"{hnsw.m}/{hnsw.ef_construct}",
+                  "| quantization:", quant.scalar.type if quant is not None and getattr(quant, "scalar", None) else quant,
+                  "| vectors on disk:", bool(vectors.on_disk))
+            print("payload indexes:", {k: str(v.data_type) for k, v in (info.payload_schema or {}).items()})
 
         if info.points_count == 0:
             print("⚠️  Collection is EMPTY — rebuild needed")
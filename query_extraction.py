@@ -0,0 +1,111 @@
+"""Structured extraction of the user query, shared by the runner and all agents.
+
+Every stage of the pipeline (course finder, category recommender, pose
+checker) needs the same JSON view of the user query (objectives,
+contraindications, poses to avoid, ...), produced by one LLM call with
+``get_user_query_key_info.prompt``.  The runner extracts it once and passes it
+along as ``query_info``; :class:`QueryInfoExtractor` backs up callers that do
+not, with an LRU cache keyed by model and normalised query text.  Concurrent
+requests for the same key share one in-flight LLM call.
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+PROMPT_FILE_PATH = Path(__file__).resolve().parent / "get_user_query_key_info.prompt"
+_CACHE_SIZE = int(os.getenv("QUERY_INFO_CACHE_SIZE", "256"))
+
+
+def query_cache_key(model: str, user_query: str) -> str:
+    """Cache key for *user_query*; whitespace and case differences share an entry."""
+    normalised = " ".join(user_query.split()).lower()
+    return hashlib.sha256(f"{model}\0{normalised}".encode("utf-8")).hexdigest()
+
+
+class QueryInfoExtractor:
+    """Extracts structured info from user queries with the LLM, caching by query."""
+
+    def __init__(self, llm, max_items: int = _CACHE_SIZE):
+        self.llm = llm
+        self.max_items = max_items
+        self._cache: OrderedDict[str, dict] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _call_llm(self, user_query: str) -> dict:
+        try:
+            with open(PROMPT_FILE_PATH, 'r') as f:
+                prompt_template = f.read().format(query=user_query)
+        except FileNotFoundError:
+            raise RuntimeError(f"Prompt file not found at {PROMPT_FILE_PATH}")
+
+        response = await self.llm.complete(
+            messages=[{"role": "user", "content": prompt_template}],
+            temperature=0.0,
+            response_format={"type": "json_object"}
+        )
+        return json.loads(response.choices[0].message.content)
+
+    async def extract(self, user_query: str) -> dict:
+        """Return the structured info for *user_query* (a private copy the caller may modify)."""
+        key = query_cache_key(self.llm.model, user_query)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(self._cache[key])
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            return copy.deepcopy(await asyncio.shield(inflight))
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            info = await self._call_llm(user_query)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Nobody else may be waiting; don't let the loop warn about it.
+            future.exception()
+            raise
+        else:
+            future.set_result(info)
+            self._cache[key] = info
+            while len(self._cache) > self.max_items:
+                self._cache.popitem(last=False)
+        finally:
+            del self._inflight[key]
+        return copy.deepcopy(info)
+
+    def stats(self) -> dict:
+        return {"items": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+async def extract_query_info(api_type: str, user_query: str) -> dict:
+    """One-shot extraction (used by the synchronous runner, one event loop per call)."""
+    from services.llm_gateway import get_gateway
+
+    llm = get_gateway(api_type)
+    try:
+        return await QueryInfoExtractor(llm).extract(user_query)
+    finally:
+        await llm.aclose()
+
+
+__all__ = [
+    "PROMPT_FILE_PATH",
+    "QueryInfoExtractor",
+    "extract_query_info",
+    "query_cache_key",
+]
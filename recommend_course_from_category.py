@@ -1,21 +1,44 @@
 import os
-import json
+import asyncio
 import argparse
-from openai import OpenAI
-from neo4j import GraphDatabase
-from services.vector_store import get_client, embed
-from pathlib import Path
+import random
+from services.vector_store import get_async_client, asearch_keywords
+from query_extraction import QueryInfoExtractor
+from services.llm_gateway import get_gateway
+from services.graph_db import get_async_graph
+from services.pose_graph import PoseGraph, PoseGraphCache
 
 # Configuration - Load from environment variables
-NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
-NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
-NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "12345678")
+# Where mini-sequences are picked: the in-memory pose graph ("snapshot") or one Cypher query ("cypher").
+COMPOSE_SOURCE = os.getenv("COMPOSE_SOURCE", "snapshot")
+# Picks every category's pose and its neighbours in one round trip. Each draw carries two
+# uniform numbers in [0, 1) chosen by the caller, so a seed reproduces the result.
+COMPOSE_QUERY = """
+UNWIND $draws AS draw
+MATCH (c:Category {id: draw.category})<-[:IN_CATEGORY]-(p:Pose)
+WITH draw.category AS category, draw.pose AS u_pose, draw.succeeding AS u_succeeding, p
+ORDER BY p.id
+WITH category, u_pose, u_succeeding, collect(p) AS poses
+WITH category, u_succeeding, poses[toInteger(u_pose * size(poses))] AS current
+OPTIONAL MATCH (current)-[:BUILD_UP]->(pre:Pose)
+WITH category, u_succeeding, current, pre
+ORDER BY pre.id
+WITH category, u_succeeding, current, collect(pre.id)[0] AS preceding
+OPTIONAL MATCH (current)-[:BALANCE_OUT|UNWIND]->(succ:Pose)
+WITH category, u_succeeding, current, preceding, succ
+ORDER BY succ.id
+WITH category, u_succeeding, current, preceding, collect(DISTINCT succ.id) AS succeeding
+RETURN category, preceding, current.id AS current,
+       CASE size(succeeding) WHEN 0 THEN null
+            ELSE succeeding[toInteger(u_succeeding * size(succeeding))] END AS succeeding
+"""
 # Qdrant persistence handled by services.vector_store
-PROMPT_FILE_PATH = Path(__file__).resolve().parent / "get_user_query_key_info.prompt"
 
 class CategoryCourseRecommender:
     """
     Recommends a yoga course by finding poses from relevant categories based on user objectives.
+
+    All I/O goes through asyncio clients so the agent server can serve requests concurrently.
     """
 
     def __init__(self, api_type: str):
@@ -25,123 +48,89 @@ class CategoryCourseRecommender:
         Args:
             api_type (str): The model API to use ('openai' or 'deepseek').
         """
-        self.api_client = None
-        self.api_model = ""
-        self._init_api_client(api_type)
-
-        self.neo4j_driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-
-        self.qclient = get_client()
-
-    def _init_api_client(self, api_type: str):
-        """Initializes the LLM API client."""
-        if api_type == 'deepseek':
-            api_key = os.getenv('DEEPSEEK_API_KEY')
-            if not api_key:
-                raise RuntimeError("Missing DEEPSEEK_API_KEY")
-            self.api_client = OpenAI(
-                api_key=api_key,
-                base_url="https://api.deepseek.com/v1"
-            )
-            self.api_model = "deepseek-chat"
-        elif api_type == 'openai':
-            api_key = os.getenv('OPENAI_API_KEY')
-            if not api_key:
-                raise RuntimeError("Missing OPENAI_API_KEY")
-            self.api_client = OpenAI(api_key=api_key)
-            self.api_model = "gpt-3.5-turbo"
-        else:
-            raise ValueError("Unsupported API type")
+        # Shared per-process LLM gateway (pooling, rate limits, retries, metrics)
+        self.llm = get_gateway(api_type)
+        self.query_extractor = QueryInfoExtractor(self.llm)
 
-    def _extract_query_info(self, user_query: str) -> dict:
-        """Extracts structured info from user query using the LLM."""
-        try:
-            with open(PROMPT_FILE_PATH, 'r') as f:
-                prompt_template = f.read().format(query=user_query)
-        except FileNotFoundError:
-            raise RuntimeError(f"Prompt file not found at {PROMPT_FILE_PATH}")
-
-        response = self.api_client.chat.completions.create(
-            model=self.api_model,
-            messages=[{"role": "user", "content": prompt_template}],
-            temperature=0.0,
-            response_format={"type": "json_object"}
-        )
-        return json.loads(response.choices[0].message.content)
-
-    def _find_similar_categories(self, objectives: list, k: int = 2) -> list:
+        # Shared per-process Neo4j driver (tuned pool, query metrics)
+        self.neo4j_driver = get_async_graph()
+        # In-memory pose graph: category sampling and neighbour lookups without Neo4j round trips
+        self.pose_graph = PoseGraphCache(self.neo4j_driver)
+        self.rng = random.Random()
+
+        self.qclient = get_async_client()
+
+    async def _extract_query_info(self, user_query: str, query_info: dict | None = None) -> dict:
+        """Returns *query_info* if the caller already extracted it, else the (cached) LLM extraction."""
+        if query_info is not None:
+            return query_info
+        return await self.query_extractor.extract(user_query)
+
+    async def _find_similar_categories(self, objectives: list, k: int = 2) -> list:
         """Find similar yoga categories via Qdrant."""
         if not objectives:
             return []
+        hits = await asearch_keywords(self.qclient, "yoga_category", objectives, k=k)
         category_names: set[str] = set()
-        for obj in objectives:
-            vec = embed([obj])[0]
-            resp = self.qclient.query_points(
-                collection_name="yoga_category",
-                query=vec,
-                limit=k,
-                with_payload=True,
-            )
-            category_names.update(p.payload["category"] for p in resp.points)
-        return list(category_names)
-
-    def _get_random_pose_for_category(self, tx, category_name: str) -> str | None:
-        """Gets a random pose name for a given category from Neo4j."""
-        result = tx.run(
-            """
-            MATCH (c:Category {id: $category_name})<-[:IN_CATEGORY]-(p:Pose)
-            RETURN p.id AS pose_name
-            ORDER BY rand()
-            LIMIT 1
-            """,
-            category_name=category_name
-        )
-        record = result.single()
-        return record["pose_name"] if record else None
-
-    def _find_related_poses(self, tx, pose_name: str) -> dict:
-        """Finds preceding and succeeding poses for a given pose."""
-        preceding_query = """
-        MATCH (preceding:Pose)<-[:BUILD_UP]-(current:Pose {id: $pose_name})
-        RETURN preceding.id AS pose_name
-        LIMIT 1
+        for points in hits.values():
+            category_names.update(p.payload["category"] for p in points)
+        return sorted(category_names)
+
+    @staticmethod
+    def _compose_from_snapshot(graph: PoseGraph, draws: list[dict]) -> dict[str, list[str]]:
         """
-        succeeding_query = """
-        MATCH (current:Pose {id: $pose_name})-[:BALANCE_OUT|UNWIND]->(succeeding:Pose)
-        RETURN succeeding.id AS pose_name
-        ORDER BY rand()
-        LIMIT 1
+        Picks each draw's category pose, its first BUILD_UP target (preceding) and one
+        BALANCE_OUT/UNWIND target (succeeding) from the pose graph snapshot.
+        Same choices as COMPOSE_QUERY for the same draws.
         """
-        
-        preceding_result = tx.run(preceding_query, pose_name=pose_name).single()
-        succeeding_result = tx.run(succeeding_query, pose_name=pose_name).single()
-        result = {
-            "preceding": preceding_result["pose_name"] if preceding_result else None,
-            "succeeding": succeeding_result["pose_name"] if succeeding_result else None,
+        sequences = {}
+        for draw in draws:
+            current = graph.pose_at(draw["category"], draw["pose"])
+            if current is None:
+                continue
+            preceding = graph.neighbours(current, "BUILD_UP")[:1]
+            succeeding = sorted(graph.neighbours(current, "BALANCE_OUT", "UNWIND"))
+            if succeeding:
+                succeeding = [succeeding[int(draw["succeeding"] * len(succeeding))]]
+            sequences[draw["category"]] = preceding + [current] + succeeding
+        return sequences
+
+    async def _compose_with_cypher(self, draws: list[dict]) -> dict[str, list[str]]:
+        """Picks the mini-sequences of all draws with one COMPOSE_QUERY round trip."""
+        async def _read(tx):
+            result = await tx.run(COMPOSE_QUERY, draws=draws)
+            return await result.data()
+
+        async with self.neo4j_driver.session() as session:
+            records = await session.execute_read(_read)
+        return {
+            r["category"]: [p for p in (r["preceding"], r["current"], r["succeeding"]) if p]
+            for r in records
         }
 
-        return result
-
-
-    def recommend_course(self, user_query: str) -> list:
+    async def recommend_course(self, user_query: str, query_info: dict | None = None, seed: int | None = None) -> list:
         """
         Main pipeline to generate a course from category-based pose selection.
 
         Args:
             user_query (str): The user's natural language query.
+            query_info (dict | None): Structured query info already extracted by the caller;
+                extracted (and cached) here if omitted.
+            seed (int | None): Seed of the random pose choices; the same seed and catalog
+                give the same course.
 
         Returns:
             list: A list of pose names for the recommended course.
         """
         # Step 1: Extract user objective
-        query_info = self._extract_query_info(user_query)
+        query_info = await self._extract_query_info(user_query, query_info)
         objectives = query_info.get("objective", [])
         if not objectives:
             print("No objective found in the query.")
             return []
 
         # Step 2: Find similar categories
-        similar_categories = self._find_similar_categories(objectives, k=2)
+        similar_categories = await self._find_similar_categories(objectives, k=2)
         if not similar_categories:
             print("No similar categories found.")
             return []
@@ -149,36 +138,40 @@ class CategoryCourseRecommender:
         print(f"Found similar categories: {similar_categories}")
 
         # Step 3: Build sequence for each category
+        rng = random.Random(seed) if seed is not None else self.rng
+        draws = [{"category": c, "pose": rng.random(), "succeeding": rng.random()} for c in similar_categories]
+        if COMPOSE_SOURCE == "cypher":
+            mini_sequences = await self._compose_with_cypher(draws)
+        else:
+            mini_sequences = self._compose_from_snapshot(await self.pose_graph.get(), draws)
+
         final_sequence = []
-        with self.neo4j_driver.session() as session:
-            for category in similar_categories:
-                current_pose = session.execute_read(self._get_random_pose_for_category, category)
-                if not current_pose:
-                    print(f"No pose found for category: {category}")
-                    continue
-                
-                related_poses = session.execute_read(self._find_related_poses, current_pose)
-                
-                mini_sequence = []
-                if related_poses.get("preceding"):
-                    mini_sequence.append(related_poses["preceding"])
-                
-                mini_sequence.append(current_pose)
-                
-                if related_poses.get("succeeding"):
-                    mini_sequence.append(related_poses["succeeding"])
-                
-                print(f"Generated sequence for category '{category}': {mini_sequence}")
-                final_sequence.extend(mini_sequence)
-        
+        for category in similar_categories:
+            mini_sequence = mini_sequences.get(category)
+            if not mini_sequence:
+                print(f"No pose found for category: {category}")
+                continue
+            print(f"Generated sequence for category '{category}': {mini_sequence}")
+            final_sequence.extend(mini_sequence)
+
         # Remove duplicates while preserving order
         seen = set()
         return [x for x in final_sequence if not (x in seen or seen.add(x))]
 
-    def close(self):
-        """Closes the Neo4j driver connection."""
+    def stats(self) -> dict:
+        """Query-extraction cache hit rate, pose graph snapshot, LLM gateway and Neo4j pool metrics."""
+        return {
+            "query_info_cache": self.query_extractor.stats(),
+            "pose_graph": self.pose_graph.stats(),
+            "llm": self.llm.stats(),
+            "neo4j": self.neo4j_driver.stats(),
+        }
+
+    async def close(self):
+        """Closes the Neo4j driver and LLM client connections."""
         if self.neo4j_driver:
-            self.neo4j_driver.close()
+            await self.neo4j_driver.close()
+        await self.llm.aclose()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -193,24 +186,27 @@ if __name__ == "__main__":
     parser.add_argument(
         "--api",
         type=str,
-        choices=["openai", "deepseek"],
+        choices=["openai", "deepseek", "local"],
         default="deepseek",
-        help="Specify which model API to use (openai or deepseek).",
+        help="Specify which model API to use (openai, deepseek, or local for the offline stand-in).",
     )
     args = parser.parse_args()
 
-    recommender = None
-    try:
-        recommender = CategoryCourseRecommender(api_type=args.api)
-        recommended_course = recommender.recommend_course(user_query=args.query)
-        print(f"\n--- Recommended Course for query: '{args.query}' ---")
-        if recommended_course:
-            for i, pose in enumerate(recommended_course, 1):
-                print(f"{i}. {pose}")
-        else:
-            print("Could not generate a recommendation.")
-    except Exception as e:
-        print(f"An error occurred: {e}")
-    finally:
-        if recommender:
-            recommender.close()
+    async def _main():
+        recommender = None
+        try:
+            recommender = CategoryCourseRecommender(api_type=args.api)
+            recommended_course = await recommender.recommend_course(user_query=args.query)
+            print(f"\n--- Recommended Course for query: '{args.query}' ---")
+            if recommended_course:
+                for i, pose in enumerate(recommended_course, 1):
+                    print(f"{i}. {pose}")
+            else:
+                print("Could not generate a recommendation.")
+        except Exception as e:
+            print(f"An error occurred: {e}")
+        finally:
+            if recommender:
+                await recommender.close()
+
+    asyncio.run(_main())
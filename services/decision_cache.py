@@ -0,0 +1,175 @@
+"""Cache of pose-suitability decisions made by the pose checker.
+
+A decision ("is pose P unsuitable for someone who must avoid A and has
+contraindications C?") depends only on the pose, the normalised restriction
+lists, the model that judged it and the catalog the pose checker reads.
+Decisions are keyed by ``sha256(pose id + sorted, lower-cased restrictions +
+provider/model)`` and every entry carries:
+
+• a TTL – entries older than ``ttl_seconds`` are treated as misses, since the
+  LLM part of a decision may drift with prompt or model changes;
+• the catalog version it was made against (see
+  ``build_graphrag.catalog_version``) – a rebuild invalidates every entry.
+
+Tiers mirror :mod:`services.embedding_cache`: an in-process LRU capped at
+``max_memory_items`` and, optionally, a SQLite table so decisions survive
+restarts and are shared between processes.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Sequence
+
+
+def _normalise(items: Iterable) -> list[str]:
+    return sorted({" ".join(str(item).split()).lower() for item in items if str(item).strip()})
+
+
+def decision_key(pose_name: str, poses_to_avoid: Sequence, contraindications: Sequence, model: str = "") -> str:
+    """Return the cache key of one pose decision; list order, case and spacing do not matter.
+
+    *model* names the provider and model that judge the pose (e.g. ``"deepseek/deepseek-chat"``),
+    so a shared SQLite tier never serves one model's verdicts to another.
+    """
+    signature = json.dumps([pose_name, _normalise(poses_to_avoid), _normalise(contraindications), model])
+    return hashlib.sha256(signature.encode("utf-8")).hexdigest()
+
+
+class DecisionCache:
+    """TTL'd, version-stamped LRU of pose decisions with an optional SQLite tier."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike | None = None,
+        ttl_seconds: float = 24 * 3600,
+        max_memory_items: int = 10_000,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_items = max_memory_items
+        # key -> (unsuitable, catalog version, stored_at)
+        self._memory: "OrderedDict[str, tuple[bool, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "stale": 0}
+
+        self._conn: sqlite3.Connection | None = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS decisions ("
+                " key TEXT PRIMARY KEY,"
+                " unsuitable INTEGER NOT NULL,"
+                " version TEXT NOT NULL,"
+                " stored_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_many(self, keys: Sequence[str], version: str) -> Dict[str, bool]:
+        """Return {key: unsuitable} for the keys with a live entry made against *version*."""
+        found: Dict[str, bool] = {}
+        now = time.time()
+        with self._lock:
+            disk_keys = []
+            for key in dict.fromkeys(keys):
+                entry = self._memory.get(key)
+                if entry is not None and self._valid(key, entry, version, now, in_memory=True):
+                    self._memory.move_to_end(key)
+                    found[key] = entry[0]
+                    self._stats["memory_hits"] += 1
+                elif entry is None:
+                    disk_keys.append(key)
+
+            if disk_keys and self._conn is not None:
+                for start in range(0, len(disk_keys), 500):
+                    chunk = disk_keys[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self._conn.execute(
+                        f"SELECT key, unsuitable, version, stored_at FROM decisions WHERE key IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+                    for key, unsuitable, row_version, stored_at in rows:
+                        entry = (bool(unsuitable), row_version, stored_at)
+                        if self._valid(key, entry, version, now, in_memory=False):
+                            found[key] = entry[0]
+                            self._remember(key, entry)
+                            self._stats["disk_hits"] += 1
+
+            self._stats["misses"] += sum(1 for k in dict.fromkeys(keys) if k not in found)
+        return found
+
+    def put_many(self, decisions: Dict[str, bool], version: str) -> None:
+        """Store {key: unsuitable} decisions made against catalog *version*."""
+        now = time.time()
+        with self._lock:
+            for key, unsuitable in decisions.items():
+                self._remember(key, (bool(unsuitable), version, now))
+            if self._conn is not None and decisions:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO decisions (key, unsuitable, version, stored_at) VALUES (?, ?, ?, ?)",
+                    [(key, int(bool(unsuitable)), version, now) for key, unsuitable in decisions.items()],
+                )
+                self._conn.execute(
+                    "DELETE FROM decisions WHERE stored_at < ? OR version != ?", (now - self.ttl_seconds, version)
+                )
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters, the hit rate and the current tier sizes."""
+        with self._lock:
+            stats: Dict[str, float] = dict(self._stats)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+            stats["memory_items"] = len(self._memory)
+            if self._conn is not None:
+                stats["disk_items"] = self._conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM decisions")
+                self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _valid(self, key: str, entry: tuple[bool, str, float], version: str, now: float, in_memory: bool) -> bool:
+        _, entry_version, stored_at = entry
+        if entry_version != version:
+            self._stats["stale"] += 1
+        elif now - stored_at > self.ttl_seconds:
+            self._stats["expired"] += 1
+        else:
+            return True
+        if in_memory:
+            del self._memory[key]
+        return False
+
+    def _remember(self, key: str, entry: tuple[bool, str, float]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+
+__all__ = ["DecisionCache", "decision_key"]
@@ -0,0 +1,216 @@
+"""Content-addressed, two-tier cache for sentence embeddings.
+
+Embeddings are keyed by ``sha256(model_name + text)`` so that the same string
+encoded by the same model is only ever computed once, across requests and
+across processes / rebuilds.
+
+Tiers:
+
+• memory – an in-process LRU (``OrderedDict``) capped at ``max_memory_items``.
+• disk   – a SQLite table capped at ``max_disk_items``; least recently used
+  rows are evicted when the cap is exceeded.  Vectors are stored as packed
+  float32 blobs, which is exactly what the sentence-transformer returns, so a
+  round trip through the cache is lossless.
+
+The cache is safe to share between threads (a single lock guards both tiers).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / ".embedding_cache" / "embeddings.sqlite3"
+
+
+def cache_key(model_name: str, text: str) -> str:
+    """Return the content address for *text* embedded with *model_name*."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _pack(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    vec = array("f")
+    vec.frombytes(blob)
+    return vec.tolist()
+
+
+class EmbeddingCache:
+    """In-memory LRU in front of a size-capped SQLite store."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike | None = DEFAULT_CACHE_PATH,
+        max_memory_items: int = 10_000,
+        max_disk_items: int = 200_000,
+    ):
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
+        self._conn: sqlite3.Connection | None = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " vector BLOB NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)"
+            )
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_or_compute(
+        self,
+        model_name: str,
+        texts: Sequence[str],
+        compute: Callable[[List[str]], List[List[float]]],
+    ) -> List[List[float]]:
+        """Return embeddings for *texts*, calling *compute* only for misses.
+
+        *compute* receives the distinct uncached texts (in first-seen order)
+        and must return one vector per text.
+        """
+        keys = [cache_key(model_name, t) for t in texts]
+        found = self._lookup(keys)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing:
+            vectors = compute(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self._store(computed)
+            found.update(computed)
+
+        return [found[k] for k in keys]
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and current tier sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._memory)
+            stats["disk_items"] = self._disk_count()
+        return stats
+
+    def clear(self) -> None:
+        """Drop every cached vector from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _lookup(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            disk_keys = []
+            for key in dict.fromkeys(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    self._stats["memory_hits"] += 1
+                else:
+                    disk_keys.append(key)
+
+            if disk_keys and self._conn is not None:
+                now = time.time()
+                for start in range(0, len(disk_keys), 500):
+                    chunk = disk_keys[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = _unpack(blob)
+                        found[key] = vector
+                        self._remember(key, vector)
+                        self._stats["disk_hits"] += 1
+                    if rows:
+                        self._conn.executemany(
+                            "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                            [(now, key) for key, _ in rows],
+                        )
+                self._conn.commit()
+
+            self._stats["misses"] += sum(1 for k in dict.fromkeys(keys) if k not in found)
+        return found
+
+    def _store(self, vectors: Dict[str, List[float]]) -> None:
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            if self._conn is None:
+                return
+            now = time.time()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)",
+                [(key, _pack(vec), now) for key, vec in vectors.items()],
+            )
+            overflow = self._disk_count() - self.max_disk_items
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    " SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self._stats["disk_evictions"] += overflow
+            self._conn.commit()
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    def _disk_count(self) -> int:
+        if self._conn is None:
+            return 0
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+__all__ = ["DEFAULT_CACHE_PATH", "EmbeddingCache", "cache_key"]
@@ -0,0 +1,195 @@
+import argparse
+import asyncio
+import dataclasses
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
+import uvicorn
+
+from services.vector_store import embedding_model_id, embed_local, embedding_cache_stats
+
+# --- Data Structures ---
+# These define the API contract for the embedding service.
+
+@dataclasses.dataclass
+class EmbedRequest:
+    texts: list[str]
+
+@dataclasses.dataclass
+class EmbedResponse:
+    vectors: list[list[float]]
+    model: str
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent embed requests into micro-batches.
+
+    The first request to arrive opens a batch; every request received within
+    ``window_s`` (or until ``max_batch`` texts are queued) joins it, and the
+    whole batch is encoded with one model call on a worker thread.
+    """
+
+    def __init__(self, window_s: float, max_batch: int):
+        self.window_s = window_s
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+        self.stats = {"requests": 0, "texts": 0, "batches": 0, "encode_seconds": 0.0}
+
+    def start(self) -> None:
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.window_s
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            texts = [t for item_texts, _ in batch for t in item_texts]
+            start = time.perf_counter()
+            try:
+                vectors = await asyncio.to_thread(embed_local, texts)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            self.stats["encode_seconds"] += time.perf_counter() - start
+            self.stats["requests"] += len(batch)
+            self.stats["texts"] += len(texts)
+            self.stats["batches"] += 1
+
+            offset = 0
+            for item_texts, future in batch:
+                if not future.done():
+                    future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+
+# This will hold the global micro-batcher, created within the lifespan context.
+batcher: MicroBatcher | None = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    FastAPI lifespan context manager: load the model once and start batching.
+    """
+    global batcher
+    await asyncio.to_thread(embed_local, ["warm-up"])
+    batcher = MicroBatcher(
+        window_s=app.state.batch_window_ms / 1000.0,
+        max_batch=app.state.max_batch,
+    )
+    batcher.start()
+    logging.info(f"Embedding model '{embedding_model_id()}' loaded.")
+    yield
+    await batcher.stop()
+    logging.info("Embedding service has been shut down.")
+
+# --- FastAPI Application ---
+
+app = FastAPI(
+    title="Embedding Service",
+    description="Shares one sentence-transformer per host and micro-batches concurrent embed calls.",
+    lifespan=lifespan
+)
+app.state.batch_window_ms = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+app.state.max_batch = int(os.getenv("EMBEDDING_MAX_BATCH", "64"))
+
+@app.post("/embed", response_model=EmbedResponse)
+async def embed_endpoint(request: EmbedRequest) -> EmbedResponse:
+    if not batcher:
+        raise HTTPException(status_code=503, detail="Service not available")
+    if not request.texts:
+        return EmbedResponse(vectors=[], model=embedding_model_id())
+    vectors = await batcher.embed(request.texts)
+    return EmbedResponse(vectors=vectors, model=embedding_model_id())
+
+@app.get("/info")
+async def info_endpoint() -> dict:
+    return {"model": embedding_model_id()}
+
+@app.get("/stats")
+async def stats_endpoint() -> dict:
+    stats = dict(batcher.stats) if batcher else {}
+    if stats.get("batches"):
+        stats["avg_batch_texts"] = stats["texts"] / stats["batches"]
+    stats["cache"] = embedding_cache_stats()
+    return stats
+
+def main():
+    """
+    Main entry point to start the server.
+    """
+    parser = argparse.ArgumentParser(description="Shared Embedding Service")
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8090,
+        help="The port for the API server to listen on (0 picks a free port).",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="The host for the API server to bind to.",
+    )
+    parser.add_argument(
+        "--batch-window-ms",
+        type=float,
+        default=app.state.batch_window_ms,
+        help="How long the first request of a batch waits for others to join.",
+    )
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=app.state.max_batch,
+        help="Maximum number of texts encoded in one model call.",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    app.state.batch_window_ms = args.batch_window_ms
+    app.state.max_batch = args.max_batch
+
+    logging.info(f"🧠 Starting Embedding Service on http://{args.host}:{args.port}")
+
+    uvicorn.run(
+        app,
+        host=args.host,
+        port=args.port,
+        log_level="info",
+        access_log=False,  # the runner pipes this process's output; skip a line per request
+    )
+
+if __name__ == "__main__":
+    main()
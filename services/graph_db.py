@@ -0,0 +1,210 @@
+"""Shared Neo4j access for the agents, the pose checker and the runner.
+
+One driver per process and flavour: :func:`get_async_graph` for the FastAPI
+services (``AsyncGraphDatabase``), :func:`get_graph` for blocking callers
+such as the runner.  The driver's pool is configured from the environment:
+
+• ``NEO4J_MAX_POOL_SIZE``        – connections kept per driver (default 50);
+• ``NEO4J_ACQUISITION_TIMEOUT``  – seconds a query waits for a free
+  connection before failing (default 30);
+• ``NEO4J_FETCH_SIZE``           – records pulled per network batch (default 1000);
+• ``NEO4J_MAX_CONNECTION_LIFETIME`` – seconds before a connection is
+  recycled (default 3600).
+
+Both wrappers keep the driver's ``session()`` interface, so callers write
+``async with graph.session() as session: await session.execute_read(...)``
+as before, and record:
+
+• pool utilization – open sessions against the pool size (a session holds at
+  most one connection at a time, so this bounds the connections in use), and
+  the peak since start;
+• query latency – wall time of every ``execute_read`` / ``execute_write``
+  (whole transaction function, retries included) and ``run`` (until the
+  server answers), with percentiles in :meth:`stats`.
+"""
+from __future__ import annotations
+
+import collections
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, List
+
+NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "12345678")
+MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "30"))
+FETCH_SIZE = int(os.getenv("NEO4J_FETCH_SIZE", "1000"))
+MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+
+
+def _driver_config() -> Dict[str, Any]:
+    return {
+        "auth": (NEO4J_USER, NEO4J_PASSWORD),
+        "max_connection_pool_size": MAX_POOL_SIZE,
+        "connection_acquisition_timeout": ACQUISITION_TIMEOUT,
+        "max_connection_lifetime": MAX_CONNECTION_LIFETIME,
+    }
+
+
+class _Metrics:
+    """Session and query counters shared by the sync and async wrappers."""
+
+    def __init__(self, pool_size: int):
+        self.pool_size = pool_size
+        self.open_sessions = 0
+        self._latencies: collections.deque = collections.deque(maxlen=1000)
+        self._stats = {"sessions": 0, "peak_sessions": 0, "queries": 0, "errors": 0, "query_seconds": 0.0}
+
+    def opened(self) -> None:
+        self.open_sessions += 1
+        self._stats["sessions"] += 1
+        self._stats["peak_sessions"] = max(self._stats["peak_sessions"], self.open_sessions)
+
+    def closed(self) -> None:
+        self.open_sessions -= 1
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self._stats["queries"] += 1
+        self._stats["query_seconds"] += seconds
+        if ok:
+            self._latencies.append(seconds)
+        else:
+            self._stats["errors"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        stats["open_sessions"] = self.open_sessions
+        stats["max_pool_size"] = self.pool_size
+        stats["pool_utilization"] = self.open_sessions / self.pool_size
+        stats["peak_pool_utilization"] = self._stats["peak_sessions"] / self.pool_size
+        latencies: List[float] = sorted(self._latencies)
+        if latencies:
+            stats["latency_p50_ms"] = latencies[len(latencies) // 2] * 1000
+            stats["latency_p95_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+        return stats
+
+
+class _TimedSession:
+    """A driver session whose queries and transaction functions are timed."""
+
+    def __init__(self, session, metrics: _Metrics):
+        self._session = session
+        self._metrics = metrics
+
+    def _timed(self, call, *args, **kwargs):
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = call(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            self._metrics.record(time.perf_counter() - start, ok)
+
+    def run(self, query, parameters=None, **kwargs):
+        return self._timed(self._session.run, query, parameters, **kwargs)
+
+    def execute_read(self, transaction_function, *args, **kwargs):
+        return self._timed(self._session.execute_read, transaction_function, *args, **kwargs)
+
+    def execute_write(self, transaction_function, *args, **kwargs):
+        return self._timed(self._session.execute_write, transaction_function, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class _AsyncTimedSession(_TimedSession):
+    """Async counterpart of :class:`_TimedSession`."""
+
+    async def _timed(self, call, *args, **kwargs):
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = await call(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            self._metrics.record(time.perf_counter() - start, ok)
+
+
+class GraphDB:
+    """Blocking Neo4j driver with the shared pool settings and metrics."""
+
+    def __init__(self, uri: str = NEO4J_URI):
+        from neo4j import GraphDatabase
+
+        self.driver = GraphDatabase.driver(uri, **_driver_config())
+        self._metrics = _Metrics(MAX_POOL_SIZE)
+
+    @contextmanager
+    def session(self, **config):
+        config.setdefault("fetch_size", FETCH_SIZE)
+        self._metrics.opened()
+        try:
+            with self.driver.session(**config) as session:
+                yield _TimedSession(session, self._metrics)
+        finally:
+            self._metrics.closed()
+
+    def stats(self) -> Dict[str, Any]:
+        """Session counts, pool utilization and query latency percentiles."""
+        return self._metrics.stats()
+
+    def close(self) -> None:
+        if _graphs.get("sync") is self:
+            del _graphs["sync"]
+        self.driver.close()
+
+
+class AsyncGraphDB:
+    """``AsyncGraphDatabase`` driver with the shared pool settings and metrics."""
+
+    def __init__(self, uri: str = NEO4J_URI):
+        from neo4j import AsyncGraphDatabase
+
+        self.driver = AsyncGraphDatabase.driver(uri, **_driver_config())
+        self._metrics = _Metrics(MAX_POOL_SIZE)
+
+    @asynccontextmanager
+    async def session(self, **config):
+        config.setdefault("fetch_size", FETCH_SIZE)
+        self._metrics.opened()
+        try:
+            async with self.driver.session(**config) as session:
+                yield _AsyncTimedSession(session, self._metrics)
+        finally:
+            self._metrics.closed()
+
+    def stats(self) -> Dict[str, Any]:
+        """Session counts, pool utilization and query latency percentiles."""
+        return self._metrics.stats()
+
+    async def close(self) -> None:
+        if _graphs.get("async") is self:
+            del _graphs["async"]
+        await self.driver.close()
+
+
+_graphs: Dict[str, Any] = {}
+
+
+def get_graph() -> GraphDB:
+    """The process-wide blocking Neo4j driver, created on first use."""
+    graph = _graphs.get("sync")
+    if graph is None:
+        graph = _graphs["sync"] = GraphDB()
+    return graph
+
+
+def get_async_graph() -> AsyncGraphDB:
+    """The process-wide async Neo4j driver, created on first use."""
+    graph = _graphs.get("async")
+    if graph is None:
+        graph = _graphs["async"] = AsyncGraphDB()
+    return graph
+
+
+__all__ = ["AsyncGraphDB", "GraphDB", "get_async_graph", "get_graph"]
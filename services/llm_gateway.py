@@ -0,0 +1,274 @@
+"""Shared LLM client layer used by every agent, the pose checker and the builder.
+
+One :class:`LLMGateway` per provider and process (see :func:`get_gateway`)
+wraps an ``AsyncOpenAI`` client and adds what fan-out needs:
+
+• pooling   – one keep-alive ``httpx.AsyncClient`` with bounded connections
+  (``LLM_MAX_CONNECTIONS``, default 16) instead of a pool per class.
+• scheduling – two token buckets, requests/min (``LLM_RPM``) and tokens/min
+  (``LLM_TPM``); a call waits until both have room, so a burst is spread out
+  instead of turning into a 429 storm.  Token cost is estimated up front
+  (prompt chars / 4 + ``max_tokens``) and corrected from ``usage`` afterwards.
+• retries   – 429, 5xx, timeouts and connection errors are retried up to
+  ``LLM_MAX_RETRIES`` times with full-jitter exponential backoff, honouring
+  ``Retry-After`` when the provider sends it.
+• circuit breaker – after ``LLM_BREAKER_FAILURES`` consecutive failed calls
+  the gateway fails fast with :class:`CircuitOpenError` for
+  ``LLM_BREAKER_COOLDOWN`` seconds, then lets one trial call through.
+• metrics   – per-call latency, token usage, retries and errors
+  (:meth:`LLMGateway.stats`).
+
+Callers use :meth:`LLMGateway.complete`, which takes the usual
+``chat.completions.create`` keyword arguments minus ``model``.
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+# api_type -> (base_url, default model, API key env var or None if no key is needed)
+PROVIDERS: Dict[str, tuple[str | None, str, str | None]] = {
+    "deepseek": ("https://api.deepseek.com/v1", "deepseek-chat", "DEEPSEEK_API_KEY"),
+    "openai": (None, "gpt-3.5-turbo", "OPENAI_API_KEY"),
+    # Offline stand-in (services/llm_standin); LLM_STANDIN_URL overrides the address.
+    "local": ("http://127.0.0.1:8010/v1", "standin", None),
+}
+
+_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "16"))
+_REQUESTS_PER_MINUTE = float(os.getenv("LLM_RPM", "300"))
+_TOKENS_PER_MINUTE = float(os.getenv("LLM_TPM", "300000"))
+_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+_BACKOFF_CAP = float(os.getenv("LLM_BACKOFF_CAP", "20"))
+_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider that has been failing."""
+
+
+class TokenBucket:
+    """Refills ``rate_per_minute`` units per minute up to ``capacity``; ``acquire`` waits for room."""
+
+    def __init__(self, rate_per_minute: float, capacity: float | None = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Take *amount* units, sleeping until available; returns the seconds waited."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:  # FIFO: later callers queue behind the one waiting
+            while True:
+                self._refill()
+                if self._level >= amount:
+                    self._level -= amount
+                    return waited
+                delay = (amount - self._level) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def adjust(self, delta: float) -> None:
+        """Give back (positive) or charge (negative) units after the real cost is known."""
+        self._refill()
+        self._level = min(self.capacity, self._level + delta)
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; half-opens (one trial call) after the cooldown."""
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def before_call(self) -> bool:
+        """Raises CircuitOpenError if calls are blocked; returns True if this call is the half-open trial."""
+        state = self.state
+        if state == "open" or (state == "half-open" and self._trial_in_flight):
+            raise CircuitOpenError(
+                f"LLM circuit open after {self.failures} consecutive failures; "
+                f"retrying in {self.cooldown - (time.monotonic() - self.opened_at):.0f}s"
+            )
+        if state == "half-open":
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """Frees the half-open trial slot of a call that ended without a verdict (e.g. cancelled)."""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+def _estimate_tokens(kwargs: Dict[str, Any]) -> int:
+    chars = sum(len(str(m.get("content", ""))) for m in kwargs.get("messages", []))
+    return chars // 4 + int(kwargs.get("max_tokens") or 256)
+
+
+def _retry_after(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _is_retryable(exc: Exception) -> bool:
+    import openai
+
+    if isinstance(exc, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
+
+
+class LLMGateway:
+    """Rate-limited, retrying, circuit-broken chat completions over one pooled client."""
+
+    def __init__(self, api_type: str, base_url: str | None = None, api_key: str | None = None, model: str | None = None):
+        import httpx
+        from openai import AsyncOpenAI
+
+        if api_type not in PROVIDERS:
+            raise ValueError("Unsupported API type")
+        default_url, default_model, key_env = PROVIDERS[api_type]
+        if key_env is None:
+            api_key = api_key or "not-needed"
+            default_url = os.getenv("LLM_STANDIN_URL", default_url)
+        api_key = api_key or os.getenv(key_env)
+        if not api_key:
+            raise RuntimeError(f"Missing {key_env}")
+        self.api_type = api_type
+        self.model = model or default_model
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=_MAX_CONNECTIONS, max_keepalive_connections=_MAX_CONNECTIONS),
+            timeout=httpx.Timeout(_TIMEOUT, connect=10.0),
+        )
+        # Retries are ours (jittered, rate- and breaker-aware), not the SDK's.
+        self.client = AsyncOpenAI(
+            api_key=api_key, base_url=base_url or default_url, http_client=self._http, max_retries=0
+        )
+        self.requests = TokenBucket(_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(_TOKENS_PER_MINUTE)
+        self.breaker = CircuitBreaker(_BREAKER_FAILURES, _BREAKER_COOLDOWN)
+        self._latencies: collections.deque = collections.deque(maxlen=1000)
+        self._stats = {
+            "calls": 0, "errors": 0, "retries": 0, "rate_limited": 0, "circuit_rejections": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "queue_seconds": 0.0,
+        }
+
+    async def complete(self, **kwargs):
+        """``chat.completions.create(**kwargs)`` with the gateway's model, scheduling and retries."""
+        kwargs.setdefault("model", self.model)
+        estimate = _estimate_tokens(kwargs)
+        attempt = 0
+        while True:
+            try:
+                trial = self.breaker.before_call()
+            except CircuitOpenError:
+                self._stats["circuit_rejections"] += 1
+                raise
+            try:
+                self._stats["queue_seconds"] += await self.requests.acquire(1)
+                self._stats["queue_seconds"] += await self.tokens.acquire(estimate)
+                start = time.perf_counter()
+                response = await self.client.chat.completions.create(**kwargs)
+            except BaseException as exc:
+                if trial:
+                    # Free the half-open slot on any exit, including cancellation (not an
+                    # Exception); otherwise every later call fails fast until restart.
+                    self.breaker.release_trial()
+                if not isinstance(exc, Exception):
+                    raise
+                retryable = _is_retryable(exc)
+                if getattr(exc, "status_code", None) == 429:
+                    self._stats["rate_limited"] += 1
+                if not retryable:
+                    # The provider answered (e.g. 400): not a sign of an outage.
+                    self._stats["errors"] += 1
+                    self.breaker.record_success()
+                    raise
+                if attempt >= _MAX_RETRIES:
+                    self._stats["errors"] += 1
+                    self.breaker.record_failure()
+                    raise
+                attempt += 1
+                self._stats["retries"] += 1
+                delay = _retry_after(exc) or random.uniform(0, min(_BACKOFF_CAP, _BACKOFF_BASE * 2 ** attempt))
+                logging.warning(f"LLM call failed ({exc.__class__.__name__}); retry {attempt}/{_MAX_RETRIES} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            self._latencies.append(time.perf_counter() - start)
+            self.breaker.record_success()
+            self._stats["calls"] += 1
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                self._stats["prompt_tokens"] += usage.prompt_tokens or 0
+                self._stats["completion_tokens"] += usage.completion_tokens or 0
+                self.tokens.adjust(estimate - (usage.total_tokens or estimate))
+            return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Call counts, token usage, retries/errors, breaker state and latency percentiles."""
+        stats: Dict[str, Any] = dict(self._stats)
+        latencies: List[float] = sorted(self._latencies)
+        if latencies:
+            stats["latency_p50_ms"] = latencies[len(latencies) // 2] * 1000
+            stats["latency_p95_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+        stats["circuit"] = self.breaker.state
+        stats["model"] = self.model
+        return stats
+
+    async def aclose(self) -> None:
+        if _gateways.get(self.api_type) is self:
+            del _gateways[self.api_type]
+        await self.client.close()
+
+
+_gateways: Dict[str, LLMGateway] = {}
+
+
+def get_gateway(api_type: str) -> LLMGateway:
+    """The process-wide gateway for *api_type* ('openai', 'deepseek' or 'local'), created on first use."""
+    gateway = _gateways.get(api_type)
+    if gateway is None:
+        gateway = _gateways[api_type] = LLMGateway(api_type)
+    return gateway
+
+
+__all__ = ["CircuitOpenError", "LLMGateway", "PROVIDERS", "TokenBucket", "get_gateway"]
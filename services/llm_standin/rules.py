@@ -0,0 +1,193 @@
+"""Deterministic answers to the prompts this repository sends to the LLM.
+
+Each rule recognises one prompt family by its fixed wording and answers it
+with simple keyword matching, in the format the caller parses:
+
+• query extraction (``get_user_query_key_info.prompt``) – JSON with
+  objective / contraindications / body parts / poses to avoid / durations;
+• course match (``course_match_prompt``) – ``yes`` / ``no`` / ``n/a``;
+• single pose check (``YogaPoseChecker._decide_pose``) – ``true`` / ``false``;
+• batched pose checks (``YogaPoseChecker`` sequence checks and the
+  health-issue matrix in ``build_graphrag.py``) – ``{"unsuitable": {...}}``.
+
+The answers are plausible rather than good: the point is exercising the whole
+pipeline, with realistic prompt/response sizes, without a remote model.
+"""
+from __future__ import annotations
+
+import ast
+import json
+import re
+
+_STOPWORDS = {
+    "a", "an", "and", "any", "are", "as", "at", "be", "but", "by", "can", "can't", "cannot", "do", "for",
+    "from", "have", "i", "if", "in", "is", "it", "its", "me", "my", "need", "no", "not", "of", "on", "or",
+    "please", "session", "so", "some", "something", "that", "the", "this", "to", "too", "up", "with",
+    "yoga", "you", "your", "pose", "poses", "practice", "minute", "minutes", "min",
+}
+
+BODY_PARTS = [
+    "neck", "shoulder", "wrist", "elbow", "arm", "chest", "back", "spine", "core", "abdomen", "hip",
+    "hamstring", "quadricep", "glute", "knee", "leg", "ankle", "foot", "head",
+]
+
+OBJECTIVES = {
+    "strength": "body strength",
+    "strong": "body strength",
+    "relax": "mind relaxation",
+    "calm": "mind relaxation",
+    "sleep": "better sleep",
+    "stress": "stress relief",
+    "flexib": "flexibility",
+    "stretch": "flexibility",
+    "balance": "balance",
+    "energ": "energy boost",
+    "breath": "breathing control",
+    "posture": "posture improvement",
+}
+
+_CONTRAINDICATION_PATTERNS = [
+    r"\b(?:weak|bad|sore|stiff|injured|painful|sensitive) ({parts})s?\b",
+    r"\b({parts})s? (?:pain|injury|injuries|problems?|issues?)\b",
+    r"\bpressur\w* (?:on )?(?:the |my )?({parts})s?\b",
+]
+_CONDITIONS = ["high blood pressure", "low blood pressure", "pregnan", "glaucoma", "vertigo", "sciatica", "asthma"]
+_AVOID_POSE = re.compile(
+    r"(?:can't|cannot|can not|no|avoid|avoiding|without|not)\s+(?:do\s+|doing\s+)?(?:any\s+)?"
+    r"([a-z\-]+stands?|[a-z\-]+(?: [a-z\-]+)? pose|inversions?|backbends?|arm balances?)"
+)
+
+
+def words(text: str) -> set[str]:
+    """Lower-cased content words of *text* with a crude plural strip."""
+    result = set()
+    for word in re.findall(r"[a-z][a-z'\-]+", text.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        result.add(word)
+    return result
+
+
+def _parse_list(text: str) -> list:
+    try:
+        value = ast.literal_eval(text.strip())
+    except (ValueError, SyntaxError):
+        return [text.strip()] if text.strip() else []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _unsuitable(name: str, caution: str, avoid: list, restrictions: list) -> bool:
+    """A pose is unsuitable if its name shares a word with a pose to avoid, or its
+    caution shares a word with a restriction."""
+    name_words, caution_words = words(name), words(caution)
+    if any(name_words & words(str(pose)) for pose in avoid):
+        return True
+    return any(caution_words & words(str(item)) for item in restrictions)
+
+
+# ---------------------------------------------------------------------------
+# Prompt families
+# ---------------------------------------------------------------------------
+
+def extract_query_info(query: str) -> dict:
+    text = query.lower()
+    parts = "|".join(BODY_PARTS)
+
+    objectives = list(dict.fromkeys(label for key, label in OBJECTIVES.items() if key in text))[:2]
+
+    contraindications = []
+    for pattern in _CONTRAINDICATION_PATTERNS:
+        for match in re.finditer(pattern.format(parts=parts), text):
+            contraindications.append(match.group(0))
+    contraindications += [c for c in _CONDITIONS if c in text]
+    contraindications = list(dict.fromkeys(contraindications))[:3]
+
+    restricted = set().union(*(words(c) for c in contraindications)) if contraindications else set()
+    body_parts = [p for p in BODY_PARTS if re.search(rf"\b{p}s?\b", text) and p not in restricted][:3]
+
+    poses_to_avoid = list(dict.fromkeys(m.group(1) for m in _AVOID_POSE.finditer(text)))[:3]
+
+    minimum = maximum = ""
+    duration = re.search(r"(\d+)\s*[- ]?\s*(minute|min|hour|hr)", text)
+    if duration:
+        seconds = int(duration.group(1)) * (3600 if duration.group(2) in ("hour", "hr") else 60)
+        minimum, maximum = str(int(seconds * 0.9)), str(seconds)
+
+    return {
+        "objective": objectives,
+        "contraindications": contraindications,
+        "physical body parts to train": body_parts,
+        "poses to avoid": poses_to_avoid,
+        "minimum duration": minimum,
+        "maximum duration": maximum,
+    }
+
+
+def course_match(description: str, query: str) -> str:
+    overlap = len(words(description) & words(query))
+    if overlap >= 2:
+        return "yes"
+    return "n/a" if overlap == 1 else "no"
+
+
+def _pose_lines(prompt: str) -> dict[str, str]:
+    poses = {}
+    for line in prompt.split("\n"):
+        match = re.match(r"- (.+?): (.*)$", line)
+        if match:
+            caution = match.group(2)
+            poses[match.group(1)] = "" if caution == "no caution" else caution
+    return poses
+
+
+def judge_poses(prompt: str) -> dict:
+    poses = _pose_lines(prompt)
+    issue = re.search(r"^Health issue: (.*)$", prompt, re.M)
+    if issue:
+        careful = re.search(r"^Practices to be careful with: (.*)$", prompt, re.M)
+        restrictions = [issue.group(1).split(".")[0]] + ([careful.group(1)] if careful else [])
+        avoid = []
+    else:
+        avoid_match = re.search(r"^Poses to avoid: (.*)\.$", prompt, re.M)
+        contra_match = re.search(r"^Contraindications: (.*)\.$", prompt, re.M)
+        avoid = _parse_list(avoid_match.group(1)) if avoid_match else []
+        restrictions = _parse_list(contra_match.group(1)) if contra_match else []
+    return {"unsuitable": {name: _unsuitable(name, caution, avoid, restrictions) for name, caution in poses.items()}}
+
+
+def judge_pose(prompt: str) -> str:
+    pose = re.search(r"yoga pose '(.*?)' and its practice caution: '(.*?)'\.", prompt, re.S)
+    avoid = re.search(r"list of poses to avoid: (.*)\.\n", prompt)
+    contra = re.search(r"contraindications listed here: (.*)\.\n", prompt)
+    if not pose:
+        return "false"
+    unsuitable = _unsuitable(
+        pose.group(1),
+        pose.group(2),
+        _parse_list(avoid.group(1)) if avoid else [],
+        _parse_list(contra.group(1)) if contra else [],
+    )
+    return "true" if unsuitable else "false"
+
+
+def answer(prompt: str, json_mode: bool = False) -> str:
+    """Return the stand-in reply to *prompt* (JSON text when *json_mode*)."""
+    if "1. User Query:" in prompt:
+        query = prompt.split("1. User Query:", 1)[1].split("2. Instructions", 1)[0].strip()
+        return json.dumps(extract_query_info(query))
+    if '{"unsuitable"' in prompt:
+        return json.dumps(judge_poses(prompt))
+    if "Answer only one of the three words: yes, no, or n/a" in prompt:
+        description = re.search(r"Course description: (.*?)\nUser query:", prompt, re.S)
+        query = re.search(r"User query: (.*?)\n", prompt, re.S)
+        if description and query:
+            return course_match(description.group(1), query.group(1))
+        return "n/a"
+    if "answer only 'true' if it is unsuitable" in prompt:
+        return judge_pose(prompt)
+    return "{}" if json_mode else "n/a"
+
+
+__all__ = ["answer", "course_match", "extract_query_info", "judge_pose", "judge_poses", "words"]
@@ -0,0 +1,296 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from fastapi import FastAPI, HTTPException
+import uvicorn
+
+from services.llm_standin import rules
+
+# Offline, OpenAI-compatible stand-in for the chat completions API.
+#
+# Modes:
+#   rules  – answers the prompts used in this repo deterministically (services/llm_standin/rules.py).
+#   record – forwards every call to a real provider (--upstream) and appends the answer to a cassette.
+#   replay – serves answers from the cassette; calls it has not seen are answered by the rules
+#            and counted as misses (or rejected with 404 when --strict).
+# rules and replay add synthetic latency: --latency-ms ± --jitter-ms, seeded for repeatable runs,
+# or each entry's recorded latency with --recorded-latency.
+
+MODEL_ID = "standin"
+
+
+def cassette_key(request: dict) -> str:
+    """Key of a chat request; the model name is left out so recordings replay under any model."""
+    material = {k: request.get(k) for k in ("messages", "temperature", "max_tokens", "response_format")}
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Append-only JSON Lines file of recorded {key, request, content, usage, latency_ms} entries."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self._lock = asyncio.Lock()
+        if path.exists():
+            with open(path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry
+
+    async def add(self, entry: dict) -> None:
+        async with self._lock:
+            self.entries[entry["key"]] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+class StandIn:
+    """Answers chat requests according to the configured mode and keeps call counters."""
+
+    def __init__(self, mode: str, cassette: Cassette | None, upstream: str | None, latency_ms: float,
+                 jitter_ms: float, recorded_latency: bool, strict: bool, seed: int):
+        self.mode = mode
+        self.cassette = cassette
+        self.upstream = None
+        if mode == "record":
+            from services.llm_gateway import get_gateway
+
+            self.upstream = get_gateway(upstream)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.recorded_latency = recorded_latency
+        self.strict = strict
+        self._random = random.Random(seed)
+        self.stats = {"requests": 0, "recorded": 0, "replayed": 0, "replay_misses": 0, "rules": 0}
+
+    async def _delay(self, recorded_ms: float | None = None) -> None:
+        if recorded_ms is not None and self.recorded_latency:
+            delay_ms = recorded_ms
+        else:
+            delay_ms = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000.0)
+
+    async def complete(self, request: dict) -> tuple[str, dict | None]:
+        """Return (content, usage or None) for one chat request."""
+        self.stats["requests"] += 1
+        key = cassette_key(request)
+
+        if self.mode == "record":
+            start = time.perf_counter()
+            upstream_request = {k: v for k, v in request.items() if k not in ("model", "stream")}
+            response = await self.upstream.complete(**upstream_request)
+            latency_ms = (time.perf_counter() - start) * 1000
+            content = response.choices[0].message.content
+            usage = response.usage.model_dump() if getattr(response, "usage", None) is not None else None
+            await self.cassette.add({
+                "key": key, "request": upstream_request, "content": content, "usage": usage, "latency_ms": latency_ms,
+            })
+            self.stats["recorded"] += 1
+            return content, usage
+
+        if self.mode == "replay":
+            entry = self.cassette.entries.get(key)
+            if entry is not None:
+                self.stats["replayed"] += 1
+                await self._delay(entry.get("latency_ms"))
+                return entry["content"], entry.get("usage")
+            self.stats["replay_misses"] += 1
+            if self.strict:
+                raise HTTPException(status_code=404, detail="Request not in cassette")
+
+        self.stats["rules"] += 1
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+        await self._delay()
+        return rules.answer(prompt, json_mode), None
+
+
+standin: StandIn | None = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    FastAPI lifespan context manager: load the cassette and, when recording, the upstream client.
+    """
+    global standin
+    config = app.state.config
+    cassette = Cassette(Path(config["cassette"])) if config["cassette"] else None
+    if config["mode"] in ("record", "replay") and cassette is None:
+        raise RuntimeError(f"--cassette is required in {config['mode']} mode")
+    standin = StandIn(
+        mode=config["mode"],
+        cassette=cassette,
+        upstream=config["upstream"],
+        latency_ms=config["latency_ms"],
+        jitter_ms=config["jitter_ms"],
+        recorded_latency=config["recorded_latency"],
+        strict=config["strict"],
+        seed=config["seed"],
+    )
+    entries = len(cassette.entries) if cassette else 0
+    logging.info(f"LLM stand-in ready: mode={config['mode']}, cassette entries={entries}")
+    yield
+    if standin.upstream is not None:
+        await standin.upstream.aclose()
+    logging.info("LLM stand-in has been shut down.")
+
+
+app = FastAPI(
+    title="LLM Stand-in",
+    description="OpenAI-compatible chat completions served from rules or a record/replay cassette.",
+    lifespan=lifespan
+)
+app.state.config = {
+    "mode": os.getenv("LLM_STANDIN_MODE", "rules"),
+    "cassette": os.getenv("LLM_STANDIN_CASSETTE") or None,
+    "upstream": os.getenv("LLM_STANDIN_UPSTREAM", "deepseek"),
+    "latency_ms": float(os.getenv("LLM_STANDIN_LATENCY_MS", "0")),
+    "jitter_ms": float(os.getenv("LLM_STANDIN_JITTER_MS", "0")),
+    "recorded_latency": False,
+    "strict": False,
+    "seed": 0,
+}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: dict) -> dict:
+    if not standin:
+        raise HTTPException(status_code=503, detail="Service not available")
+    if request.get("stream"):
+        raise HTTPException(status_code=400, detail="Streaming is not supported")
+    content, usage = await standin.complete(request)
+    if usage is None:
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in request.get("messages", []))
+        prompt_tokens, completion_tokens = prompt_chars // 4 + 1, len(content) // 4 + 1
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model") or MODEL_ID,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": usage,
+    }
+
+
+@app.get("/stats")
+async def stats_endpoint() -> dict:
+    stats = dict(standin.stats) if standin else {}
+    stats["mode"] = app.state.config["mode"]
+    if standin and standin.upstream is not None:
+        stats["upstream"] = standin.upstream.stats()
+    return stats
+
+
+def main():
+    """
+    Main entry point to start the server.
+    """
+    parser = argparse.ArgumentParser(description="Offline LLM stand-in (OpenAI-compatible)")
+    parser.add_argument(
+        "--mode",
+        choices=["rules", "record", "replay"],
+        default=app.state.config["mode"],
+        help="rules: keyword-based answers; record: proxy to --upstream and save; replay: serve the cassette.",
+    )
+    parser.add_argument(
+        "--cassette",
+        type=str,
+        default=app.state.config["cassette"],
+        help="JSON Lines file written in record mode and read in replay mode.",
+    )
+    parser.add_argument(
+        "--upstream",
+        choices=["openai", "deepseek"],
+        default=app.state.config["upstream"],
+        help="Real provider used in record mode.",
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=app.state.config["latency_ms"],
+        help="Synthetic latency added to every rules/replay answer.",
+    )
+    parser.add_argument(
+        "--jitter-ms",
+        type=float,
+        default=app.state.config["jitter_ms"],
+        help="Uniform jitter (±) around --latency-ms.",
+    )
+    parser.add_argument(
+        "--recorded-latency",
+        action="store_true",
+        help="In replay mode, wait as long as the recorded call took instead of --latency-ms.",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="In replay mode, reject calls missing from the cassette instead of answering them by rules.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the latency jitter.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8010,
+        help="The port for the API server to listen on (0 picks a free port).",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="The host for the API server to bind to.",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    app.state.config = {
+        "mode": args.mode,
+        "cassette": args.cassette,
+        "upstream": args.upstream,
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "recorded_latency": args.recorded_latency,
+        "strict": args.strict,
+        "seed": args.seed,
+    }
+
+    logging.info(f"🤖 Starting LLM Stand-in ({args.mode}) on http://{args.host}:{args.port}")
+
+    uvicorn.run(
+        app,
+        host=args.host,
+        port=args.port,
+        log_level="info",
+        access_log=False,  # one line per call would add I/O to every benchmarked request
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""Embedded exact-search vector index backed by NumPy.
+
+An alternative to the Qdrant server for small catalogs: each collection is a
+memory-mapped float32 matrix (``<name>.<version>.f32``, rows L2-normalised so
+a dot product is the cosine similarity) plus a JSON sidecar (``<name>.json``)
+with the point ids, the payloads and the name of its matrix file.  Opening a collection is a ``stat`` and an
+``mmap`` – no server process, no readiness polling – and top-k is one
+vectorised matrix product followed by ``argpartition``.
+
+:class:`NumpyVectorStore` implements the subset of the ``QdrantClient`` API
+used in this repo (``collection_exists``, ``get_collection``, ``scroll``,
+``upsert``, ``delete``, ``query_points``, ``query_batch_points``) so that
+``services.vector_store`` can hand it out in place of a Qdrant client when
+``VECTOR_BACKEND=numpy``.  :class:`AsyncNumpyVectorStore` exposes the same
+calls as coroutines for the FastAPI servers.
+
+Writes rewrite the collection atomically, which is fine for catalogs that
+are rebuilt offline: the matrix goes to a new versioned file and the sidecar
+is replaced last, so a reader never pairs a new matrix with an old shape.
+Readers in other processes pick up the new files on their next query.
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import re
+import threading
+import time
+from glob import escape as glob_escape
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+DEFAULT_INDEX_DIR = Path(__file__).resolve().parent.parent / "numpy_index"
+
+
+@dataclasses.dataclass
+class ScoredPoint:
+    id: str
+    score: float
+    payload: Dict[str, Any] | None = None
+    version: int = 0
+
+
+@dataclasses.dataclass
+class QueryResponse:
+    points: List[ScoredPoint]
+
+
+@dataclasses.dataclass
+class QueryRequest:
+    """Mirror of ``qdrant_client.models.QueryRequest`` for the NumPy backend."""
+    query: Sequence[float]
+    limit: int = 10
+    with_payload: bool = True
+
+
+@dataclasses.dataclass
+class Record:
+    id: str
+    payload: Dict[str, Any] | None = None
+    vector: List[float] | None = None
+
+
+class _Collection:
+    """One collection loaded from disk (matrix is a read-only memmap)."""
+
+    def __init__(self, dim: int, ids: List[str], payloads: List[dict], matrix: np.ndarray, mtime: float):
+        self.dim = dim
+        self.ids = ids
+        self.payloads = payloads
+        self.matrix = matrix
+        self.mtime = mtime
+        self.index = {pid: row for row, pid in enumerate(ids)}
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _selected_payload(payload: dict, with_payload) -> dict | None:
+    if not with_payload:
+        return None
+    if isinstance(with_payload, (list, tuple)):
+        return {k: payload[k] for k in with_payload if k in payload}
+    return payload
+
+
+class NumpyVectorStore:
+    """Exact cosine top-k over memory-mapped float32 matrices."""
+
+    def __init__(self, path: str | os.PathLike = DEFAULT_INDEX_DIR):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._collections: Dict[str, _Collection] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _meta_file(self, name: str) -> Path:
+        return self.path / f"{name}.json"
+
+    def _matrix_files(self, name: str) -> List[Path]:
+        """Every matrix file of *name* on disk, including the pre-versioning ``<name>.f32``."""
+        pattern = re.compile(rf"{re.escape(name)}(\.[0-9a-f]+)?\.f32")
+        return [p for p in self.path.glob(f"{glob_escape(name)}*.f32") if pattern.fullmatch(p.name)]
+
+    def _load(self, name: str) -> _Collection:
+        """Return the collection, re-mapping it if another process rewrote it."""
+        meta_file = self._meta_file(name)
+        # A writer removes the previous matrix once its sidecar is replaced; if
+        # that happens between our reading the sidecar and mapping its matrix,
+        # the sidecar on disk is already newer, so read it again.
+        for _ in range(3):
+            try:
+                mtime = meta_file.stat().st_mtime
+            except FileNotFoundError:
+                raise ValueError(f"Collection {name!r} not found") from None
+            with self._lock:
+                coll = self._collections.get(name)
+                if coll is not None and coll.mtime == mtime:
+                    return coll
+                try:
+                    meta = json.loads(meta_file.read_text())
+                except FileNotFoundError:
+                    raise ValueError(f"Collection {name!r} not found") from None
+                n, dim = len(meta["ids"]), meta["dim"]
+                matrix_file = self.path / meta.get("matrix", f"{name}.f32")
+                if n:
+                    try:
+                        matrix = np.memmap(matrix_file, dtype=np.float32, mode="r", shape=(n, dim))
+                    except FileNotFoundError:
+                        continue
+                else:
+                    matrix = np.zeros((0, dim), dtype=np.float32)
+                coll = _Collection(dim, meta["ids"], meta["payloads"], matrix, mtime)
+                self._collections[name] = coll
+                return coll
+        raise RuntimeError(f"Collection {name!r} kept changing while it was being loaded")
+
+    def _write(self, name: str, dim: int, ids: List[str], payloads: List[dict], matrix: np.ndarray) -> None:
+        meta_file = self._meta_file(name)
+        matrix_file = self.path / f"{name}.{time.time_ns():x}.f32"
+        tmp_matrix = matrix_file.with_suffix(".f32.tmp")
+        tmp_meta = meta_file.with_suffix(".json.tmp")
+        np.ascontiguousarray(matrix, dtype=np.float32).tofile(tmp_matrix)
+        tmp_meta.write_text(json.dumps({"dim": dim, "ids": ids, "payloads": payloads, "matrix": matrix_file.name}))
+        # The sidecar names its matrix and is replaced last, so it only ever
+        # points at a complete matrix of the shape it describes.
+        os.replace(tmp_matrix, matrix_file)
+        os.replace(tmp_meta, meta_file)
+        # Readers already mapping an older matrix keep their pages after unlink.
+        for old in self._matrix_files(name):
+            if old != matrix_file:
+                old.unlink(missing_ok=True)
+        with self._lock:
+            self._collections.pop(name, None)
+
+    # ------------------------------------------------------------------
+    # Collection management (QdrantClient-compatible subset)
+    # ------------------------------------------------------------------
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return self._meta_file(collection_name).exists()
+
+    def create_collection(self, collection_name: str, dim: int) -> None:
+        """(Re)create an empty collection with *dim*-dimensional vectors."""
+        self._write(collection_name, dim, [], [], np.zeros((0, dim), dtype=np.float32))
+
+    def delete_collection(self, collection_name: str) -> None:
+        self._meta_file(collection_name).unlink(missing_ok=True)
+        for f in self._matrix_files(collection_name):
+            f.unlink(missing_ok=True)
+        with self._lock:
+            self._collections.pop(collection_name, None)
+
+    def get_collections(self):
+        names = sorted(p.stem for p in self.path.glob("*.json"))
+        return SimpleNamespace(collections=[SimpleNamespace(name=n) for n in names])
+
+    def get_collection(self, collection_name: str):
+        coll = self._load(collection_name)
+        return SimpleNamespace(
+            status="green",
+            points_count=len(coll.ids),
+            config=SimpleNamespace(params=SimpleNamespace(vectors=SimpleNamespace(size=coll.dim, distance="Cosine"))),
+        )
+
+    # ------------------------------------------------------------------
+    # Points
+    # ------------------------------------------------------------------
+
+    def upsert(self, collection_name: str, points, wait: bool = True) -> None:
+        """Insert or replace points; *points* needs ``ids``, ``vectors`` and ``payloads``."""
+        coll = self._load(collection_name)
+        ids = [str(i) for i in points.ids]
+        vectors = _normalise(np.asarray(points.vectors, dtype=np.float32))
+        payloads = list(points.payloads or [{} for _ in ids])
+        if vectors.shape[1] != coll.dim:
+            raise ValueError(f"Vector size {vectors.shape[1]} does not match collection size {coll.dim}")
+
+        all_ids = list(coll.ids)
+        all_payloads = list(coll.payloads)
+        matrix = np.array(coll.matrix, dtype=np.float32)
+        appended = []
+        for pid, vec, payload in zip(ids, vectors, payloads):
+            row = coll.index.get(pid)
+            if row is None:
+                all_ids.append(pid)
+                all_payloads.append(payload)
+                appended.append(vec)
+            else:
+                matrix[row] = vec
+                all_payloads[row] = payload
+        if appended:
+            matrix = np.vstack([matrix, np.stack(appended)])
+        self._write(collection_name, coll.dim, all_ids, all_payloads, matrix)
+
+    def delete(self, collection_name: str, points_selector, wait: bool = True) -> None:
+        """Delete points; *points_selector* needs a ``points`` list of ids."""
+        coll = self._load(collection_name)
+        doomed = {str(p) for p in points_selector.points}
+        keep = [row for row, pid in enumerate(coll.ids) if pid not in doomed]
+        self._write(
+            collection_name,
+            coll.dim,
+            [coll.ids[r] for r in keep],
+            [coll.payloads[r] for r in keep],
+            np.asarray(coll.matrix)[keep],
+        )
+
+    def scroll(self, collection_name: str, limit: int = 10, offset=None, with_payload=True, with_vectors=False):
+        coll = self._load(collection_name)
+        start = int(offset or 0)
+        end = min(start + limit, len(coll.ids))
+        records = [
+            Record(
+                id=coll.ids[r],
+                payload=_selected_payload(coll.payloads[r], with_payload),
+                vector=coll.matrix[r].tolist() if with_vectors else None,
+            )
+            for r in range(start, end)
+        ]
+        return records, (end if end < len(coll.ids) else None)
+
+    def retrieve(self, collection_name: str, ids: Iterable[str], with_payload=True, with_vectors=False):
+        coll = self._load(collection_name)
+        rows = [coll.index[str(i)] for i in ids if str(i) in coll.index]
+        return [
+            Record(
+                id=coll.ids[r],
+                payload=_selected_payload(coll.payloads[r], with_payload),
+                vector=coll.matrix[r].tolist() if with_vectors else None,
+            )
+            for r in rows
+        ]
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search_matrix(self, collection_name: str, queries: np.ndarray, limit: int, with_payload=True) -> List[List[ScoredPoint]]:
+        """Exact cosine top-*limit* for each row of *queries*."""
+        coll = self._load(collection_name)
+        n = len(coll.ids)
+        if n == 0:
+            return [[] for _ in range(len(queries))]
+        queries = _normalise(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        scores = queries @ coll.matrix.T
+        k = min(limit, n)
+        if k < n:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(n), (len(queries), 1))
+        results = []
+        for row_scores, cand in zip(scores, top):
+            order = cand[np.argsort(-row_scores[cand], kind="stable")]
+            results.append([
+                ScoredPoint(
+                    id=coll.ids[r],
+                    score=float(row_scores[r]),
+                    payload=_selected_payload(coll.payloads[r], with_payload),
+                )
+                for r in order
+            ])
+        return results
+
+    def query_points(self, collection_name: str, query: Sequence[float], limit: int = 10, with_payload=True, **_) -> QueryResponse:
+        return QueryResponse(points=self.search_matrix(collection_name, np.asarray([query]), limit, with_payload)[0])
+
+    def query_batch_points(self, collection_name: str, requests: Sequence[QueryRequest], **_) -> List[QueryResponse]:
+        if not requests:
+            return []
+        limit = max(r.limit for r in requests)
+        hits = self.search_matrix(
+            collection_name,
+            np.asarray([r.query for r in requests]),
+            limit,
+            with_payload=any(r.with_payload for r in requests),
+        )
+        return [QueryResponse(points=h[:r.limit]) for h, r in zip(hits, requests)]
+
+    def close(self) -> None:
+        with self._lock:
+            self._collections.clear()
+
+
+class AsyncNumpyVectorStore:
+    """Coroutine facade over :class:`NumpyVectorStore` (searches are in-process)."""
+
+    def __init__(self, store: NumpyVectorStore):
+        self._store = store
+
+    async def query_points(self, *args, **kwargs) -> QueryResponse:
+        return self._store.query_points(*args, **kwargs)
+
+    async def query_batch_points(self, *args, **kwargs) -> List[QueryResponse]:
+        return self._store.query_batch_points(*args, **kwargs)
+
+    async def retrieve(self, *args, **kwargs):
+        return self._store.retrieve(*args, **kwargs)
+
+    async def close(self) -> None:
+        self._store.close()
+
+
+__all__ = [
+    "AsyncNumpyVectorStore",
+    "DEFAULT_INDEX_DIR",
+    "NumpyVectorStore",
+    "QueryRequest",
+    "QueryResponse",
+    "ScoredPoint",
+]
@@ -15,12 +15,30 @@ from check_yoga_pose import YogaPoseChecker
 class CheckPoseRequest:
     pose_name: str
     user_query: str
+    # Structured query info extracted once by the caller; re-extracted (cached) if omitted.
+    query_info: dict | None = None
 
 @dataclasses.dataclass
 class CheckPoseResponse:
     final_pose_name: str | None
     was_replaced: bool
 
+@dataclasses.dataclass
+class CheckSequenceRequest:
+    pose_names: list[str]
+    user_query: str
+    query_info: dict | None = None
+
+@dataclasses.dataclass
+class PoseVerdict:
+    pose_name: str
+    final_pose_name: str | None
+    was_replaced: bool
+
+@dataclasses.dataclass
+class CheckSequenceResponse:
+    results: list[PoseVerdict]
+
 # This will hold the global instance of our checker logic.
 # It will be initialized within the lifespan context.
 yoga_pose_checker_instance: YogaPoseChecker = None
@@ -35,11 +53,15 @@ async def lifespan(app: FastAPI):
     # The api_type will be passed from the main function via app.state
     api_type = app.state.api_type
     yoga_pose_checker_instance = YogaPoseChecker(api_type=api_type)
+    try:
+        await yoga_pose_checker_instance.pose_graph.get()
+    except Exception as e:
+        logging.warning(f"Pose graph snapshot not loaded at startup (will retry on first request): {e}")
     logging.info("YogaPoseChecker initialized.")
     yield
     # Clean up resources on shutdown
     if yoga_pose_checker_instance:
-        yoga_pose_checker_instance.close()
+        await yoga_pose_checker_instance.close()
     logging.info("YogaPoseChecker resources have been shut down.")
 
 # --- FastAPI Application ---
@@ -62,9 +84,10 @@ async def check_pose_endpoint(request: CheckPoseRequest) -> CheckPoseResponse:
     logging.info(f"Received request to check pose: {request.pose_name}")
     
     original_pose = request.pose_name
-    final_pose = yoga_pose_checker_instance.check_and_replace_pose(
+    final_pose = await yoga_pose_checker_instance.check_and_replace_pose(
         pose_name=original_pose,
-        user_query=request.user_query
+        user_query=request.user_query,
+        query_info=request.query_info,
     )
     
     was_replaced = original_pose != final_pose and final_pose is not None
@@ -76,6 +99,36 @@ async def check_pose_endpoint(request: CheckPoseRequest) -> CheckPoseResponse:
         was_replaced=was_replaced
     )
 
+@app.post("/check-sequence", response_model=CheckSequenceResponse)
+async def check_sequence_endpoint(request: CheckSequenceRequest) -> CheckSequenceResponse:
+    """
+    Checks a whole pose sequence at once: cautions come from one Neo4j query and
+    all distinct poses are judged in one batched LLM prompt (chunked if long).
+    """
+    if not yoga_pose_checker_instance:
+        raise HTTPException(status_code=503, detail="Service not available")
+
+    logging.info(f"Received request to check a sequence of {len(request.pose_names)} poses")
+
+    results = await yoga_pose_checker_instance.check_sequence(
+        pose_names=request.pose_names,
+        user_query=request.user_query,
+        query_info=request.query_info,
+    )
+
+    replaced = sum(r["was_replaced"] for r in results)
+    removed = sum(r["final_pose_name"] is None for r in results)
+    logging.info(f"Sequence check complete. Replaced: {replaced}, Removed: {removed}")
+
+    return CheckSequenceResponse(results=[PoseVerdict(**r) for r in results])
+
+@app.get("/stats")
+async def stats_endpoint() -> dict:
+    """Decision-cache and query-extraction-cache hit rates, and LLM call metrics."""
+    if not yoga_pose_checker_instance:
+        raise HTTPException(status_code=503, detail="Service not available")
+    return yoga_pose_checker_instance.stats()
+
 def main():
     """
     Main entry point to start the server.
@@ -84,9 +137,9 @@ def main():
     parser.add_argument(
         "--api",
         type=str,
-        choices=["openai", "deepseek"],
+        choices=["openai", "deepseek", "local"],
         default="deepseek",
-        help="Specify which model API to use (openai or deepseek).",
+        help="Specify which model API to use (openai, deepseek, or local for the offline stand-in).",
     )
     parser.add_argument(
         "--port",
@@ -0,0 +1,177 @@
+"""Read-only, in-process snapshot of the pose graph.
+
+The category recommender and the pose checker only read the pose part of the
+graph (poses, their category and caution, and the BUILD_UP / MOVE_FORWARD /
+BALANCE_OUT / UNWIND edges), and that part only changes when
+``build_graphrag.py`` rebuilds the catalog.  :class:`PoseGraph` holds it in
+compact arrays:
+
+• poses are integer-indexed (sorted by name), with parallel name / caution lists;
+• each category maps to an ``array('i')`` of pose indices;
+• each relationship type is a CSR adjacency: ``offsets[i]:offsets[i + 1]``
+  slices ``targets`` to the out-neighbours of pose ``i`` (sorted by name).
+
+Random sampling and neighbour lookups are then in-process list operations
+instead of a Neo4j round trip with ``ORDER BY rand()``.
+
+:class:`PoseGraphCache` loads the snapshot on first use (services call it at
+startup) and re-reads the catalog version stamp (``(:Catalog).version``, see
+``build_graphrag.catalog_version``) every ``refresh_seconds``; a new stamp
+triggers a reload.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from array import array
+from typing import Dict, List, Sequence
+
+RELATIONSHIP_TYPES = ("BUILD_UP", "MOVE_FORWARD", "BALANCE_OUT", "UNWIND")
+DEFAULT_REFRESH_SECONDS = float(os.getenv("CATALOG_VERSION_REFRESH", "30"))
+
+
+class PoseGraph:
+    """Integer-indexed poses, per-category pose arrays and CSR adjacency per relationship type."""
+
+    def __init__(self, version: str, poses: Sequence[dict], edges: Sequence[dict]):
+        """
+        Args:
+            version: catalog version stamp the snapshot was read at.
+            poses: rows {name, caution, categories}.
+            edges: rows {source, type, target}; edges to unknown poses are ignored.
+        """
+        self.version = version
+        ordered = sorted(poses, key=lambda p: p["name"])
+        self.names: List[str] = [p["name"] for p in ordered]
+        self.cautions: List[str] = [p.get("caution") or "" for p in ordered]
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+        members: Dict[str, List[int]] = {}
+        pose_categories: List[List[str]] = []
+        for i, pose in enumerate(ordered):
+            cats = sorted(set(pose.get("categories") or []))
+            pose_categories.append(cats)
+            for cat in cats:
+                members.setdefault(cat, []).append(i)
+        self.categories: Dict[str, array] = {cat: array("i", idx) for cat, idx in members.items()}
+        self.pose_categories = pose_categories
+
+        self.adjacency: Dict[str, tuple[array, array]] = {}
+        for rel_type in RELATIONSHIP_TYPES:
+            neighbours: List[set] = [set() for _ in self.names]
+            for edge in edges:
+                if edge["type"] != rel_type:
+                    continue
+                source, target = self.index.get(edge["source"]), self.index.get(edge["target"])
+                if source is not None and target is not None:
+                    neighbours[source].add(target)
+            offsets, targets = array("i", [0]), array("i")
+            for nbrs in neighbours:
+                targets.extend(sorted(nbrs))
+                offsets.append(len(targets))
+            self.adjacency[rel_type] = (offsets, targets)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def caution(self, pose_name: str) -> str:
+        i = self.index.get(pose_name)
+        return self.cautions[i] if i is not None else ""
+
+    def pose_at(self, category: str, u: float) -> str | None:
+        """The pose at fraction *u* in [0, 1) of *category*'s name-ordered poses (u = rng.random() samples uniformly)."""
+        members = self.categories.get(category)
+        if not members:
+            return None
+        return self.names[members[min(int(u * len(members)), len(members) - 1)]]
+
+    def neighbours(self, pose_name: str, *rel_types: str) -> List[str]:
+        """Out-neighbours of *pose_name* over *rel_types*, by name within each type (no duplicates)."""
+        i = self.index.get(pose_name)
+        if i is None:
+            return []
+        result: List[int] = []
+        for rel_type in rel_types:
+            offsets, targets = self.adjacency[rel_type]
+            result.extend(targets[offsets[i]:offsets[i + 1]])
+        return [self.names[j] for j in dict.fromkeys(result)]
+
+    def same_category(self, pose_name: str) -> List[dict]:
+        """Other poses sharing a category with *pose_name*, as {name, caution} ordered by name."""
+        i = self.index.get(pose_name)
+        if i is None:
+            return []
+        others = sorted({j for cat in self.pose_categories[i] for j in self.categories[cat] if j != i})
+        return [{"name": self.names[j], "caution": self.cautions[j]} for j in others]
+
+
+class PoseGraphCache:
+    """Holds the current :class:`PoseGraph` of a Neo4j database, reloading it when the catalog version changes."""
+
+    def __init__(self, driver, refresh_seconds: float = DEFAULT_REFRESH_SECONDS):
+        self.driver = driver
+        self.refresh_seconds = refresh_seconds
+        self._graph: PoseGraph | None = None
+        self._checked = 0.0
+        self._lock = asyncio.Lock()
+        self._stats = {"loads": 0, "load_seconds": 0.0, "version_checks": 0}
+
+    @staticmethod
+    async def _read_all(tx, query: str, **params) -> list[dict]:
+        result = await tx.run(query, **params)
+        return await result.data()
+
+    async def _read_version(self, session) -> str:
+        records = await session.execute_read(
+            self._read_all, "MATCH (c:Catalog {id: 'catalog'}) RETURN c.version AS version"
+        )
+        return records[0]["version"] if records and records[0]["version"] else ""
+
+    async def _load(self, session, version: str) -> PoseGraph:
+        start = time.perf_counter()
+        poses = await session.execute_read(
+            self._read_all,
+            "MATCH (p:Pose) OPTIONAL MATCH (p)-[:IN_CATEGORY]->(c:Category) "
+            "RETURN p.id AS name, p.caution AS caution, collect(c.id) AS categories",
+        )
+        edges = await session.execute_read(
+            self._read_all,
+            "MATCH (s:Pose)-[r:BUILD_UP|MOVE_FORWARD|BALANCE_OUT|UNWIND]->(t:Pose) "
+            "RETURN s.id AS source, type(r) AS type, t.id AS target",
+        )
+        graph = PoseGraph(version, poses, edges)
+        elapsed = time.perf_counter() - start
+        self._stats["loads"] += 1
+        self._stats["load_seconds"] += elapsed
+        logging.info(f"Loaded pose graph snapshot ({len(graph)} poses, {len(edges)} edges, version {version!r}) in {elapsed:.2f}s")
+        return graph
+
+    async def get(self) -> PoseGraph:
+        """The snapshot for the current catalog version (loaded or reloaded as needed)."""
+        graph = self._graph
+        if graph is not None and time.monotonic() - self._checked <= self.refresh_seconds:
+            return graph
+        async with self._lock:
+            if self._graph is not None and time.monotonic() - self._checked <= self.refresh_seconds:
+                return self._graph
+            async with self.driver.session() as session:
+                version = await self._read_version(session)
+                self._stats["version_checks"] += 1
+                if self._graph is None or version != self._graph.version:
+                    if self._graph is not None:
+                        logging.info(f"Catalog rebuilt ({self._graph.version} -> {version}); reloading the pose graph.")
+                    self._graph = await self._load(session, version)
+            self._checked = time.monotonic()
+            return self._graph
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        if self._graph is not None:
+            stats["poses"] = len(self._graph)
+            stats["version"] = self._graph.version
+        return stats
+
+
+__all__ = ["PoseGraph", "PoseGraphCache", "RELATIONSHIP_TYPES"]
@@ -0,0 +1,101 @@
+"""Local CPU relevance scoring of (query, document) pairs.
+
+Used by ``CourseFinder`` to decide most candidate courses without a remote
+LLM call.  Two scorers are available, selected by ``COURSE_RERANKER``:
+
+• ``cross-encoder`` – a small MS MARCO cross-encoder
+  (``COURSE_RERANKER_MODEL``, default ``cross-encoder/ms-marco-MiniLM-L-6-v2``)
+  that reads each pair jointly; logits are squashed with a sigmoid so scores
+  are in [0, 1].
+• ``bi-encoder`` – reuses the sentence-transformer already loaded for search
+  (``services.vector_store.embed``) and scores by cosine similarity, so it adds
+  no model download or memory.
+
+All pairs of one request are scored in one batched forward pass on a worker
+thread.  :meth:`Reranker.classify` maps a score to ``"yes"`` / ``"no"`` with
+two thresholds; scores in between are ``None`` ("borderline") and left to the
+caller's LLM check.  ``benchmarks/bench_course_reranker.py`` measures agreement
+with the LLM filter and suggests thresholds.
+"""
+from __future__ import annotations
+
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Sequence
+
+DEFAULT_CROSS_ENCODER = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+# (accept >=, reject <=) defaults per scorer; override with COURSE_RERANK_ACCEPT / COURSE_RERANK_REJECT.
+DEFAULT_THRESHOLDS = {
+    "cross-encoder": (0.7, 0.1),
+    "bi-encoder": (0.55, 0.25),
+}
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+
+
+@lru_cache(maxsize=None)
+def _get_cross_encoder(model_name: str):
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(model_name, device="cpu")
+
+
+class Reranker:
+    """Scores (query, document) pairs locally and classifies them with two thresholds."""
+
+    def __init__(self, kind: str, accept: float | None = None, reject: float | None = None, model_name: str | None = None):
+        if kind not in DEFAULT_THRESHOLDS:
+            raise ValueError(f"Unknown reranker {kind!r}; choose one of {sorted(DEFAULT_THRESHOLDS)}")
+        self.kind = kind
+        default_accept, default_reject = DEFAULT_THRESHOLDS[kind]
+        self.accept = default_accept if accept is None else accept
+        self.reject = default_reject if reject is None else reject
+        self.model_name = model_name or DEFAULT_CROSS_ENCODER
+
+    def score(self, query: str, documents: Sequence[str]) -> List[float]:
+        """Relevance of every document to *query* (higher is more relevant), in one batch."""
+        if not documents:
+            return []
+        if self.kind == "cross-encoder":
+            logits = _get_cross_encoder(self.model_name).predict([(query, doc) for doc in documents])
+            return [1.0 / (1.0 + math.exp(-float(x))) for x in logits]
+        from services.vector_store import cosine, embed
+
+        query_vec, *doc_vecs = embed([query, *documents])
+        return [cosine(query_vec, vec) for vec in doc_vecs]
+
+    async def ascore(self, query: str, documents: Sequence[str]) -> List[float]:
+        """Async :meth:`score`; the forward pass runs on a worker thread."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, self.score, query, list(documents))
+
+    def classify(self, score: float) -> str | None:
+        """'yes' above the accept threshold, 'no' below the reject threshold, None if borderline."""
+        if score >= self.accept:
+            return "yes"
+        if score <= self.reject:
+            return "no"
+        return None
+
+
+def reranker_from_env() -> Reranker | None:
+    """Build the reranker configured by ``COURSE_RERANKER`` (unset/empty disables it)."""
+    kind = os.getenv("COURSE_RERANKER", "").strip()
+    if not kind:
+        return None
+    accept = os.getenv("COURSE_RERANK_ACCEPT")
+    reject = os.getenv("COURSE_RERANK_REJECT")
+    return Reranker(
+        kind,
+        accept=float(accept) if accept else None,
+        reject=float(reject) if reject else None,
+        model_name=os.getenv("COURSE_RERANKER_MODEL") or None,
+    )
+
+
+__all__ = ["DEFAULT_THRESHOLDS", "Reranker", "reranker_from_env"]
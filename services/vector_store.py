@@ -8,135 +8,489 @@ Key points:
 • `get_client()` – returns a singleton *network* `QdrantClient` that talks to a
   local Qdrant server running on ``http://127.0.0.1:6333``.  If the server is
   not yet running, the first call automatically spawns it (pointing at
-  ``qdrant_db`` on disk) and waits until it is ready.  All processes therefore
-  share one server and can use the database concurrently without file-lock
-  conflicts.
+  ``qdrant_db`` on disk) and waits until ``/readyz`` answers.  A lock file
+  ensures exactly one process spawns it; every process registers as a user
+  and `shutdown_server()` only stops the server when the last user leaves.
+  All processes therefore share one server and can use the database
+  concurrently without file-lock conflicts.
+• ``VECTOR_BACKEND=numpy`` swaps the server for an embedded exact-search
+  index (memory-mapped float32 matrices under ``NUMPY_INDEX_DIR``).
+  `get_client` / `get_async_client` then return a
+  :class:`~services.numpy_index.NumpyVectorStore` exposing the same
+  ``query_points`` / ``query_batch_points`` / ``scroll`` / ``upsert`` calls.
 • `recreate_collection(client, name, dim)` – (re)creates a collection with the
   desired dimensionality using cosine distance.
+• `COLLECTION_PROFILES` – named performance profiles (HNSW ``m`` /
+  ``ef_construct``, search-time ``ef``, int8 scalar quantization with
+  rescoring, on-disk vs in-RAM vectors) applied by `recreate_collection`
+  and at query time.  Select one with ``QDRANT_PROFILE``.
 • `embed(texts)` – returns ``list[Vector]`` using the same sentence-transformer
   model everywhere so that embeddings are consistent across ingestion and
   querying.
-
-The embedding model is loaded lazily at first call to avoid slowing down import
-at cold start.
+• `search_keywords(client, name, keywords, k)` – embeds all *keywords* in one
+  model call and sends them to Qdrant as a single batch query, returning the
+  hits for each keyword.
+• `get_async_client()`, `aembed(texts)`, `asearch_keywords(...)` – asyncio
+  counterparts for the FastAPI servers.  The Qdrant calls go through an
+  ``AsyncQdrantClient``; the CPU-bound model forward pass runs on a bounded
+  thread pool (``EMBEDDING_WORKERS``, default 2) so it never blocks the event
+  loop.
+• `cosine(a, b)` – cosine similarity of two embedding vectors (pure Python).
+• `embedding_cache_stats()` – hit/miss counters of the two-tier embedding
+  cache (in-memory LRU + SQLite on disk) that sits behind `embed`.  Repeat
+  texts never reach the model.  Configure with ``EMBEDDING_CACHE_PATH``
+  (empty string disables the disk tier), ``EMBEDDING_CACHE_MEMORY_ITEMS``,
+  ``EMBEDDING_CACHE_DISK_ITEMS``; set ``EMBEDDING_CACHE=0`` to bypass it.
+• ``EMBEDDING_BACKEND`` selects how the MiniLM model runs on CPU: ``torch``
+  (default), ``torch-int8``, ``onnx`` or ``onnx-int8``.  The backend that
+  indexed each collection is stamped in ``.embedding-backend.json`` and a
+  warning is logged when queries use an incompatible (quantized) backend.
+• ``EMBEDDING_SERVICE_URL`` – when set (e.g. ``http://127.0.0.1:8090``),
+  `embed` sends cache misses to the shared embedding service
+  (``python -m services.embedding_server.server``) instead of loading the
+  model in every process.  `embed_local` always uses the in-process model.
+
+The embedding model is loaded lazily at first call, and ``qdrant_client``,
+``sentence_transformers`` / torch and numpy are only imported on first use, to
+avoid slowing down import at cold start (see
+``benchmarks/check_import_time.py``).
 """
 from __future__ import annotations
 
+import dataclasses
+import json
+import logging
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
-from typing import Iterable, List
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence
 
+import atexit
+import fcntl
+import signal
 import subprocess
 import time
-import atexit
+from contextlib import contextmanager
 from pathlib import Path
 
-from qdrant_client import QdrantClient, models
-from sentence_transformers import SentenceTransformer
+from services.embedding_cache import DEFAULT_CACHE_PATH, EmbeddingCache
+
+# qdrant_client, sentence_transformers / torch, numpy and requests are heavy to
+# import, so they are imported inside the functions that need them; importing
+# this module (e.g. only for shutdown_server) stays cheap.
+if TYPE_CHECKING:
+    import requests
+    from qdrant_client import AsyncQdrantClient, QdrantClient, models
+    from sentence_transformers import SentenceTransformer
+
+    from services.numpy_index import AsyncNumpyVectorStore, NumpyVectorStore
 
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
-from pathlib import Path
 _QDRANT_URL = os.getenv("QDRANT_URL", "http://127.0.0.1:6333")
 _QDRANT_CONFIG = str((Path(__file__).resolve().parent.parent / "qdrant.yaml"))
-# Helpful diagnostics – printed once at import time.
-print("[vector_store] QDRANT_URL:", _QDRANT_URL)
-print("[vector_store] QDRANT_CONFIG:", _QDRANT_CONFIG)
+# "qdrant" (shared local server) or "numpy" (in-process exact search, see
+# services/numpy_index.py).
+_VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant")
+_NUMPY_INDEX_DIR = os.getenv("NUMPY_INDEX_DIR")
 # We use the widely-available MiniLM model. (384-dimensional embeddings.)
 _EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
 _EMBEDDING_DIM = 1536
 
 
+# Embedding backends for the same MiniLM weights.  ``quantized`` backends
+# produce vectors that only approximate the fp32 ones, so collections indexed
+# with a different backend should be re-indexed for best recall.
+#   torch       – PyTorch fp32 (reference, used to build the shipped collections)
+#   torch-int8  – PyTorch with dynamic int8 quantization of all Linear layers
+#   onnx        – ONNX Runtime fp32 export (numerically equivalent to torch)
+#   onnx-int8   – ONNX Runtime int8 export (file chosen by EMBEDDING_ONNX_FILE)
+_EMBEDDING_BACKENDS = {
+    "torch": {"quantized": False},
+    "torch-int8": {"quantized": True},
+    "onnx": {"quantized": False},
+    "onnx-int8": {"quantized": True},
+}
+_EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+_EMBEDDING_ONNX_INT8_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+_EMBEDDING_STAMP_PATH = Path(
+    os.getenv("EMBEDDING_STAMP_PATH", Path(__file__).resolve().parent.parent / ".embedding-backend.json")
+)
+# Optional shared embedding service (services/embedding_server); when set,
+# this process never loads the model itself.
+_EMBEDDING_SERVICE_URL = os.getenv("EMBEDDING_SERVICE_URL", "").rstrip("/")
+_EMBEDDING_SERVICE_TIMEOUT = float(os.getenv("EMBEDDING_SERVICE_TIMEOUT", "30"))
+if _EMBEDDING_BACKEND not in _EMBEDDING_BACKENDS:
+    raise ValueError(
+        f"Unsupported EMBEDDING_BACKEND {_EMBEDDING_BACKEND!r}; "
+        f"choose one of {sorted(_EMBEDDING_BACKENDS)}"
+    )
+
+
+def load_embedding_model(backend: str = "torch") -> SentenceTransformer:
+    """Load the sentence-transformer for *backend* (uncached).
+
+    ONNX backends require ``optimum[onnxruntime]``; the model is exported on
+    first use if the hub repository does not ship the requested file.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(_EMBEDDING_MODEL_NAME, device="cpu")
+    if backend == "torch-int8":
+        import torch
+
+        model = SentenceTransformer(_EMBEDDING_MODEL_NAME, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "onnx":
+        return SentenceTransformer(_EMBEDDING_MODEL_NAME, device="cpu", backend="onnx")
+    if backend == "onnx-int8":
+        return SentenceTransformer(
+            _EMBEDDING_MODEL_NAME,
+            device="cpu",
+            backend="onnx",
+            model_kwargs={"file_name": _EMBEDDING_ONNX_INT8_FILE},
+        )
+    raise ValueError(f"Unsupported embedding backend {backend!r}")
+
+
 @lru_cache(maxsize=1)
 def _get_embedding_model() -> SentenceTransformer:
-    """Load the sentence-transformer model once and cache it."""
-    return SentenceTransformer(_EMBEDDING_MODEL_NAME)
+    """Load the configured embedding backend once and cache it."""
+    return load_embedding_model(_EMBEDDING_BACKEND)
 
 
-def embed(texts: Iterable[str]) -> List[List[float]]:
-    """Return list of embedding vectors for *texts*."""
+def embedding_model_id() -> str:
+    """Identity of the active model used for cache keys and index stamps."""
+    if _EMBEDDING_BACKEND == "torch":
+        return _EMBEDDING_MODEL_NAME
+    return f"{_EMBEDDING_MODEL_NAME}:{_EMBEDDING_BACKEND}"
+
+
+def _encode(texts: List[str]) -> List[List[float]]:
+    """Run the sentence-transformer on *texts* (no caching)."""
     model = _get_embedding_model()
-    return model.encode(list(texts)).tolist()
+    return model.encode(texts).tolist()
 
 
-from functools import lru_cache
+def _read_embedding_stamps() -> Dict[str, str]:
+    try:
+        return json.loads(_EMBEDDING_STAMP_PATH.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
 
-_server_proc: subprocess.Popen | None = None
 
-def shutdown_server(timeout: float = 10.0) -> None:
-    """Terminate the Qdrant server started by this module (if any).
+def record_embedding_backend(collection_name: str) -> None:
+    """Remember which backend indexed *collection_name*."""
+    stamps = _read_embedding_stamps()
+    stamps[collection_name] = _EMBEDDING_BACKEND
+    _EMBEDDING_STAMP_PATH.write_text(json.dumps(stamps, indent=2, sort_keys=True))
+    _check_embedding_backend.cache_clear()
 
-    If the server was not spawned by :func:`get_client` in the current Python
-    interpreter (i.e. ``_server_proc`` is *None*), this is a no-op so that the
-    caller can safely invoke it regardless of who owns the server.
 
-    Parameters
-    ----------
-    timeout:
-        Seconds to wait for the server process to exit after sending
-        ``SIGTERM``.  If the process is still alive after the timeout it is
-        force-killed with ``SIGKILL``.
+@lru_cache(maxsize=None)
+def _check_embedding_backend(collection_name: str) -> None:
+    """Warn (once per collection) when querying with an incompatible backend.
+
+    fp32 backends are interchangeable; whenever either the indexing or the
+    querying side is quantized the vectors drift slightly and the collection
+    should be rebuilt with the active backend.
     """
-    global _server_proc
+    indexed_with = _read_embedding_stamps().get(collection_name, "torch")
+    if indexed_with == _EMBEDDING_BACKEND:
+        return
+    quantized = _EMBEDDING_BACKENDS.get(indexed_with, {"quantized": True})["quantized"]
+    if quantized or _EMBEDDING_BACKENDS[_EMBEDDING_BACKEND]["quantized"]:
+        logging.warning(
+            "Collection %r was indexed with embedding backend %r but queries use %r; "
+            "re-index it (python build_graphrag.py) for full recall.",
+            collection_name, indexed_with, _EMBEDDING_BACKEND,
+        )
 
-    if _server_proc is None:
-        return  # nothing we own is running
 
-    if _server_proc.poll() is not None:
-        # Process already exited – clear handle so that a new server can be
-        # started later if needed.
-        _server_proc = None
-        return
+@lru_cache(maxsize=1)
+def _get_embedding_cache() -> EmbeddingCache | None:
+    """Create the process-wide embedding cache (or None when disabled)."""
+    if os.getenv("EMBEDDING_CACHE", "1") == "0":
+        return None
+    return EmbeddingCache(
+        path=os.getenv("EMBEDDING_CACHE_PATH", str(DEFAULT_CACHE_PATH)) or None,
+        max_memory_items=int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "10000")),
+        max_disk_items=int(os.getenv("EMBEDDING_CACHE_DISK_ITEMS", "200000")),
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_service_session() -> requests.Session:
+    """Keep-alive HTTP session for the shared embedding service."""
+    import requests
+
+    return requests.Session()
+
+
+@lru_cache(maxsize=1)
+def _service_model_id() -> str:
+    """Model identity reported by the embedding service (used for cache keys)."""
+    resp = _get_service_session().get(f"{_EMBEDDING_SERVICE_URL}/info", timeout=_EMBEDDING_SERVICE_TIMEOUT)
+    resp.raise_for_status()
+    return resp.json()["model"]
+
+
+def _encode_remote(texts: List[str]) -> List[List[float]]:
+    """Encode *texts* via the shared embedding service."""
+    resp = _get_service_session().post(
+        f"{_EMBEDDING_SERVICE_URL}/embed",
+        json={"texts": texts},
+        timeout=_EMBEDDING_SERVICE_TIMEOUT,
+    )
+    resp.raise_for_status()
+    return resp.json()["vectors"]
+
+
+def _cached_embed(texts: Iterable[str], model_id: str, compute) -> List[List[float]]:
+    texts = list(texts)
+    if not texts:
+        return []
+    cache = _get_embedding_cache()
+    if cache is None:
+        return compute(texts)
+    return cache.get_or_compute(model_id, texts, compute)
+
+
+def embed(texts: Iterable[str]) -> List[List[float]]:
+    """Return list of embedding vectors for *texts*.
+
+    Vectors are served from the embedding cache when possible; only texts the
+    cache has never seen are encoded – by the shared embedding service when
+    ``EMBEDDING_SERVICE_URL`` is set, otherwise by the in-process model.  If
+    the service is unreachable the in-process model is used instead.
+    """
+    if _EMBEDDING_SERVICE_URL:
+        import requests
 
-    # Ask the server to terminate gracefully first.
-    _server_proc.terminate()
-    try:
-        _server_proc.wait(timeout=timeout)
-    except subprocess.TimeoutExpired:
-        # Escalate if it refuses to die.
-        _server_proc.kill()
-        _server_proc.wait()
-    finally:
-        _server_proc = None  # Allow a fresh server to spawn next time.
-        # Clear cached client so that a new one is created if requested later.
         try:
-            get_client.cache_clear()
-        except Exception:
-            pass
+            return _cached_embed(texts, _service_model_id(), _encode_remote)
+        except requests.RequestException as exc:
+            logging.warning("Embedding service %s unavailable (%s); encoding locally.", _EMBEDDING_SERVICE_URL, exc)
+    return embed_local(texts)
 
 
-def _start_local_server() -> None:
-    """Spawn a standalone Qdrant server (if not already running)."""
-    global _server_proc
-    if _server_proc and _server_proc.poll() is None:
-        return  # already running
-
-    cmd = [
-        "qdrant",
-        "--config-path",
-        _QDRANT_CONFIG 
-    ]
-    _server_proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
-
-    # Ensure graceful shutdown on interpreter exit
-    atexit.register(lambda: _server_proc.terminate() if _server_proc and _server_proc.poll() is None else None)
-
-    # Wait until server responds
-    # Give the server up to ~60 s to come online (120 × 0.5 s).
-    max_attempts = 120
-    for attempt in range(max_attempts):
+def embed_local(texts: Iterable[str]) -> List[List[float]]:
+    """Like :func:`embed` but always encodes with the in-process model."""
+    return _cached_embed(texts, embedding_model_id(), _encode)
+
+
+_embedding_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("EMBEDDING_WORKERS", "2")),
+    thread_name_prefix="embed",
+)
+
+
+async def aembed(texts: Iterable[str]) -> List[List[float]]:
+    """Async :func:`embed`: runs the encoding on the bounded embedding pool."""
+    import asyncio
+
+    texts = list(texts)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_embedding_executor, embed, texts)
+
+
+def cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    """Cosine similarity of two vectors returned by :func:`embed` (0.0 if either is zero)."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = (sum(x * x for x in a) * sum(y * y for y in b)) ** 0.5
+    return dot / norm if norm else 0.0
+
+
+def embedding_cache_stats() -> Dict[str, int]:
+    """Return counters of the embedding cache (empty dict when disabled)."""
+    cache = _get_embedding_cache()
+    return cache.stats() if cache is not None else {}
+
+
+# ---------------------------------------------------------------------------
+# Qdrant server supervisor
+# ---------------------------------------------------------------------------
+#
+# Every process that needs Qdrant goes through the same protocol, serialised
+# by an exclusive ``flock`` on ``<supervisor dir>/lock``:
+#
+#   1. If the server answers ``/readyz`` – attach.
+#   2. Otherwise spawn it (detached, so it outlives its spawner) while holding
+#      the lock, so exactly one process starts it and the others block and
+#      then attach.
+#   3. Register our PID in ``state.json``.  ``shutdown_server()`` (also run at
+#      exit) removes it again; the server is stopped only when no live user
+#      remains.  Users that died without cleaning up are pruned by PID.
+
+_SUPERVISOR_DIR = Path(
+    os.getenv("QDRANT_SUPERVISOR_DIR", Path(__file__).resolve().parent.parent / ".qdrant-supervisor")
+)
+_READY_TIMEOUT = float(os.getenv("QDRANT_READY_TIMEOUT", "60"))
+
+_server_proc: subprocess.Popen | None = None
+_attached = False
+
+
+def _pid_alive(pid: int | None) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def _supervisor_state():
+    """Yield the shared supervisor state under an exclusive file lock."""
+    _SUPERVISOR_DIR.mkdir(parents=True, exist_ok=True)
+    state_file = _SUPERVISOR_DIR / "state.json"
+    with open(_SUPERVISOR_DIR / "lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
         try:
-            QdrantClient(url=_QDRANT_URL, timeout=60).get_collections()
+            try:
+                state = json.loads(state_file.read_text())
+            except (FileNotFoundError, ValueError):
+                state = {}
+            state.setdefault("server_pid", None)
+            state["users"] = [pid for pid in state.get("users", []) if _pid_alive(pid)]
+            if not _pid_alive(state["server_pid"]):
+                state["server_pid"] = None
+            yield state
+            tmp = state_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state))
+            os.replace(tmp, state_file)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _server_ready(timeout: float = 1.0) -> bool:
+    import requests
+
+    try:
+        return requests.get(f"{_QDRANT_URL}/readyz", timeout=timeout).ok
+    except requests.RequestException:
+        return False
+
+
+def _wait_until_ready(proc: subprocess.Popen | None) -> None:
+    """Poll ``/readyz`` with exponential backoff (20 ms → 500 ms)."""
+    deadline = time.monotonic() + _READY_TIMEOUT
+    delay = 0.02
+    while time.monotonic() < deadline:
+        if _server_ready(timeout=min(1.0, max(0.05, deadline - time.monotonic()))):
             return
-        except Exception:
-            time.sleep(0.5)
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"Qdrant server exited during startup (code {proc.returncode}).")
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
     raise RuntimeError(
-        "Failed to start local Qdrant server after waiting 60s. "
+        f"Failed to start local Qdrant server after waiting {_READY_TIMEOUT:.0f}s. "
         "Check that the 'qdrant' binary can access the storage directory and that port 6333 is free."
     )
 
 
+def _stop_pid(pid: int, timeout: float) -> None:
+    """SIGTERM *pid*, escalating to SIGKILL after *timeout* seconds."""
+    global _server_proc
+    if _server_proc is not None and _server_proc.pid == pid:
+        # We are the parent: use Popen so the child is reaped.
+        _server_proc.terminate()
+        try:
+            _server_proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _server_proc.kill()
+            _server_proc.wait()
+        _server_proc = None
+        return
+
+    os.kill(pid, signal.SIGTERM)
+    deadline = time.monotonic() + timeout
+    while _pid_alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if _pid_alive(pid):
+        os.kill(pid, signal.SIGKILL)
+
+
+def _start_local_server() -> None:
+    """Attach to the shared Qdrant server, spawning it if nobody has yet."""
+    global _server_proc, _attached
+    with _supervisor_state() as state:
+        if not _server_ready():
+            spawned = state["server_pid"] is None
+            if spawned:
+                cmd = [
+                    "qdrant",
+                    "--config-path",
+                    _QDRANT_CONFIG
+                ]
+                # New session: the server must survive its spawner while other
+                # processes are still attached.
+                _server_proc = subprocess.Popen(
+                    cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, start_new_session=True,
+                )
+                state["server_pid"] = _server_proc.pid
+            try:
+                _wait_until_ready(_server_proc)
+            except BaseException:
+                # The state is not written on error, so nobody would ever stop
+                # a server we spawned (it runs in its own session): stop it now.
+                if spawned and _server_proc is not None:
+                    _server_proc.terminate()
+                    try:
+                        _server_proc.wait(timeout=10)
+                    except subprocess.TimeoutExpired:
+                        _server_proc.kill()
+                        _server_proc.wait()
+                    _server_proc = None
+                raise
+        if os.getpid() not in state["users"]:
+            state["users"].append(os.getpid())
+
+    if not _attached:
+        _attached = True
+        # Release our reference (and stop the server if we are last) on exit.
+        atexit.register(shutdown_server)
+
+
+def shutdown_server(timeout: float = 10.0) -> None:
+    """Release this process's use of the shared Qdrant server.
+
+    The server is only terminated when no other live process is attached to
+    it, so calling this from one agent never pulls the server out from under
+    another.  Servers that were not spawned by the supervisor (e.g. started by
+    hand or running remotely) are never stopped.
+
+    Parameters
+    ----------
+    timeout:
+        Seconds to wait for the server process to exit after sending
+        ``SIGTERM``.  If the process is still alive after the timeout it is
+        force-killed with ``SIGKILL``.
+    """
+    global _attached
+    if _VECTOR_BACKEND == "numpy":
+        return
+
+    with _supervisor_state() as state:
+        state["users"] = [pid for pid in state["users"] if pid != os.getpid()]
+        if not state["users"] and state["server_pid"] is not None:
+            _stop_pid(state["server_pid"], timeout)
+            state["server_pid"] = None
+    _attached = False
+
+    # Clear cached clients so that new ones are created (and re-attached) if
+    # requested later.
+    get_client.cache_clear()
+    get_async_client.cache_clear()
+
+
 def _ensure_qdrant_ready(client: QdrantClient) -> None:
     """Raise RuntimeError if server is not reachable via *client*."""
     try:
@@ -148,31 +502,231 @@ def _ensure_qdrant_ready(client: QdrantClient) -> None:
 
 
 @lru_cache(maxsize=1)
-def get_client() -> QdrantClient:
+def get_client() -> QdrantClient | NumpyVectorStore:
     """Return a singleton Qdrant client.
 
-    • Tries to connect to an existing server (``_QDRANT_URL``).
-    • If that fails, spins up a local server via ``_start_local_server`` and
-      retries.
+    • Attaches to the shared server at ``_QDRANT_URL`` via the supervisor,
+      which spawns it first if no process has done so yet.
+
+    With ``VECTOR_BACKEND=numpy`` an in-process :class:`NumpyVectorStore`
+    is returned instead and no server is involved.
+    """
+    if _VECTOR_BACKEND == "numpy":
+        from services.numpy_index import DEFAULT_INDEX_DIR, NumpyVectorStore
+
+        return NumpyVectorStore(_NUMPY_INDEX_DIR or DEFAULT_INDEX_DIR)
+    from qdrant_client import QdrantClient
+
+    logging.debug("[vector_store] QDRANT_URL: %s | QDRANT_CONFIG: %s", _QDRANT_URL, _QDRANT_CONFIG)
+    # Attach through the supervisor (spawns the server if nobody has yet).
+    _start_local_server()
+    client = QdrantClient(url=_QDRANT_URL, timeout=60)
+    _ensure_qdrant_ready(client)
+    return client
+
+
+@lru_cache(maxsize=1)
+def get_async_client() -> AsyncQdrantClient | AsyncNumpyVectorStore:
+    """Return a singleton async Qdrant client for the shared local server.
+
+    The server is located (or spawned) through :func:`get_client` first, so
+    this must be called once outside of latency-sensitive code, e.g. during
+    application startup.
+    """
+    client = get_client()
+    if _is_numpy_store(client):
+        from services.numpy_index import AsyncNumpyVectorStore
+
+        return AsyncNumpyVectorStore(client)
+    from qdrant_client import AsyncQdrantClient
+
+    return AsyncQdrantClient(url=_QDRANT_URL, timeout=60)
+
+
+def _is_numpy_store(client) -> bool:
+    """True if *client* is a (sync or async) NumPy index rather than Qdrant."""
+    numpy_index = sys.modules.get("services.numpy_index")
+    return numpy_index is not None and isinstance(
+        client, (numpy_index.NumpyVectorStore, numpy_index.AsyncNumpyVectorStore)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Collection performance profiles
+# ---------------------------------------------------------------------------
+
+@dataclasses.dataclass(frozen=True)
+class CollectionProfile:
+    """Index/storage settings applied when a collection is created.
+
+    ``search_ef`` and the rescoring settings are applied per query.
     """
+    name: str
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    search_ef: int | None = None  # None = Qdrant's default (ef_construct)
+    quantization: bool = False  # int8 scalar quantization kept in RAM
+    rescore: bool = True  # re-rank quantized candidates with original vectors
+    oversampling: float = 2.0
+    on_disk: bool = False  # original vectors memory-mapped instead of in RAM
+
+
+COLLECTION_PROFILES: Dict[str, CollectionProfile] = {
+    # Qdrant defaults – what every collection used before profiles existed.
+    "default": CollectionProfile("default"),
+    # Denser graph, wider search and int8 vectors in RAM: lowest latency.
+    "low_latency": CollectionProfile(
+        "low_latency", hnsw_m=32, hnsw_ef_construct=200, search_ef=64, quantization=True, oversampling=2.0,
+    ),
+    # Originals on disk, only int8 copies in RAM (~4× less): for large catalogs.
+    "low_memory": CollectionProfile(
+        "low_memory", hnsw_m=16, hnsw_ef_construct=100, search_ef=128, quantization=True, oversampling=3.0,
+        on_disk=True,
+    ),
+    # Full-precision vectors and a wide beam: best recall, more RAM and CPU.
+    "high_recall": CollectionProfile("high_recall", hnsw_m=48, hnsw_ef_construct=400, search_ef=256),
+}
+
+_QDRANT_PROFILE = os.getenv("QDRANT_PROFILE", "default")
+
+
+def get_profile(name: str | None = None) -> CollectionProfile:
+    """Return the named profile (default: ``QDRANT_PROFILE`` env var)."""
+    name = name or _QDRANT_PROFILE
     try:
-        client = QdrantClient(url=_QDRANT_URL, timeout=60)
-        _ensure_qdrant_ready(client)
-        return client
-    except Exception:
-        # server not running yet – spawn our own
-        _start_local_server()
-        client = QdrantClient(url=_QDRANT_URL, timeout=60)
-        _ensure_qdrant_ready(client)
-        return client
-
-
-def recreate_collection(client: QdrantClient, name: str, dim: int = _EMBEDDING_DIM) -> None:
-    """(Re)create *name* collection with given dimensionality using cosine distance."""
+        return COLLECTION_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown collection profile {name!r}; choose one of {sorted(COLLECTION_PROFILES)}") from None
+
+
+def search_params(profile: CollectionProfile):
+    """Per-query Qdrant search parameters for *profile* (None = server defaults)."""
+    if profile.search_ef is None and not profile.quantization:
+        return None
+    from qdrant_client import models
+
+    return models.SearchParams(
+        hnsw_ef=profile.search_ef,
+        quantization=models.QuantizationSearchParams(
+            rescore=profile.rescore, oversampling=profile.oversampling,
+        ) if profile.quantization else None,
+    )
+
+
+def match_profile(info) -> str | None:
+    """Name of the profile matching a collection's config (``"custom"`` if none).
+
+    Returns None for backends without HNSW settings (the NumPy index).
+    """
+    hnsw = getattr(info.config, "hnsw_config", None)
+    if hnsw is None:
+        return None
+    quantized = info.config.quantization_config is not None
+    on_disk = bool(info.config.params.vectors.on_disk)
+    for profile in COLLECTION_PROFILES.values():
+        if (
+            (hnsw.m, hnsw.ef_construct) == (profile.hnsw_m, profile.hnsw_ef_construct)
+            and quantized == profile.quantization
+            and on_disk == profile.on_disk
+        ):
+            return profile.name
+    return "custom"
+
+
+def _query_requests(client, vectors: List[List[float]], k: int) -> list:
+    """Build batch query requests in the format *client* expects."""
+    if _is_numpy_store(client):
+        from services.numpy_index import QueryRequest
+
+        return [QueryRequest(query=vector, limit=k, with_payload=True) for vector in vectors]
+    from qdrant_client import models
+
+    params = search_params(get_profile())
+    return [models.QueryRequest(query=vector, limit=k, with_payload=True, params=params) for vector in vectors]
+
+
+def recreate_collection(
+    client: QdrantClient,
+    name: str,
+    dim: int = _EMBEDDING_DIM,
+    profile: str | None = None,
+    payload_indexes: Iterable[str] = (),
+) -> None:
+    """(Re)create *name* collection with given dimensionality using cosine distance.
+
+    *profile* (default ``QDRANT_PROFILE``) selects HNSW, quantization and
+    storage settings from :data:`COLLECTION_PROFILES`; a keyword payload
+    index is created for each field in *payload_indexes*.
+    """
+    if _is_numpy_store(client):
+        client.create_collection(name, dim)
+        record_embedding_backend(name)
+        return
+    from qdrant_client import models
+
+    prof = get_profile(profile)
     client.recreate_collection(
         collection_name=name,
-        vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE),
+        vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE, on_disk=prof.on_disk),
+        hnsw_config=models.HnswConfigDiff(m=prof.hnsw_m, ef_construct=prof.hnsw_ef_construct),
+        quantization_config=models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, always_ram=True),
+        ) if prof.quantization else None,
+    )
+    for field in payload_indexes:
+        client.create_payload_index(
+            collection_name=name,
+            field_name=field,
+            field_schema=models.PayloadSchemaType.KEYWORD,
+            wait=True,
+        )
+    record_embedding_backend(name)
+
+
+def search_keywords(
+    client: QdrantClient,
+    collection_name: str,
+    keywords: Iterable[str],
+    k: int = 5,
+) -> Dict[str, List[models.ScoredPoint]]:
+    """Semantic search for several *keywords* in one round trip.
+
+    All keywords are encoded with a single :func:`embed` call and sent to
+    Qdrant as one ``query_batch_points`` request.  Returns a mapping of each
+    distinct keyword (in first-seen order) to its top-*k* hits so that callers
+    can still merge or attribute results per keyword.
+    """
+    unique_keywords = list(dict.fromkeys(keywords))
+    if not unique_keywords:
+        return {}
+    _check_embedding_backend(collection_name)
+
+    vectors = embed(unique_keywords)
+    responses = client.query_batch_points(
+        collection_name=collection_name,
+        requests=_query_requests(client, vectors, k),
+    )
+    return {kw: resp.points for kw, resp in zip(unique_keywords, responses)}
+
+
+async def asearch_keywords(
+    client: AsyncQdrantClient,
+    collection_name: str,
+    keywords: Iterable[str],
+    k: int = 5,
+) -> Dict[str, List[models.ScoredPoint]]:
+    """Async :func:`search_keywords` using an ``AsyncQdrantClient``."""
+    unique_keywords = list(dict.fromkeys(keywords))
+    if not unique_keywords:
+        return {}
+    _check_embedding_backend(collection_name)
+
+    vectors = await aembed(unique_keywords)
+    responses = await client.query_batch_points(
+        collection_name=collection_name,
+        requests=_query_requests(client, vectors, k),
     )
+    return {kw: resp.points for kw, resp in zip(unique_keywords, responses)}
 
 
 import uuid
@@ -182,9 +736,24 @@ def str2uuid(value: str) -> str:
     return str(uuid.uuid5(uuid.NAMESPACE_URL, value))
 
 __all__ = [
+    "COLLECTION_PROFILES",
+    "CollectionProfile",
     "shutdown_server",
+    "aembed",
+    "asearch_keywords",
+    "cosine",
     "embed",
+    "embed_local",
+    "embedding_cache_stats",
+    "embedding_model_id",
+    "get_async_client",
     "get_client",
+    "get_profile",
+    "load_embedding_model",
+    "match_profile",
+    "record_embedding_backend",
     "recreate_collection",
+    "search_keywords",
+    "search_params",
     "str2uuid",
 ]
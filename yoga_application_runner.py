@@ -1,12 +1,16 @@
 import argparse
+import asyncio
 import logging
+import os
 import subprocess
+import threading
 import requests
 import re
 import glob
 import yaml
 from pathlib import Path
 from services.vector_store import shutdown_server
+from query_extraction import extract_query_info
 
 # For Neo4j detail retrieval reuse logic from existing agent
 from yoga_models import PoseInSequence, CourseCandidate
@@ -34,6 +38,15 @@ def discover_agent_cards() -> dict[str, dict]:
     return mapping
 
 
+def drain_output(proc: subprocess.Popen, tag: str) -> None:
+    """Keep reading a child's piped output (logged at DEBUG) so its writes never block on a full pipe."""
+    def _pump():
+        for line in iter(proc.stdout.readline, ''):
+            logging.debug(f"[{tag}]: {line.strip()}")
+
+    threading.Thread(target=_pump, name=f"drain-{tag}", daemon=True).start()
+
+
 def start_agent_server(agent_dir: Path):
     """Launch the server.py inside *agent_dir*; return the detected base URL."""
     cmd = ["python", str(agent_dir / "server.py")]
@@ -50,6 +63,7 @@ def start_agent_server(agent_dir: Path):
             break
     if base_url is None:
         raise RuntimeError(f"Could not determine address for {agent_dir.name} server.")
+    drain_output(proc, agent_dir.name)
     return proc, base_url
 
 
@@ -57,64 +71,74 @@ class YogaApplicationRunner:
     """
     Orchestrates the yoga recommendation process by coordinating with external ADK agents and the pose checker service.
     """
-    def __init__(self, pose_api_base: str, course_finder_url: str, category_url: str):
+    def __init__(self, pose_api_base: str, course_finder_url: str, category_url: str, api_type: str = "deepseek"):
         self.pose_api_base = pose_api_base.rstrip("/")
+        self.api_type = api_type
         self.course_finder_url = course_finder_url.rstrip("/")
         self.category_url = category_url.rstrip("/")
 
-        # Neo4j driver for detail retrieval
-        import os
-        NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
-        NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
-        NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "12345678")
-        from neo4j import GraphDatabase
-        self.neo4j_driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        # Shared Neo4j driver for detail retrieval
+        from services.graph_db import get_graph
+        self.neo4j_driver = get_graph()
 
-    def _validate_sequence(self, sequence: list[str], user_query: str) -> list[str] | None:
+    def _extract_query_info(self, user_query: str) -> dict | None:
         """
-        Validates a sequence of poses by calling the pose checker API.
+        Extracts the structured query once for the whole pipeline run.
+
+        Returns None on failure, in which case every service extracts it itself.
+        """
+        try:
+            query_info = asyncio.run(extract_query_info(self.api_type, user_query))
+            logging.info(f"User's query info: {query_info}")
+            return query_info
+        except Exception as e:
+            logging.warning(f"Could not extract query info up front; services will extract it themselves: {e}")
+            return None
+
+    def _validate_sequence(self, sequence: list[str], user_query: str, query_info: dict | None = None) -> list[str] | None:
+        """
+        Validates a sequence of poses with one call to the pose checker's /check-sequence API.
 
         Returns:
             A validated list of pose names, or None if the sequence is unacceptable.
         """
-        validated_sequence = []
-        removed_poses_count = 0
         max_removals_allowed = 2
-        check_url = f"{self.pose_api_base}/check-pose"
+        check_url = f"{self.pose_api_base}/check-sequence"
+        payload = {"pose_names": sequence, "user_query": user_query, "query_info": query_info}
 
-        for pose_name in sequence:
-            try:
-                payload = {"pose_name": pose_name, "user_query": user_query}
-                logging.info(f"Attempting to check pose '{pose_name}' via API: {check_url} with payload {payload}")
-                response = requests.post(check_url, json=payload, timeout=45)
-                response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
-
-                result = response.json()
-                final_pose_name = result.get("final_pose_name")
-
-                if final_pose_name:
-                    validated_sequence.append(final_pose_name)
-                    if result.get("was_replaced"):
-                        logging.info(f"Pose '{pose_name}' was replaced with '{final_pose_name}'.")
-                else:
-                    removed_poses_count += 1
-                    logging.warning(f"Pose '{pose_name}' was unsuitable and removed (no replacement found).")
-
-            except requests.exceptions.ConnectionError as e:
-                logging.error(f"Connection error checking pose '{pose_name}'. Is the server running at {check_url}? Error: {e}")
-                removed_poses_count += 1
-            except requests.exceptions.Timeout as e:
-                logging.error(f"Timeout checking pose '{pose_name}'. Server took too long to respond. Error: {e}")
-                removed_poses_count += 1
-            except requests.exceptions.HTTPError as e:
-                logging.error(f"HTTP error checking pose '{pose_name}': {e}. Response: {e.response.text}")
-                removed_poses_count += 1
-            except requests.exceptions.RequestException as e:
-                logging.error(f"General request error checking pose '{pose_name}': {e}. It will be removed.")
-                removed_poses_count += 1
-            except Exception as e:
-                logging.error(f"An unexpected error occurred while processing pose '{pose_name}': {e}. It will be removed.")
+        try:
+            logging.info(f"Checking {len(sequence)} poses via API: {check_url}")
+            response = requests.post(check_url, json=payload, timeout=120)
+            response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
+            results = response.json()["results"]
+        except requests.exceptions.ConnectionError as e:
+            logging.error(f"Connection error checking the sequence. Is the server running at {check_url}? Error: {e}")
+            return None
+        except requests.exceptions.Timeout as e:
+            logging.error(f"Timeout checking the sequence. Server took too long to respond. Error: {e}")
+            return None
+        except requests.exceptions.HTTPError as e:
+            logging.error(f"HTTP error checking the sequence: {e}. Response: {e.response.text}")
+            return None
+        except requests.exceptions.RequestException as e:
+            logging.error(f"General request error checking the sequence: {e}.")
+            return None
+        except Exception as e:
+            logging.error(f"An unexpected error occurred while checking the sequence: {e}.")
+            return None
+
+        validated_sequence = []
+        removed_poses_count = 0
+        for result in results:
+            pose_name = result["pose_name"]
+            final_pose_name = result.get("final_pose_name")
+            if final_pose_name:
+                validated_sequence.append(final_pose_name)
+                if result.get("was_replaced"):
+                    logging.info(f"Pose '{pose_name}' was replaced with '{final_pose_name}'.")
+            else:
                 removed_poses_count += 1
+                logging.warning(f"Pose '{pose_name}' was unsuitable and removed (no replacement found).")
 
         if removed_poses_count > max_removals_allowed:
             logging.error(f"Course rejected: {removed_poses_count} poses were removed, which is more than the allowed {max_removals_allowed}.")
@@ -155,13 +179,16 @@ class YogaApplicationRunner:
         """
         Executes the full recommendation and validation pipeline.
         """
+        # Extract the structured query once; every stage below reuses it.
+        query_info = self._extract_query_info(user_query)
+
         # --- Phase 1: Try to find an existing course ---
         logging.info("--- Phase 1: Searching for existing courses ---")
         # Use Course Finder ADK agent
         try:
             resp = requests.post(
                 self.course_finder_url,
-                json={"user_query": user_query},
+                json={"user_query": user_query, "query_info": query_info},
                 timeout=60,
             )
             resp.raise_for_status()
@@ -176,7 +203,7 @@ class YogaApplicationRunner:
             logging.info(f"\nValidating candidate course: '{course.course_name}'")
             original_sequence = [p.pose_name for p in course.sequence]
             
-            validated_sequence = self._validate_sequence(original_sequence, user_query)
+            validated_sequence = self._validate_sequence(original_sequence, user_query, query_info)
             
             if validated_sequence:
                 print("\n🎉 Found an acceptable existing course!")
@@ -193,7 +220,7 @@ class YogaApplicationRunner:
             try:
                 resp = requests.post(
                     self.category_url,
-                    json={"user_query": user_query},
+                    json={"user_query": user_query, "query_info": query_info},
                     timeout=120,
                 )
                 resp.raise_for_status()
@@ -206,7 +233,7 @@ class YogaApplicationRunner:
                 logging.warning("Category recommender failed to create a sequence. Retrying...")
                 continue
 
-            validated_sequence = self._validate_sequence(sequence, user_query)
+            validated_sequence = self._validate_sequence(sequence, user_query, query_info)
 
             if validated_sequence:
                 print("\n🎉 Successfully composed and validated a new course!")
@@ -234,18 +261,103 @@ def main():
     parser.add_argument(
         "--api",
         type=str,
+        choices=["openai", "deepseek", "local"],
+        default="deepseek",
+        help="Specify which model API to use ('local' starts the offline LLM stand-in).",
+    )
+    parser.add_argument(
+        "--llm-mode",
+        choices=["rules", "record", "replay"],
+        default="rules",
+        help="With --api local: answer by rules, record a real provider's answers, or replay them.",
+    )
+    parser.add_argument(
+        "--llm-cassette",
+        type=str,
+        default="benchmarks/llm_cassette.jsonl",
+        help="With --api local: cassette written in record mode and served in replay mode.",
+    )
+    parser.add_argument(
+        "--llm-upstream",
         choices=["openai", "deepseek"],
         default="deepseek",
-        help="Specify which model API to use.",
+        help="With --api local --llm-mode record: the real provider to record.",
+    )
+    parser.add_argument(
+        "--llm-latency-ms",
+        type=float,
+        default=0.0,
+        help="With --api local: synthetic latency added to every stand-in answer.",
+    )
+    parser.add_argument(
+        "--embedding-service",
+        action="store_true",
+        help="Start one shared embedding service and route every process's embed() calls through it.",
     )
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+    def _wait_address(proc, tag):
+        addr = None
+        for ln in iter(proc.stdout.readline, ''):
+            logging.info(f"[{tag}]: {ln.strip()}")
+            m = re.search(r"Uvicorn running on (http://[0-9\.:]+)", ln)
+            if m:
+                addr = m.group(1)
+                break
+            if proc.poll() is not None:
+                raise RuntimeError(f"{tag} terminated before startup.")
+        if addr is None:
+            raise RuntimeError(f"Could not determine address for {tag}.")
+        # Access-log lines keep coming after startup; an unread pipe would stall the server.
+        drain_output(proc, tag)
+        return addr
+
     # ---------- Launch pose checker service ----------
     processes: list[subprocess.Popen] = []
     runner = None
     try:
+        if args.embedding_service:
+            embed_cmd = [
+                "python",
+                "-m",
+                "services.embedding_server.server",
+                "--port",
+                "0",
+                "--host",
+                "127.0.0.1",
+            ]
+            embed_proc = subprocess.Popen(embed_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            processes.append(embed_proc)
+            # Child processes inherit the environment, so every server started
+            # below will send its embed() calls to this one model copy.
+            os.environ["EMBEDDING_SERVICE_URL"] = _wait_address(embed_proc, "EmbeddingService")
+
+        if args.api == "local":
+            standin_cmd = [
+                "python",
+                "-m",
+                "services.llm_standin.server",
+                "--mode",
+                args.llm_mode,
+                "--cassette",
+                args.llm_cassette,
+                "--upstream",
+                args.llm_upstream,
+                "--latency-ms",
+                str(args.llm_latency_ms),
+                "--port",
+                "0",
+                "--host",
+                "127.0.0.1",
+            ]
+            standin_proc = subprocess.Popen(standin_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            processes.append(standin_proc)
+            os.environ["LLM_STANDIN_URL"] = _wait_address(standin_proc, "LLMStandIn") + "/v1"
+        # Agent servers read their model API from the environment.
+        os.environ["LLM_API"] = args.api
+
         pose_cmd = [
             "python",
             "-m",
@@ -260,20 +372,6 @@ def main():
         pose_proc = subprocess.Popen(pose_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
         processes.append(pose_proc)
 
-        def _wait_address(proc, tag):
-            addr = None
-            for ln in iter(proc.stdout.readline, ''):
-                logging.info(f"[{tag}]: {ln.strip()}")
-                m = re.search(r"Uvicorn running on (http://[0-9\.:]+)", ln)
-                if m:
-                    addr = m.group(1)
-                    break
-                if proc.poll() is not None:
-                    raise RuntimeError(f"{tag} terminated before startup.")
-            if addr is None:
-                raise RuntimeError(f"Could not determine address for {tag}.")
-            return addr
-
         pose_base = _wait_address(pose_proc, "PoseChecker")
 
         # ---------- Discover agent cards ----------
@@ -303,6 +401,7 @@ def main():
             pose_api_base=pose_base,
             course_finder_url=course_finder_url,
             category_url=category_url,
+            api_type=args.api,
         )
         runner.run(user_query=args.query)
 